@@ -0,0 +1,4 @@
+from proctoring import create_asgi_app
+
+# uvicorn asgi:app --host 0.0.0.0 --port 5000
+app = create_asgi_app()
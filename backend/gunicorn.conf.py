@@ -0,0 +1,43 @@
+# gunicorn -c gunicorn.conf.py app:app
+import gc
+import os
+
+# Tells create_app() it is running in the preloading master (see MODEL_WARMUP_DEFER_ENV).
+os.environ["PROCTORING_PRELOAD_MASTER"] = "1"
+
+bind = os.environ.get("PROCTORING_BIND", "0.0.0.0:5000")
+# More than one worker needs PROCTORING_SESSION_STORE=sqlite; create_app() refuses to start otherwise.
+workers = int(os.environ.get("PROCTORING_WORKERS", "1"))
+# Each worker sizes its native thread pools to its share of the cores (see CPU_THREAD_BUDGET).
+os.environ["PROCTORING_WORKERS"] = str(workers)
+worker_class = "gthread"
+threads = int(os.environ.get("PROCTORING_THREADS", "4"))
+# Admission limits are derived from the threads each worker serves requests on.
+os.environ["PROCTORING_THREADS"] = str(threads)
+# Load the app and model weights once in the master; workers share those pages copy-on-write.
+preload_app = True
+# Worker warmup runs before the first request is accepted.
+timeout = 120
+
+
+def when_ready(server):
+    # Move everything allocated during preload out of the collector's reach so the
+    # first GC pass in a worker does not touch (and copy) every shared page.
+    gc.collect()
+    gc.freeze()
+
+
+def pre_fork(server, worker):
+    # Lowest slot not held by a live worker, so a respawned worker takes over its predecessor's cores.
+    taken = {getattr(sibling, "cpu_slot", None) for sibling in server.WORKERS.values()}
+    worker.cpu_slot = next(slot for slot in range(len(taken) + 1) if slot not in taken)
+
+
+def post_fork(server, worker):
+    os.environ.pop("PROCTORING_PRELOAD_MASTER", None)
+
+
+def post_worker_init(worker):
+    from proctoring.app_factory import prepare_worker
+
+    prepare_worker(worker.wsgi, cpu_slot=worker.cpu_slot)
@@ -1,3 +1,8 @@
-from .app_factory import create_app
+from .services.thread_budget import apply_blas_thread_env
 
-__all__ = ["create_app"]
+# BLAS sizes its thread pool when numpy first loads, so this runs before anything imports numpy.
+apply_blas_thread_env()
+
+from .app_factory import create_app, create_asgi_app  # noqa: E402
+
+__all__ = ["create_app", "create_asgi_app"]
@@ -1,20 +1,194 @@
+import atexit
+import os
+import threading
+import time
 from pathlib import Path
 
 from flask import Flask
 
 from proctoring.config import (
+    APP_ROLE,
+    APP_ROLE_ENV,
+    ASGI_BUFFERED_RESPONSE_BYTES,
+    ASGI_INFERENCE_THREADS,
+    ASGI_IO_THREADS,
+    ASGI_MAX_BODY_BYTES,
+    ASGI_STREAM_RESERVED_THREADS,
+    ASGI_STREAM_THREADS,
+    EVENT_STREAM_MAX_CONCURRENT,
+    EVIDENCE_GC_INTERVAL_SECONDS,
+    EVIDENCE_MAX_TOTAL_MB,
+    EVIDENCE_ORPHAN_GRACE_SECONDS,
+    EVIDENCE_RETENTION_DAYS,
     MAX_VIOLATION_EVENTS_PER_USER,
+    MODEL_WARMUP_DEFER_ENV,
+    MODEL_WARMUP_ENABLED,
+    MODEL_WARMUP_RUNS,
+    NETWORK_CHECK_RETENTION_DAYS,
+    NETWORK_CHECKS_DIR,
+    PROFILER_DIR,
     REGISTERED_FACES_FILE,
+    ROLLUP_SNAPSHOT_FILE,
+    ROLLUP_SNAPSHOT_INTERVAL_SECONDS,
     SECRET_KEY,
+    SESSION_STORE_BACKEND_ENV,
     VIOLATION_CAPTURES_DIR,
     VIOLATION_EVENTS_FILE,
 )
-from proctoring.infrastructure import load_registered_faces, load_violation_events
-from proctoring.state import create_app_state
+from proctoring.infrastructure import (
+    collect_evidence_garbage,
+    load_registered_faces,
+    load_violation_events,
+    prune_empty_capture_dirs,
+    scan_evidence_files,
+)
+from proctoring.state import (
+    REGISTERED_FACES_GENERATION,
+    ROLE_ALL,
+    VIOLATION_EVENTS_GENERATION,
+    VIOLATION_EVENTS_REWRITE_GENERATION,
+    AppState,
+    create_app_state,
+    publish_shared_change,
+    refresh_shared_state,
+)
+from proctoring.services.admission import admission_limits
+from proctoring.services.network_check import prune_network_checks
+from proctoring.services.session_store import InProcessSessionStore
+from proctoring.services.thread_budget import apply_thread_budget, workers_per_node
+from proctoring.services.warmup import warm_up_models
 from proctoring.web import register_routes
+from proctoring.web.asgi import AsgiAdapter
+from proctoring.web.events import sync_shared_state
+from proctoring.web.forwarding import INFERENCE_ENDPOINTS
+
+ROLLUP_SNAPSHOT_LEASE = "rollup_snapshot"
+
+
+def run_evidence_gc(app: Flask, state: AppState, dry_run: bool = False) -> dict[str, int]:
+    captures_dir = app.config["VIOLATION_CAPTURES_DIR"]
+    orphan_grace_seconds = float(app.config["EVIDENCE_ORPHAN_GRACE_SECONDS"])
+    # The directory walk runs unlocked; captures only wait for the rewrite itself.
+    files = scan_evidence_files(captures_dir)
+    with state.sessions.mutex(VIOLATION_EVENTS_GENERATION), state.violation_events_lock:
+        refresh_shared_state(
+            state,
+            app.config["REGISTERED_FACES_FILE"],
+            app.config["VIOLATION_EVENTS_FILE"],
+            int(app.config["MAX_VIOLATION_EVENTS_PER_USER"]),
+        )
+        report = collect_evidence_garbage(
+            events=state.violation_events,
+            file_path=app.config["VIOLATION_EVENTS_FILE"],
+            captures_dir=captures_dir,
+            max_age_seconds=float(app.config["EVIDENCE_RETENTION_DAYS"]) * 86400.0,
+            max_total_bytes=int(float(app.config["EVIDENCE_MAX_TOTAL_MB"]) * 1024 * 1024),
+            orphan_grace_seconds=orphan_grace_seconds,
+            dry_run=dry_run,
+            files=files,
+        )
+        if not dry_run:
+            state.event_index.rebuild(state.violation_events)
+            state.user_summary.rebuild(state.registered_faces, state.violation_events)
+            publish_shared_change(state, VIOLATION_EVENTS_REWRITE_GENERATION)
+            publish_shared_change(state, VIOLATION_EVENTS_GENERATION)
+    if not dry_run:
+        prune_empty_capture_dirs(captures_dir, orphan_grace_seconds)
+    return report.to_dict()
+
+
+def _start_evidence_gc_worker(app: Flask, state: AppState) -> None:
+    interval = float(app.config["EVIDENCE_GC_INTERVAL_SECONDS"])
+    if interval <= 0:
+        return
+
+    def worker() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                run_evidence_gc(app, state)
+                prune_network_checks(
+                    app.config["NETWORK_CHECKS_DIR"],
+                    float(app.config["NETWORK_CHECK_RETENTION_DAYS"]) * 86400.0,
+                )
+            except Exception:
+                app.logger.exception("Evidence GC run failed")
+
+    threading.Thread(target=worker, name="evidence-gc", daemon=True).start()
+
+
+def save_rollups(app: Flask, state: AppState) -> None:
+    """
+    Every worker keeps the same rollups, so only the holder of the snapshot
+    lease writes the file; another worker takes over once it stops renewing.
+    """
+    now_ts = time.time()
+    lease_seconds = 3 * max(0.0, float(app.config["ROLLUP_SNAPSHOT_INTERVAL_SECONDS"]))
+    if not state.sessions.try_lease(ROLLUP_SNAPSHOT_LEASE, str(os.getpid()), now_ts, lease_seconds):
+        return
+    # Catch up on events recorded by the other workers, even if this one has been idle.
+    sync_shared_state(app, state)
+    state.rollups.prune(now_ts)
+    if state.rollups.dirty:
+        state.rollups.save(app.config["ROLLUP_SNAPSHOT_FILE"])
+
+
+def _start_rollup_snapshot_worker(app: Flask, state: AppState) -> None:
+    interval = float(app.config["ROLLUP_SNAPSHOT_INTERVAL_SECONDS"])
+    if interval <= 0:
+        return
 
+    def worker() -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                save_rollups(app, state)
+            except OSError:
+                app.logger.exception("Saving violation rollups failed")
 
-def create_app() -> Flask:
+    threading.Thread(target=worker, name="rollup-snapshot", daemon=True).start()
+
+
+def run_model_warmup(app: Flask, state: AppState) -> None:
+    warm_up_models(state.analyzer, state.phone_detector, state.readiness, runs=MODEL_WARMUP_RUNS)
+    if state.readiness.error:
+        app.logger.error("Model warmup failed: %s", state.readiness.error)
+    else:
+        app.logger.info("Models warmed up in pid %s: %s", state.readiness.pid, state.readiness.warmup_ms)
+
+
+def _start_background_workers(app: Flask, state: AppState) -> None:
+    _start_evidence_gc_worker(app, state)
+    _start_rollup_snapshot_worker(app, state)
+    atexit.register(save_rollups, app, state)
+
+
+def prepare_worker(app: Flask, cpu_slot: int | None = None) -> None:
+    """
+    Finish startup in a worker forked from a preloading master. Model weights
+    loaded by the master stay shared; objects that own threads (MediaPipe graphs,
+    ONNX Runtime sessions, background workers) are created here. cpu_slot is
+    the worker's index among its siblings, used for CPU pinning.
+    """
+    state: AppState = app.extensions["proctoring_state"]
+    state.readiness.pid = os.getpid()
+    state.thread_budget = apply_thread_budget(cpu_slot)
+    if state.phone_detector is not None:
+        state.phone_detector.prepare_for_worker()
+    if MODEL_WARMUP_ENABLED and state.serves_inference:
+        run_model_warmup(app, state)
+    else:
+        state.readiness.warmed_up = True
+    _start_background_workers(app, state)
+
+
+def create_app(role: str | None = None) -> Flask:
+    """
+    role "all" serves everything. "api" serves pages, admin and evidence
+    without importing the vision models, and "inference" serves only the
+    model-backed routes; the default comes from PROCTORING_ROLE.
+    """
+    role = role or os.environ.get(APP_ROLE_ENV) or APP_ROLE
     base_dir = Path(__file__).resolve().parent.parent
     app = Flask(
         __name__,
@@ -25,10 +199,67 @@ def create_app() -> Flask:
     app.config["REGISTERED_FACES_FILE"] = REGISTERED_FACES_FILE
     app.config["VIOLATION_EVENTS_FILE"] = VIOLATION_EVENTS_FILE
     app.config["VIOLATION_CAPTURES_DIR"] = VIOLATION_CAPTURES_DIR
+    app.config["NETWORK_CHECKS_DIR"] = NETWORK_CHECKS_DIR
+    app.config["NETWORK_CHECK_RETENTION_DAYS"] = NETWORK_CHECK_RETENTION_DAYS
     app.config["MAX_VIOLATION_EVENTS_PER_USER"] = MAX_VIOLATION_EVENTS_PER_USER
+    app.config["EVIDENCE_RETENTION_DAYS"] = EVIDENCE_RETENTION_DAYS
+    app.config["EVIDENCE_MAX_TOTAL_MB"] = EVIDENCE_MAX_TOTAL_MB
+    app.config["EVIDENCE_ORPHAN_GRACE_SECONDS"] = EVIDENCE_ORPHAN_GRACE_SECONDS
+    app.config["EVIDENCE_GC_INTERVAL_SECONDS"] = EVIDENCE_GC_INTERVAL_SECONDS
+    app.config["ROLLUP_SNAPSHOT_FILE"] = ROLLUP_SNAPSHOT_FILE
+    app.config["ROLLUP_SNAPSHOT_INTERVAL_SECONDS"] = ROLLUP_SNAPSHOT_INTERVAL_SECONDS
+    app.config["PROFILER_DIR"] = PROFILER_DIR
 
-    state = create_app_state()
+    state = create_app_state(role)
+    if isinstance(state.sessions, InProcessSessionStore):
+        if workers_per_node() > 1:
+            # Each worker would keep its own sessions and overwrite the others' event store.
+            raise RuntimeError(
+                f"{workers_per_node()} workers cannot share the in-process session store; "
+                f"set {SESSION_STORE_BACKEND_ENV}=sqlite"
+            )
+        if role != ROLE_ALL:
+            app.logger.warning("Role %r runs alongside other processes; use the sqlite session store", role)
+    for name in (REGISTERED_FACES_GENERATION, VIOLATION_EVENTS_GENERATION, VIOLATION_EVENTS_REWRITE_GENERATION):
+        state.synced_generations[name] = state.sessions.generation(name)
     load_registered_faces(app.config["REGISTERED_FACES_FILE"], state.registered_faces)
     state.violation_events = load_violation_events(app.config["VIOLATION_EVENTS_FILE"])
+    state.event_index.rebuild(state.violation_events)
+    state.user_summary.rebuild(state.registered_faces, state.violation_events)
+    state.rollups.load(app.config["ROLLUP_SNAPSHOT_FILE"])
+    state.rollups.catch_up(state.violation_events, state.event_index.last_event_id)
+    app.extensions["proctoring_state"] = state
     register_routes(app, state)
+
+    if os.environ.get(MODEL_WARMUP_DEFER_ENV):
+        # Preloading gunicorn master: warmup and background threads belong to the workers.
+        return app
+    state.thread_budget = apply_thread_budget()
+    if MODEL_WARMUP_ENABLED and state.serves_inference:
+        threading.Thread(target=run_model_warmup, args=(app, state), name="model-warmup", daemon=True).start()
+    else:
+        state.readiness.warmed_up = True
+    _start_background_workers(app, state)
     return app
+
+
+def create_asgi_app(role: str | None = None) -> AsgiAdapter:
+    """The same app and routes behind an ASGI adapter: uvicorn asgi:app."""
+    app = create_app(role)
+    state: AppState = app.extensions["proctoring_state"]
+    if state.admission is not None:
+        # Inference views run on this pool here, not on the server's request threads.
+        state.admission.set_limits(*admission_limits(ASGI_INFERENCE_THREADS))
+    if not EVENT_STREAM_MAX_CONCURRENT:
+        # Past the stream pool, an open stream would stall behind the others instead of being refused.
+        state.event_broker.max_streams = max(1, ASGI_STREAM_THREADS - ASGI_STREAM_RESERVED_THREADS)
+    return AsgiAdapter(
+        app,
+        # Relayed inference requests in an API process only wait on the network.
+        inference_paths=INFERENCE_ENDPOINTS.values() if state.serves_inference else (),
+        inference_threads=ASGI_INFERENCE_THREADS,
+        io_threads=ASGI_IO_THREADS,
+        stream_threads=ASGI_STREAM_THREADS,
+        max_body_bytes=ASGI_MAX_BODY_BYTES,
+        buffered_response_bytes=ASGI_BUFFERED_RESPONSE_BYTES,
+    )
@@ -0,0 +1,160 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+from proctoring.config import (
+    EVIDENCE_MAX_TOTAL_MB,
+    EVIDENCE_ORPHAN_GRACE_SECONDS,
+    EVIDENCE_RETENTION_DAYS,
+    PHONE_DETECTOR_IMAGE_SIZE,
+    PHONE_DETECTOR_ONNX_PATH,
+    PHONE_DETECTOR_WEIGHTS_PATH,
+    VIOLATION_CAPTURES_DIR,
+    VIOLATION_EVENTS_FILE,
+)
+
+
+def _export_phone_model(args: argparse.Namespace) -> int:
+    from proctoring.services.phone_backends import export_phone_model
+
+    target = export_phone_model(
+        weights_path=args.weights,
+        output_path=args.output,
+        image_size=args.imgsz,
+        quantize_int8=args.int8,
+    )
+    print(f"Exported phone detector to {target}")
+    return 0
+
+
+def _gc_evidence(args: argparse.Namespace) -> int:
+    from proctoring.infrastructure import collect_evidence_garbage, load_violation_events
+
+    events = load_violation_events(VIOLATION_EVENTS_FILE)
+    report = collect_evidence_garbage(
+        events=events,
+        file_path=VIOLATION_EVENTS_FILE,
+        captures_dir=VIOLATION_CAPTURES_DIR,
+        max_age_seconds=args.max_age_days * 86400.0,
+        max_total_bytes=int(args.max_total_mb * 1024 * 1024),
+        orphan_grace_seconds=args.orphan_grace_seconds,
+        dry_run=args.dry_run,
+    )
+    print(json.dumps(report.to_dict(), indent=2))
+    return 0
+
+
+def _load_test(args: argparse.Namespace) -> int:
+    from concurrent.futures import ThreadPoolExecutor
+
+    from proctoring.loadtest import (
+        CandidateClient,
+        ServerSampler,
+        format_reports,
+        load_frame_corpus,
+        run_level,
+        synthesize_frames,
+        to_data_url,
+    )
+
+    levels = sorted({int(level) for level in args.candidates.split(",") if level.strip()})
+    if not levels or levels[0] < 1:
+        raise SystemExit("--candidates needs positive counts, e.g. 1,5,10")
+    corpus = load_frame_corpus(args.frames)
+    registration = load_frame_corpus(args.register_frames) if args.register_frames else corpus[:3]
+    if args.synthetic > 0:
+        corpus = synthesize_frames(corpus, args.synthetic, seed=args.seed)
+    frames = [to_data_url(frame) for frame in corpus]
+    registration_images = [to_data_url(frame) for frame in registration]
+
+    clients = [
+        CandidateClient(args.url, f"{args.user_prefix}-{index:04d}", args.timeout)
+        for index in range(levels[-1])
+    ]
+    print(f"Enrolling {len(clients)} candidates against {args.url} ...")
+    try:
+        with ThreadPoolExecutor(args.enroll_concurrency) as executor:
+            list(executor.map(lambda client: client.enroll(registration_images), clients))
+    except (RuntimeError, OSError) as exc:
+        raise SystemExit(f"Enrollment failed: {exc}") from exc
+
+    sampler = ServerSampler(args.server_pid) if args.server_pid else None
+    reports = []
+    for level in levels:
+        print(f"Running {level} candidates at {args.fps:g} fps for {args.duration:g}s ...")
+        reports.append(run_level(clients[:level], frames, args.fps, args.duration, sampler))
+        if args.pause > 0 and level != levels[-1]:
+            time.sleep(args.pause)
+
+    print(format_reports(reports))
+    if args.json:
+        Path(args.json).write_text(json.dumps([report.to_dict() for report in reports], indent=2), encoding="utf-8")
+    return 1 if any(report.requests and report.error_rate > args.max_error_rate for report in reports) else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m proctoring")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser(
+        "export-phone-model",
+        help="Export the YOLO phone detector weights to ONNX for the onnx backend",
+    )
+    export_parser.add_argument("--weights", default=PHONE_DETECTOR_WEIGHTS_PATH)
+    export_parser.add_argument("--output", default=PHONE_DETECTOR_ONNX_PATH)
+    export_parser.add_argument("--imgsz", type=int, default=PHONE_DETECTOR_IMAGE_SIZE)
+    export_parser.add_argument("--int8", action="store_true", help="Apply dynamic int8 weight quantization")
+    export_parser.set_defaults(handler=_export_phone_model)
+
+    gc_parser = subparsers.add_parser(
+        "gc-evidence",
+        help="Reconcile violation captures with the event store and apply retention (run with the server stopped)",
+    )
+    gc_parser.add_argument("--max-age-days", type=float, default=EVIDENCE_RETENTION_DAYS)
+    gc_parser.add_argument("--max-total-mb", type=float, default=EVIDENCE_MAX_TOTAL_MB)
+    gc_parser.add_argument("--orphan-grace-seconds", type=float, default=EVIDENCE_ORPHAN_GRACE_SECONDS)
+    gc_parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted without deleting")
+    gc_parser.set_defaults(handler=_gc_evidence)
+
+    load_parser = subparsers.add_parser(
+        "loadtest",
+        help="Simulate concurrent candidates against a running server and report capacity per concurrency level "
+        "(registrations are persisted, so point it at a scratch server)",
+    )
+    load_parser.add_argument("--url", default="http://127.0.0.1:5000")
+    load_parser.add_argument("--frames", required=True, help="Recorded frame (.jpg/.png) file or directory")
+    load_parser.add_argument(
+        "--register-frames",
+        help="Face images to register and verify with (default: the first three corpus frames)",
+    )
+    load_parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        help="Replay this many frames derived from the corpus (exposure, shift, noise) instead of the corpus itself",
+    )
+    load_parser.add_argument("--seed", type=int, default=0)
+    load_parser.add_argument("--candidates", default="1,5,10,25", help="Comma-separated concurrency levels")
+    load_parser.add_argument("--fps", type=float, default=1.0, help="Frames per second per candidate")
+    load_parser.add_argument("--duration", type=float, default=30.0, help="Seconds per concurrency level")
+    load_parser.add_argument("--pause", type=float, default=2.0, help="Seconds to idle between levels")
+    load_parser.add_argument("--timeout", type=float, default=30.0)
+    load_parser.add_argument("--enroll-concurrency", type=int, default=4)
+    load_parser.add_argument("--user-prefix", default="loadtest", help="Reruns reuse the same candidate names")
+    load_parser.add_argument("--server-pid", type=int, help="Sample CPU and memory of this process and its children")
+    load_parser.add_argument("--json", help="Also write the per-level reports here")
+    load_parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        default=0.01,
+        help="Exit non-zero if any level's error rate exceeds this",
+    )
+    load_parser.set_defaults(handler=_load_test)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return int(args.handler(args))
@@ -9,6 +9,9 @@ ADMIN_PASSWORD = "admin123"
 START_MATCH_THRESHOLD = 0.84
 LIVE_MATCH_THRESHOLD = 0.74
 LIVE_IDENTITY_MISMATCH_STREAK_THRESHOLD = 5
+IDENTITY_SCORE_EWMA_ALPHA = 0.35
+IDENTITY_FAST_VERIFY_CHECKS = 5
+IDENTITY_STABLE_VERIFY_INTERVAL = 10
 SIDEWAYS_THRESHOLD = 0.36
 
 REGISTRATION_CENTER_MAX = 0.10
@@ -17,9 +20,59 @@ REGISTRATION_MIN_FACE_AREA_RATIO = 0.07
 
 REGISTERED_FACES_FILE = BASE_DIR / "registered_faces.json"
 MIN_DOWNLOAD_MBPS = 2.0
+MIN_UPLOAD_MBPS = 0.25
+# Network check at setup. Probe bodies are random bytes built once per process, so proxies
+# cannot compress them; the client picks one of these sizes per round trip.
+NETWORK_PROBE_SIZES_KB = (64, 256, 1024, 4096)
+NETWORK_PROBE_DEFAULT_KB = 256
+NETWORK_UPLOAD_PROBE_MAX_KB = 4096
+NETWORK_CHECKS_DIR = BASE_DIR / "network_checks"
+# Records are only read during setup and the exam; the evidence GC worker drops older ones.
+NETWORK_CHECK_RETENTION_DAYS = 7
+# Capture profiles for the exam page, best first: (name, max frame width, JPEG quality,
+# interval ms, approximate upload KB per frame). A candidate gets the first profile whose
+# frame upload plus round trip fits in NETWORK_FRAME_BUDGET_RATIO of its interval.
+NETWORK_CAPTURE_PROFILES = (
+    ("high", 640, 0.75, 1000, 80),
+    ("medium", 480, 0.7, 1000, 45),
+    ("low", 320, 0.6, 1500, 20),
+    ("minimal", 240, 0.5, 2000, 12),
+)
+NETWORK_FRAME_BUDGET_RATIO = 0.5
 LOW_LIGHT_MEAN_THRESHOLD = 60.0
+QUALITY_THUMBNAIL_WIDTH = 160
+QUALITY_MIN_BRIGHTNESS = 25.0
+QUALITY_OVEREXPOSED_PIXEL_VALUE = 250
+QUALITY_MAX_OVEREXPOSED_RATIO = 0.6
+QUALITY_MIN_SHARPNESS = 12.0
+# A stuck camera re-sends the same picture, so its thumbnails match almost exactly; a live sensor
+# filming a still scene still differs by about a grey level of noise, so this stays well below that.
+QUALITY_FROZEN_MAX_DELTA = 0.05
+QUALITY_FROZEN_STREAK_THRESHOLD = 5
+# Consecutive blurry or overexposed frames before the camera itself is reported, since those frames
+# skip the face, phone and identity checks.
+QUALITY_DEGRADED_STREAK_THRESHOLD = 5
+# Exam-page prefilter: when a capture's grey thumbnail (QUALITY_THUMBNAIL_WIDTH wide) differs
+# from the last uploaded frame by less than FRAME_PREFILTER_MIN_CHANGE mean grey levels, the
+# page sends a heartbeat instead. The server only carries a clean verdict forward, and asks
+# for a real frame at least every FRAME_HEARTBEAT_MAX_INTERVAL_SECONDS.
+FRAME_PREFILTER_ENABLED = True
+FRAME_PREFILTER_MIN_CHANGE = 3.0
+FRAME_HEARTBEAT_MAX_INTERVAL_SECONDS = 5.0
+# Optional crop mode: browsers with a built-in face detector send a face crop of at most
+# CLIENT_FACE_CROP_MAX_DIM pixels plus their face count, and the server only measures head pose
+# and identity on it. Full frames still follow every CLIENT_FACE_FULL_FRAME_INTERVAL_SECONDS,
+# and crops are only accepted while the client's face counts agree with the server's on them.
+CLIENT_FACE_DETECTION_ENABLED = False
+CLIENT_FACE_CROP_MAX_DIM = 192
+CLIENT_FACE_FULL_FRAME_INTERVAL_SECONDS = 5.0
 PHONE_VISIBLE_STREAK_THRESHOLD = 1
-PHONE_DETECTOR_MODEL_PATH = str(BASE_DIR / "yolo11n.pt")
+PHONE_DETECTOR_BACKEND = "ultralytics"
+PHONE_DETECTOR_WEIGHTS_PATH = str(BASE_DIR / "yolo11n.pt")
+PHONE_DETECTOR_ONNX_PATH = str(BASE_DIR / "yolo11n.onnx")
+PHONE_DETECTOR_MODEL_PATH = (
+    PHONE_DETECTOR_ONNX_PATH if PHONE_DETECTOR_BACKEND == "onnx" else PHONE_DETECTOR_WEIGHTS_PATH
+)
 PHONE_DETECTOR_CONFIDENCE = 0.10
 PHONE_DETECTOR_IOU = 0.45
 PHONE_DETECTOR_IMAGE_SIZE = 416
@@ -29,6 +82,106 @@ VIOLATION_EVENTS_FILE = BASE_DIR / "violation_events.json"
 VIOLATION_CAPTURES_DIR = BASE_DIR / "static" / "violation_captures"
 MAX_VIOLATION_EVENTS_PER_USER = 120
 VIOLATION_CAPTURE_COOLDOWN_SECONDS = 3.0
+# Per-frame analysis stages; independent ones run concurrently on a shared pool of this
+# many threads (0 runs them one after another on the request thread).
+ANALYSIS_STAGE_THREADS = 4
+ANALYSIS_PHONE_STAGE_ENABLED = True
+ANALYSIS_IDENTITY_STAGE_ENABLED = True
+# Admission control for /analyze_frame, per process. Past ADMISSION_MAX_IN_FLIGHT frames in
+# analysis, or ADMISSION_MAX_QUEUE_AGE_SECONDS spent waiting, only priority sessions (active
+# suspicion streaks, or not analyzed for ADMISSION_STALE_SESSION_SECONDS) are admitted;
+# the rest are answered at once as skipped with a retry hint. A limit of 0 is derived from the
+# threads serving requests in the process (REQUEST_THREADS_ENV, or ASGI_INFERENCE_THREADS under
+# ASGI): priority sessions may use all of them, others all but ADMISSION_PRIORITY_RESERVED_THREADS.
+ADMISSION_CONTROL_ENABLED = True
+ADMISSION_MAX_IN_FLIGHT = 0
+ADMISSION_PRIORITY_MAX_IN_FLIGHT = 0
+ADMISSION_PRIORITY_RESERVED_THREADS = 1
+REQUEST_THREADS_DEFAULT = 4
+REQUEST_THREADS_ENV = "PROCTORING_THREADS"
+# X-Request-Start is only read from these peers (comma-separated in the env var), since any
+# client could otherwise make its frames look stale or fresh.
+TRUSTED_PROXY_ADDRESSES: tuple[str, ...] = ()
+TRUSTED_PROXY_ADDRESSES_ENV = "PROCTORING_TRUSTED_PROXIES"
+ADMISSION_MAX_QUEUE_AGE_SECONDS = 1.0
+ADMISSION_PRIORITY_MAX_QUEUE_AGE_SECONDS = 3.0
+ADMISSION_STALE_SESSION_SECONDS = 10.0
+ADMISSION_RETRY_AFTER_MS = 1000
+MODEL_WARMUP_ENABLED = True
+MODEL_WARMUP_RUNS = 2
+# Set by gunicorn.conf.py: the master only loads models, each worker warms up after fork.
+MODEL_WARMUP_DEFER_ENV = "PROCTORING_PRELOAD_MASTER"
+# Native thread pools (OpenCV, torch, ONNX Runtime, BLAS) per process. 0 gives each process
+# an equal share of the cores it may run on, split across WORKERS_PER_NODE_ENV processes.
+CPU_THREAD_BUDGET = 0
+CPU_THREAD_BUDGET_ENV = "PROCTORING_CPU_THREADS"
+WORKERS_PER_NODE_ENV = "PROCTORING_WORKERS"
+CPU_TORCH_INTEROP_THREADS = 1
+# Pin each gunicorn worker to its own slice of the cores.
+CPU_AFFINITY_ENABLED = False
+CPU_AFFINITY_ENV = "PROCTORING_PIN_CPUS"
+SESSION_IDLE_TTL_SECONDS = 1800.0
+SESSION_MAX_ACTIVE = 5000
+# "memory" keeps sessions in this process; "sqlite" shares them between workers on one host.
+SESSION_STORE_BACKEND = "memory"
+SESSION_STORE_BACKEND_ENV = "PROCTORING_SESSION_STORE"
+SESSION_STORE_PATH = BASE_DIR / "session_state.sqlite3"
+# "all" serves every route; "api" never loads the vision models and forwards the
+# model-backed routes to INFERENCE_UPSTREAM_ENV; "inference" serves only those routes.
+APP_ROLE = "all"
+APP_ROLE_ENV = "PROCTORING_ROLE"
+INFERENCE_UPSTREAM_ENV = "PROCTORING_INFERENCE_URL"
+INFERENCE_UPSTREAM_TIMEOUT_SECONDS = 30.0
+# ASGI mode (asgi.py): request I/O stays on the event loop, views run on these pools.
+ASGI_INFERENCE_THREADS = 4
+ASGI_IO_THREADS = 32
+# Streamed bodies are pulled on their own pool. In ASGI mode event streams may use all of it but
+# ASGI_STREAM_RESERVED_THREADS, which stay free for ZIP exports and other streamed downloads.
+ASGI_STREAM_THREADS = 8
+ASGI_STREAM_RESERVED_THREADS = 2
+ASGI_MAX_BODY_BYTES = 16 * 1024 * 1024
+# Responses with a known length up to this size are produced in one executor hop.
+ASGI_BUFFERED_RESPONSE_BYTES = 1024 * 1024
+FRAME_BUFFER_SECONDS = 10.0
+FRAME_BUFFER_MAX_FRAMES_PER_SESSION = 30
+FRAME_BUFFER_MAX_TOTAL_MB = 64
+VIOLATION_CLIP_ENABLED = True
+VIOLATION_CLIP_PRE_SECONDS = 5.0
+VIOLATION_CLIP_POST_SECONDS = 3.0
+VIOLATION_CLIP_MAX_TILES = 9
+EVENT_QUERY_DEFAULT_LIMIT = 50
+EVENT_QUERY_MAX_LIMIT = 200
+ADMIN_USERS_DEFAULT_LIMIT = 100
+ADMIN_USERS_MAX_LIMIT = 500
+EVENT_STREAM_BACKLOG = 1000
+EVENT_STREAM_HEARTBEAT_SECONDS = 15.0
+# How often an idle stream checks for events recorded by other processes.
+EVENT_STREAM_SYNC_SECONDS = 1.0
+# Streams close after this long and the browser reconnects with Last-Event-ID,
+# so a reviewer never pins a worker thread indefinitely.
+EVENT_STREAM_MAX_SECONDS = 300.0
+# Each open stream holds a request thread, so a process refuses streams past this many with a
+# 503 and the dashboard falls back to polling. 0 allows half of the request threads.
+EVENT_STREAM_MAX_CONCURRENT = 0
+ROLLUP_BUCKET_SECONDS = 60
+ROLLUP_RETENTION_HOURS = 72
+ROLLUP_SNAPSHOT_FILE = BASE_DIR / "violation_rollups.json"
+ROLLUP_SNAPSHOT_INTERVAL_SECONDS = 30
+ANALYTICS_DEFAULT_WINDOW_SECONDS = 3600
+EVIDENCE_THUMBNAIL_WIDTH = 320
+EVIDENCE_CACHE_MAX_AGE_SECONDS = 31_536_000
+EVIDENCE_RETENTION_DAYS = 30
+EVIDENCE_MAX_TOTAL_MB = 2048
+EVIDENCE_ORPHAN_GRACE_SECONDS = 300
+EVIDENCE_GC_INTERVAL_SECONDS = 3600
+# Opt-in stack sampling of /analyze_frame, switched on from the admin API. Every process
+# writes its stacks under PROFILER_DIR, so the export covers all workers on the host.
+PROFILER_DIR = BASE_DIR / "profiles"
+PROFILER_DEFAULT_SAMPLE_RATE = 0.05
+PROFILER_DEFAULT_INTERVAL_MS = 5.0
+PROFILER_DEFAULT_DURATION_SECONDS = 600.0
+PROFILER_MAX_DURATION_SECONDS = 3600.0
+PROFILER_FLUSH_INTERVAL_SECONDS = 2.0
 
 MOBILE_UA_TOKENS = (
     "android",
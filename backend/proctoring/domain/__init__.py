@@ -1,3 +1,3 @@
-from .models import AnalysisResult, RegisteredUser
+from .models import AnalysisResult, FrameQuality, ReceivedFrame, RegisteredUser
 
-__all__ = ["AnalysisResult", "RegisteredUser"]
+__all__ = ["AnalysisResult", "FrameQuality", "ReceivedFrame", "RegisteredUser"]
@@ -10,6 +10,38 @@ class AnalysisResult:
     violations: list[str]
 
 
+@dataclass
+class ReceivedFrame:
+    image: np.ndarray
+    encoded: bytes
+
+    @property
+    def jpeg_bytes(self) -> bytes | None:
+        return self.encoded if self.encoded[:3] == b"\xff\xd8\xff" else None
+
+
+@dataclass
+class FrameQuality:
+    verdict: str
+    brightness: float
+    sharpness: float
+    overexposed_ratio: float
+    frame_delta: float | None
+
+    @property
+    def usable(self) -> bool:
+        return self.verdict == "ok"
+
+    def to_dict(self) -> dict[str, float | str | None]:
+        return {
+            "verdict": self.verdict,
+            "brightness": self.brightness,
+            "sharpness": self.sharpness,
+            "overexposed_ratio": self.overexposed_ratio,
+            "frame_delta": self.frame_delta,
+        }
+
+
 @dataclass
 class RegisteredUser:
     username: str
@@ -1,4 +1,24 @@
 from .persistence import load_registered_faces, save_registered_faces
 from .evidence import append_violation_event, load_violation_events
+from .evidence_export import EvidenceExportItem, iter_evidence_zip
+from .evidence_gc import EvidenceGcReport, collect_evidence_garbage, prune_empty_capture_dirs, scan_evidence_files
+from .event_index import ViolationEventIndex
+from .event_stream import StreamEvent, ViolationEventBroker
+from .rollups import ViolationRollups
+from .user_summary import UserSummaryIndex
 
-__all__ = ["load_registered_faces", "save_registered_faces", "append_violation_event", "load_violation_events"]
+__all__ = [
+    "load_registered_faces",
+    "save_registered_faces",
+    "append_violation_event",
+    "load_violation_events",
+    "EvidenceExportItem",
+    "iter_evidence_zip",
+    "EvidenceGcReport",
+    "collect_evidence_garbage",
+    "ViolationEventIndex",
+    "StreamEvent",
+    "ViolationEventBroker",
+    "ViolationRollups",
+    "UserSummaryIndex",
+]
@@ -0,0 +1,137 @@
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Any
+
+
+def event_epoch(event: dict[str, Any]) -> float:
+    try:
+        parsed = datetime.fromisoformat(str(event.get("timestamp", "")))
+    except ValueError:
+        return 0.0
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class ViolationEventIndex:
+    """
+    In-memory indexes over the violation event store.
+    Every event gets a monotonically increasing event_id, so each posting list
+    below is ordered by id and by time at once and can be bisected for cursors
+    and time ranges. Removed events are dropped lazily and compacted in bulk.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._next_id = 1
+        self._live: dict[int, tuple[str, dict[str, Any]]] = {}
+        self._epochs: dict[int, float] = {}
+        self._all: list[int] = []
+        self._by_user: dict[str, list[int]] = {}
+        self._by_type: dict[str, list[int]] = {}
+        self._by_user_type: dict[tuple[str, str], list[int]] = {}
+        self._dead = 0
+
+    @property
+    def last_event_id(self) -> int:
+        return self._next_id - 1
+
+    def rebuild(self, events: dict[str, list[dict[str, Any]]]) -> None:
+        with self._lock:
+            entries = [(event_epoch(event), user_key, event) for user_key, per_user in events.items() for event in per_user]
+            known_ids = [event["event_id"] for _, _, event in entries if isinstance(event.get("event_id"), int)]
+            self._next_id = max(known_ids, default=0) + 1
+            # Legacy events without ids are numbered in time order after the known ones.
+            for _, _, event in sorted(entries, key=lambda item: item[0]):
+                if not isinstance(event.get("event_id"), int):
+                    event["event_id"] = self._next_id
+                    self._next_id += 1
+
+            self._live = {}
+            self._epochs = {}
+            for epoch, user_key, event in entries:
+                self._live[event["event_id"]] = (user_key, event)
+                self._epochs[event["event_id"]] = epoch
+            self._reindex()
+
+    def add(self, user_key: str, event: dict[str, Any]) -> int:
+        """Index a new event. It keeps an id it already has (an event another worker appended) if that is newer."""
+        with self._lock:
+            event_id = event.get("event_id")
+            if not isinstance(event_id, int) or event_id < self._next_id:
+                event_id = self._next_id
+            self._next_id = event_id + 1
+            event["event_id"] = event_id
+            self._live[event_id] = (user_key, event)
+            self._epochs[event_id] = event_epoch(event)
+            self._all.append(event_id)
+            self._by_user.setdefault(user_key, []).append(event_id)
+            for violation in set(event.get("violations", [])):
+                self._by_type.setdefault(violation, []).append(event_id)
+                self._by_user_type.setdefault((user_key, violation), []).append(event_id)
+            return event_id
+
+    def remove(self, event: dict[str, Any]) -> None:
+        with self._lock:
+            if self._live.pop(event.get("event_id"), None) is None:
+                return
+            self._dead += 1
+            if self._dead > max(1024, len(self._live)):
+                self._reindex()
+
+    def get(self, event_id: int) -> tuple[str, dict[str, Any]] | None:
+        with self._lock:
+            return self._live.get(event_id)
+
+    def query(
+        self,
+        *,
+        user_key: str | None = None,
+        violation_type: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        before_id: int | None = None,
+        limit: int = 50,
+    ) -> tuple[list[tuple[str, dict[str, Any]]], int | None]:
+        """Newest-first page of matching events and the cursor for the next page."""
+        with self._lock:
+            if user_key and violation_type:
+                postings = self._by_user_type.get((user_key, violation_type), [])
+            elif user_key:
+                postings = self._by_user.get(user_key, [])
+            elif violation_type:
+                postings = self._by_type.get(violation_type, [])
+            else:
+                postings = self._all
+
+            epoch_of = self._epochs.__getitem__
+            lo = 0 if since is None else bisect_left(postings, since, key=epoch_of)
+            hi = len(postings) if until is None else bisect_right(postings, until, key=epoch_of)
+            if before_id is not None:
+                hi = min(hi, bisect_left(postings, before_id))
+
+            page: list[tuple[str, dict[str, Any]]] = []
+            idx = hi - 1
+            while idx >= lo and len(page) < limit:
+                entry = self._live.get(postings[idx])
+                if entry is not None:
+                    page.append(entry)
+                idx -= 1
+
+            next_cursor = page[-1][1]["event_id"] if page and idx >= lo else None
+            return page, next_cursor
+
+    def _reindex(self) -> None:
+        self._epochs = {event_id: self._epochs[event_id] for event_id in self._live}
+        self._all = sorted(self._live)
+        self._by_user = {}
+        self._by_type = {}
+        self._by_user_type = {}
+        for event_id in self._all:
+            user_key, event = self._live[event_id]
+            self._by_user.setdefault(user_key, []).append(event_id)
+            for violation in set(event.get("violations", [])):
+                self._by_type.setdefault(violation, []).append(event_id)
+                self._by_user_type.setdefault((user_key, violation), []).append(event_id)
+        self._dead = 0
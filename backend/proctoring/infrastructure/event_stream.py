@@ -0,0 +1,80 @@
+import secrets
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    seq: int
+    kind: str
+    user_key: str
+    data: dict[str, Any]
+
+
+class ViolationEventBroker:
+    """
+    Fan-out of live admin events to long-lived stream connections.
+    Recent events stay in a bounded backlog so a reconnecting client can resume
+    from its Last-Event-ID. Ids carry a per-process generation; an id from an
+    older process or one that fell out of the backlog asks the client to reload.
+    At most max_streams connections are open at once, since each holds a thread.
+    """
+
+    def __init__(self, backlog: int, max_streams: int) -> None:
+        self.generation = secrets.token_hex(4)
+        self.max_streams = max(1, int(max_streams))
+        self.open_streams = 0
+        self._backlog: deque[StreamEvent] = deque(maxlen=max(1, int(backlog)))
+        self._seq = 0
+        self._condition = threading.Condition()
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def try_open_stream(self) -> bool:
+        with self._condition:
+            if self.open_streams >= self.max_streams:
+                return False
+            self.open_streams += 1
+            return True
+
+    def close_stream(self) -> None:
+        with self._condition:
+            self.open_streams = max(0, self.open_streams - 1)
+
+    def format_id(self, seq: int) -> str:
+        return f"{self.generation}-{seq}"
+
+    def parse_id(self, value: Any) -> int | None:
+        """Sequence number to resume after, or None when the id cannot be resumed from."""
+        generation, _, raw_seq = str(value or "").strip().rpartition("-")
+        if generation != self.generation:
+            return None
+        try:
+            seq = int(raw_seq)
+        except ValueError:
+            return None
+        with self._condition:
+            oldest = self._backlog[0].seq if self._backlog else self._seq + 1
+            if seq > self._seq or seq < oldest - 1:
+                return None
+        return seq
+
+    def publish(self, kind: str, user_key: str, data: dict[str, Any]) -> StreamEvent:
+        with self._condition:
+            self._seq += 1
+            event = StreamEvent(seq=self._seq, kind=kind, user_key=user_key, data=data)
+            self._backlog.append(event)
+            self._condition.notify_all()
+            return event
+
+    def wait_for(self, after_seq: int, timeout: float) -> list[StreamEvent]:
+        with self._condition:
+            if self._seq <= after_seq:
+                self._condition.wait_for(lambda: self._seq > after_seq, timeout=timeout)
+            if self._seq <= after_seq:
+                return []
+            return [event for event in self._backlog if event.seq > after_seq]
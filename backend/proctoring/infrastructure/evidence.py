@@ -1,12 +1,17 @@
 import json
+import os
+import re
 from datetime import datetime, timezone
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from typing import Any
 from uuid import uuid4
 
-import cv2
 import numpy as np
 
+from proctoring.infrastructure.event_index import ViolationEventIndex
+
+_UNSAFE_PATH_CHARS_RE = re.compile(r"[^a-z0-9._-]+")
+
 
 def load_violation_events(file_path: Path) -> dict[str, list[dict[str, Any]]]:
     if not file_path.exists():
@@ -32,14 +37,19 @@ def load_violation_events(file_path: Path) -> dict[str, list[dict[str, Any]]]:
             violations = item.get("violations", [])
             if not image_path or not timestamp or not isinstance(violations, list):
                 continue
-            clean_items.append(
-                {
-                    "timestamp": timestamp,
-                    "image_path": image_path,
-                    "violations": [str(v) for v in violations if isinstance(v, str)],
-                    "username": str(item.get("username", "")).strip(),
-                }
-            )
+            clean_item = {
+                "timestamp": timestamp,
+                "image_path": image_path,
+                "violations": [str(v) for v in violations if isinstance(v, str)],
+                "username": str(item.get("username", "")).strip(),
+            }
+            clip_path = str(item.get("clip_path", "") or "").strip()
+            if clip_path:
+                clean_item["clip_path"] = clip_path
+            event_id = item.get("event_id")
+            if isinstance(event_id, int) and not isinstance(event_id, bool):
+                clean_item["event_id"] = event_id
+            clean_items.append(clean_item)
         events[key] = clean_items
     return events
 
@@ -48,6 +58,91 @@ def persist_violation_events(file_path: Path, events: dict[str, list[dict[str, A
     file_path.write_text(json.dumps(events, indent=2), encoding="utf-8")
 
 
+def evidence_user_dir_name(user_key: str) -> str:
+    return _UNSAFE_PATH_CHARS_RE.sub("_", user_key.strip().lower()).strip("._") or "_"
+
+
+def resolve_evidence_path(captures_dir: Path, relative_path: str) -> Path | None:
+    relative_path = str(relative_path or "").strip()
+    if not relative_path:
+        return None
+    root = captures_dir.resolve()
+    candidate = (captures_dir.parent / relative_path).resolve()
+    if candidate == root or root not in candidate.parents:
+        return None
+    return candidate
+
+
+def thumbnail_relative_path(relative_path: str) -> str:
+    path = PurePosixPath(str(relative_path).strip())
+    return str(path.with_name(f"{path.stem}.thumb.jpg"))
+
+
+def write_evidence_thumbnail(
+    source_path: Path,
+    thumbnail_path: Path,
+    width: int,
+    encoded: bytes | None = None,
+) -> bool:
+    # Imported on use so API-only processes never load OpenCV.
+    import cv2
+
+    data = encoded if encoded is not None else source_path.read_bytes()
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_REDUCED_COLOR_2)
+    if image is None:
+        return False
+    image_h, image_w = image.shape[:2]
+    if image_w > width:
+        target_h = max(1, int(round(image_h * (width / float(image_w)))))
+        image = cv2.resize(image, (width, target_h), interpolation=cv2.INTER_AREA)
+    ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 75])
+    if not ok:
+        return False
+    partial_path = thumbnail_path.with_name(thumbnail_path.name + ".part")
+    partial_path.write_bytes(buffer.tobytes())
+    os.replace(partial_path, thumbnail_path)
+    return True
+
+
+def ensure_evidence_thumbnail(captures_dir: Path, relative_path: str, width: int) -> Path | None:
+    source_path = resolve_evidence_path(captures_dir, relative_path)
+    thumbnail_path = resolve_evidence_path(captures_dir, thumbnail_relative_path(relative_path))
+    if source_path is None or thumbnail_path is None or not source_path.is_file():
+        return None
+    if thumbnail_path.is_file():
+        return thumbnail_path
+    try:
+        if not write_evidence_thumbnail(source_path, thumbnail_path, width):
+            return None
+    except OSError:
+        return None
+    return thumbnail_path
+
+
+def event_file_paths(event: dict[str, Any]) -> list[str]:
+    image_path = str(event.get("image_path", "")).strip()
+    paths = [image_path, thumbnail_relative_path(image_path)] if image_path else []
+    clip_path = str(event.get("clip_path", "") or "").strip()
+    if clip_path:
+        paths.append(clip_path)
+    return paths
+
+
+def delete_event_files(captures_dir: Path, event: dict[str, Any]) -> int:
+    freed = 0
+    for relative_path in event_file_paths(event):
+        full_path = resolve_evidence_path(captures_dir, relative_path)
+        if full_path is None:
+            continue
+        try:
+            size = full_path.stat().st_size
+            full_path.unlink()
+        except OSError:
+            continue
+        freed += size
+    return freed
+
+
 def append_violation_event(
     *,
     events: dict[str, list[dict[str, Any]]],
@@ -56,29 +151,65 @@ def append_violation_event(
     user_key: str,
     username: str,
     violations: list[str],
-    frame_bgr: np.ndarray,
     max_events_per_user: int,
+    frame_bgr: np.ndarray | None = None,
+    encoded_jpeg: bytes | None = None,
+    with_clip: bool = False,
+    thumbnail_width: int = 0,
+    index: ViolationEventIndex | None = None,
 ) -> dict[str, Any]:
-    captures_dir.mkdir(parents=True, exist_ok=True)
+    now = datetime.now(timezone.utc)
+    user_dir = evidence_user_dir_name(user_key)
+    # Shard by user and day so no single directory grows with the whole exam history.
+    shard = Path(user_dir) / now.strftime("%Y-%m-%d")
+    (captures_dir / shard).mkdir(parents=True, exist_ok=True)
 
-    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
-    filename = f"{user_key.replace(' ', '_')}_{ts}_{uuid4().hex[:8]}.jpg"
-    full_image_path = captures_dir / filename
-    if not cv2.imwrite(str(full_image_path), frame_bgr):
-        raise OSError("Could not save violation capture image")
+    stem = f"{user_dir}_{now.strftime('%Y%m%dT%H%M%S%fZ')}_{uuid4().hex[:8]}"
+    filename = f"{stem}.jpg"
+    full_image_path = captures_dir / shard / filename
+    if encoded_jpeg is not None:
+        # Store the candidate's upload as-is; re-encoding is only needed for drawn-on frames.
+        full_image_path.write_bytes(encoded_jpeg)
+    else:
+        import cv2
+
+        if frame_bgr is None or not cv2.imwrite(str(full_image_path), frame_bgr):
+            raise OSError("Could not save violation capture image")
+    if thumbnail_width > 0:
+        try:
+            write_evidence_thumbnail(
+                full_image_path,
+                full_image_path.with_name(f"{stem}.thumb.jpg"),
+                thumbnail_width,
+                encoded=encoded_jpeg,
+            )
+        except OSError:
+            pass  # Served lazily by ensure_evidence_thumbnail instead.
 
-    relative_image_path = str(Path("violation_captures") / filename).replace("\\", "/")
+    relative_image_path = (Path(captures_dir.name) / shard / filename).as_posix()
     event = {
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": now.isoformat(),
         "image_path": relative_image_path,
         "violations": violations,
         "username": username,
     }
+    if with_clip:
+        # The clip is written later by ViolationClipWriter once the post-event frames arrive.
+        event["clip_path"] = (Path(captures_dir.name) / shard / f"{stem}_clip.jpg").as_posix()
 
     per_user = events.setdefault(user_key, [])
     per_user.append(event)
+    if index is not None:
+        index.add(user_key, event)
+    dropped: list[dict[str, Any]] = []
     if len(per_user) > max_events_per_user:
+        dropped = per_user[: len(per_user) - max_events_per_user]
         del per_user[: len(per_user) - max_events_per_user]
+        if index is not None:
+            for old_event in dropped:
+                index.remove(old_event)
 
     persist_violation_events(file_path, events)
+    for old_event in dropped:
+        delete_event_files(captures_dir, old_event)
     return event
@@ -0,0 +1,117 @@
+import json
+import zipfile
+from collections.abc import Generator, Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from proctoring.domain import RegisteredUser
+from proctoring.infrastructure.evidence import evidence_user_dir_name, resolve_evidence_path
+
+EXPORT_CHUNK_SIZE = 256 * 1024
+
+
+@dataclass
+class EvidenceExportItem:
+    user_key: str
+    user: RegisteredUser | None
+    events: list[dict[str, Any]] = field(default_factory=list)
+
+
+class _ZipOutputStream:
+    """Write-only, non-seekable sink; zipfile then streams entries with data descriptors."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+            self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_evidence_zip(
+    items: Iterable[EvidenceExportItem],
+    captures_dir: Path,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive of candidate evidence piece by piece.
+    Nothing is buffered beyond one file chunk, and captures are stored rather
+    than deflated because JPEG data does not compress further.
+    """
+    for chunk in _iter_archive(items, captures_dir, chunk_size):
+        if chunk:
+            yield chunk
+
+
+def _iter_archive(
+    items: Iterable[EvidenceExportItem],
+    captures_dir: Path,
+    chunk_size: int,
+) -> Iterator[bytes]:
+    sink = _ZipOutputStream()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+        for item in items:
+            folder = evidence_user_dir_name(item.user_key)
+            exported_events: list[dict[str, Any]] = []
+            for event in item.events:
+                exported = dict(event)
+                for field_name in ("image_path", "clip_path"):
+                    relative_path = str(event.get(field_name, "") or "").strip()
+                    full_path = resolve_evidence_path(captures_dir, relative_path)
+                    if full_path is None or not full_path.is_file():
+                        exported[field_name] = None
+                        continue
+                    archive_name = f"{folder}/captures/{full_path.name}"
+                    written = yield from _write_file(archive, sink, full_path, archive_name, chunk_size)
+                    exported[field_name] = f"captures/{full_path.name}" if written else None
+                exported_events.append(exported)
+
+            if item.user is not None:
+                profile = {
+                    "user_key": item.user_key,
+                    "username": item.user.username,
+                    "first_name": item.user.first_name,
+                    "last_name": item.user.last_name,
+                    "email": item.user.email,
+                    "samples": len(item.user.signatures),
+                }
+                archive.writestr(f"{folder}/profile.json", json.dumps(profile, indent=2))
+            archive.writestr(f"{folder}/events.json", json.dumps(exported_events, indent=2))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def _write_file(
+    archive: zipfile.ZipFile,
+    sink: _ZipOutputStream,
+    full_path: Path,
+    archive_name: str,
+    chunk_size: int,
+) -> Generator[bytes, None, bool]:
+    try:
+        info = zipfile.ZipInfo.from_file(full_path, archive_name)
+        source = full_path.open("rb")
+    except OSError:
+        # Collected between listing and reading.
+        return False
+    info.compress_type = zipfile.ZIP_STORED
+    with source, archive.open(info, mode="w", force_zip64=True) as target:
+        while chunk := source.read(chunk_size):
+            target.write(chunk)
+            yield sink.drain()
+    return True
@@ -0,0 +1,172 @@
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from proctoring.infrastructure.event_index import event_epoch
+from proctoring.infrastructure.evidence import (
+    delete_event_files,
+    event_file_paths,
+    persist_violation_events,
+    resolve_evidence_path,
+)
+
+
+@dataclass
+class EvidenceGcReport:
+    expired_events: int = 0
+    quota_events: int = 0
+    missing_events: int = 0
+    orphan_files: int = 0
+    freed_bytes: int = 0
+    total_bytes: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def scan_evidence_files(captures_dir: Path) -> dict[Path, tuple[int, float]]:
+    """Size and mtime of every file under captures_dir, keyed by resolved path."""
+    files: dict[Path, tuple[int, float]] = {}
+    if not captures_dir.exists():
+        return files
+    for path in captures_dir.rglob("*"):
+        try:
+            if not path.is_file():
+                continue
+            stat = path.stat()
+        except OSError:
+            continue
+        files[path.resolve()] = (stat.st_size, stat.st_mtime)
+    return files
+
+
+def prune_empty_capture_dirs(captures_dir: Path, min_age_seconds: float = 0.0, now: float | None = None) -> None:
+    """Remove empty directories under captures_dir untouched for min_age_seconds, so a capture writing into one is safe."""
+    if not captures_dir.exists():
+        return
+    now_ts = datetime.now(timezone.utc).timestamp() if now is None else float(now)
+    for path in sorted(captures_dir.rglob("*"), key=lambda item: len(item.parts), reverse=True):
+        try:
+            if not path.is_dir() or (now_ts - path.stat().st_mtime) < min_age_seconds:
+                continue
+            path.rmdir()
+        except OSError:
+            continue
+
+
+def collect_evidence_garbage(
+    *,
+    events: dict[str, list[dict[str, Any]]],
+    file_path: Path,
+    captures_dir: Path,
+    max_age_seconds: float,
+    max_total_bytes: int,
+    orphan_grace_seconds: float,
+    now: float | None = None,
+    dry_run: bool = False,
+    files: dict[Path, tuple[int, float]] | None = None,
+) -> EvidenceGcReport:
+    """
+    Reconcile the capture directory with the event store and apply retention.
+    Events older than max_age_seconds or whose image is gone are dropped, files
+    no event references are deleted, then the oldest events are dropped until
+    the referenced files fit in max_total_bytes. Non-positive limits are disabled.
+
+    files is an earlier scan_evidence_files result, so the slow directory walk
+    can happen outside whatever lock guards the events. Referenced files that
+    were written after that scan are looked up one by one, and empty
+    directories are left to prune_empty_capture_dirs.
+    """
+    now_ts = datetime.now(timezone.utc).timestamp() if now is None else float(now)
+    report = EvidenceGcReport()
+    prescanned = files is not None
+    files = dict(files) if files is not None else scan_evidence_files(captures_dir)
+
+    def present(path: Path) -> bool:
+        if path in files:
+            return True
+        if not prescanned:
+            return False
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        files[path] = (stat.st_size, stat.st_mtime)
+        return True
+
+    kept: list[tuple[float, str, dict[str, Any], int]] = []
+    dropped: list[dict[str, Any]] = []
+    referenced: set[Path] = set()
+    for user_key, per_user in events.items():
+        for event in per_user:
+            for relative_path in event_file_paths(event):
+                full_path = resolve_evidence_path(captures_dir, relative_path)
+                if full_path is not None:
+                    referenced.add(full_path)
+
+            image_path = resolve_evidence_path(captures_dir, str(event.get("image_path", "")))
+            if image_path is None or not present(image_path):
+                report.missing_events += 1
+                dropped.append(event)
+                continue
+            event_ts = event_epoch(event)
+            if max_age_seconds > 0 and (now_ts - event_ts) > max_age_seconds:
+                report.expired_events += 1
+                dropped.append(event)
+                continue
+
+            size = 0
+            for relative_path in event_file_paths(event):
+                full_path = resolve_evidence_path(captures_dir, relative_path)
+                if full_path is not None and present(full_path):
+                    size += files[full_path][0]
+            kept.append((event_ts, user_key, event, size))
+
+    orphans = [
+        path
+        for path, (_, mtime) in files.items()
+        if path not in referenced and (now_ts - mtime) > orphan_grace_seconds
+    ]
+
+    total_bytes = sum(size for _, _, _, size in kept)
+    if max_total_bytes > 0 and total_bytes > max_total_bytes:
+        kept.sort(key=lambda item: item[0])
+        while kept and total_bytes > max_total_bytes:
+            _, _, event, size = kept.pop(0)
+            total_bytes -= size
+            report.quota_events += 1
+            dropped.append(event)
+    report.total_bytes = total_bytes
+    report.orphan_files = len(orphans)
+
+    if dry_run:
+        report.freed_bytes = sum(files[path][0] for path in orphans)
+        for event in dropped:
+            for relative_path in event_file_paths(event):
+                full_path = resolve_evidence_path(captures_dir, relative_path)
+                if full_path is not None and full_path in files:
+                    report.freed_bytes += files[full_path][0]
+        return report
+
+    if dropped:
+        dropped_ids = {id(event) for event in dropped}
+        for user_key in list(events):
+            remaining = [event for event in events[user_key] if id(event) not in dropped_ids]
+            if remaining:
+                events[user_key] = remaining
+            else:
+                del events[user_key]
+        persist_violation_events(file_path, events)
+        for event in dropped:
+            report.freed_bytes += delete_event_files(captures_dir, event)
+
+    for path in orphans:
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        report.freed_bytes += files[path][0]
+    if not prescanned:
+        prune_empty_capture_dirs(captures_dir)
+    return report
@@ -0,0 +1,184 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+class FrameRingBuffer:
+    """
+    Last few seconds of each session's uploads, kept as the compressed bytes.
+    Total size is capped globally; when over budget the least recently active
+    session loses its oldest frames first.
+    """
+
+    def __init__(self, window_seconds: float, max_frames_per_session: int, max_total_bytes: int) -> None:
+        self.window_seconds = float(window_seconds)
+        self.max_frames_per_session = max(1, int(max_frames_per_session))
+        self.max_total_bytes = max(0, int(max_total_bytes))
+        self._sessions: OrderedDict[str, deque[tuple[float, bytes]]] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def append(self, session_key: str, timestamp: float, data: bytes) -> None:
+        if not data or len(data) > self.max_total_bytes:
+            return
+        with self._lock:
+            frames = self._sessions.get(session_key)
+            if frames is None:
+                frames = deque()
+                self._sessions[session_key] = frames
+            else:
+                self._sessions.move_to_end(session_key)
+
+            frames.append((float(timestamp), data))
+            self._total_bytes += len(data)
+            while frames and (
+                len(frames) > self.max_frames_per_session or frames[0][0] < timestamp - self.window_seconds
+            ):
+                self._total_bytes -= len(frames.popleft()[1])
+
+            while self._total_bytes > self.max_total_bytes and self._sessions:
+                lru_key, lru_frames = next(iter(self._sessions.items()))
+                self._total_bytes -= len(lru_frames.popleft()[1])
+                if not lru_frames:
+                    del self._sessions[lru_key]
+
+    def snapshot(self, session_key: str, start_ts: float, end_ts: float) -> list[tuple[float, bytes]]:
+        with self._lock:
+            frames = self._sessions.get(session_key)
+            if not frames:
+                return []
+            return [(ts, data) for ts, data in frames if start_ts <= ts <= end_ts]
+
+    def discard(self, session_key: str) -> None:
+        with self._lock:
+            frames = self._sessions.pop(session_key, None)
+            if frames:
+                self._total_bytes -= sum(len(data) for _, data in frames)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "frames": sum(len(frames) for frames in self._sessions.values()),
+                "total_bytes": self._total_bytes,
+                "max_total_bytes": self.max_total_bytes,
+            }
+
+
+def write_contact_sheet(
+    frames: list[tuple[float, bytes]],
+    output_path: Path,
+    center_ts: float,
+    max_tiles: int,
+    tile_width: int = 320,
+) -> bool:
+    if not frames:
+        return False
+    if len(frames) > max_tiles:
+        picks = np.linspace(0, len(frames) - 1, max_tiles).round().astype(int)
+        frames = [frames[idx] for idx in picks]
+
+    tiles: list[np.ndarray] = []
+    for ts, data in frames:
+        # Reduced decode is much cheaper than a full decode followed by a resize.
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_REDUCED_COLOR_2)
+        if image is None:
+            continue
+        tile_h = max(1, int(round(image.shape[0] * (tile_width / float(image.shape[1])))))
+        tile = cv2.resize(image, (tile_width, tile_h), interpolation=cv2.INTER_AREA)
+        label = f"{ts - center_ts:+.1f}s"
+        cv2.putText(tile, label, (8, 22), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 3, cv2.LINE_AA)
+        cv2.putText(tile, label, (8, 22), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1, cv2.LINE_AA)
+        tiles.append(tile)
+    if not tiles:
+        return False
+
+    tile_h = max(tile.shape[0] for tile in tiles)
+    columns = int(np.ceil(np.sqrt(len(tiles))))
+    rows = int(np.ceil(len(tiles) / columns))
+    sheet = np.zeros((rows * tile_h, columns * tile_width, 3), dtype=np.uint8)
+    for idx, tile in enumerate(tiles):
+        row, column = divmod(idx, columns)
+        sheet[row * tile_h : row * tile_h + tile.shape[0], column * tile_width : (column + 1) * tile_width] = tile
+
+    ok, encoded = cv2.imencode(".jpg", sheet, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    if not ok:
+        return False
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename so the evidence view never serves a half-written sheet.
+    partial_path = output_path.with_name(output_path.name + ".part")
+    partial_path.write_bytes(encoded.tobytes())
+    os.replace(partial_path, output_path)
+    return True
+
+
+class ViolationClipWriter:
+    """
+    Writes a contact sheet of the frames around a violation once the post-event
+    window has been buffered. A flusher thread, started with the first clip,
+    calls poll() when the next clip falls due, so a clip is written even if
+    the candidate stops uploading. The JPEG work runs on a single background thread.
+    """
+
+    def __init__(
+        self,
+        frame_buffer: FrameRingBuffer,
+        pre_seconds: float,
+        post_seconds: float,
+        max_tiles: int,
+    ) -> None:
+        self._frame_buffer = frame_buffer
+        self.pre_seconds = float(pre_seconds)
+        self.post_seconds = float(post_seconds)
+        self.max_tiles = max(1, int(max_tiles))
+        self._pending: list[tuple[float, str, float, Path]] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._flusher: threading.Thread | None = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="violation-clip")
+
+    def schedule(self, session_key: str, center_ts: float, output_path: Path) -> None:
+        with self._lock:
+            self._pending.append((center_ts + self.post_seconds, session_key, center_ts, output_path))
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_due_clips, name="violation-clip-flush", daemon=True)
+                self._flusher.start()
+            self._wakeup.notify()
+
+    def _flush_due_clips(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._wakeup.wait()
+                    continue
+                delay = min(item[0] for item in self._pending) - time.time()
+                if delay > 0:
+                    self._wakeup.wait(delay)
+                    continue
+            self.poll(time.time())
+
+    def poll(self, now_ts: float) -> None:
+        with self._lock:
+            due = [item for item in self._pending if item[0] <= now_ts]
+            if not due:
+                return
+            self._pending = [item for item in self._pending if item[0] > now_ts]
+
+        for _, session_key, center_ts, output_path in due:
+            frames = self._frame_buffer.snapshot(
+                session_key,
+                center_ts - self.pre_seconds,
+                center_ts + self.post_seconds,
+            )
+            if frames:
+                self._executor.submit(write_contact_sheet, frames, output_path, center_ts, self.max_tiles)
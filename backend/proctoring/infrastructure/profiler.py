@@ -0,0 +1,289 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from collections.abc import Callable
+from concurrent.futures import Executor, Future
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from types import FrameType
+from typing import Any, TypeVar
+
+from proctoring.config import BASE_DIR
+
+SETTINGS_FILE_NAME = "settings.json"
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+T = TypeVar("T")
+StackFrame = tuple[str, str, int]
+Stack = tuple[StackFrame, ...]
+
+
+@dataclass
+class ProfilerSettings:
+    enabled: bool = False
+    session_id: str = ""
+    sample_rate: float = 0.0
+    user_key: str = ""
+    interval_ms: float = 5.0
+    started_at: float = 0.0
+    expires_at: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any]) -> "ProfilerSettings":
+        return cls(
+            enabled=bool(payload.get("enabled", False)),
+            session_id=str(payload.get("session_id", "")),
+            sample_rate=float(payload.get("sample_rate", 0.0)),
+            user_key=str(payload.get("user_key", "")),
+            interval_ms=max(1.0, float(payload.get("interval_ms", 5.0))),
+            started_at=float(payload.get("started_at", 0.0)),
+            expires_at=float(payload.get("expires_at", 0.0)),
+        )
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of threads running profiled calls. While it is
+    off a request pays one flag check; while on, a single sampler thread wakes
+    every interval only as long as some profiled call is in flight. Time spent
+    inside native code (MediaPipe graphs, torch, ONNX Runtime) is charged to
+    the Python frame that called into it.
+    """
+
+    def __init__(self) -> None:
+        self.settings = ProfilerSettings()
+        self.requests = 0
+        self.samples = 0
+        self._stacks: Counter[Stack] = Counter()
+        self._tracked: dict[int, tuple[str, FrameType]] = {}
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._sampler: threading.Thread | None = None
+        self._last_flush = 0.0
+
+    def configure(self, settings: ProfilerSettings) -> None:
+        with self._lock:
+            if settings.session_id != self.settings.session_id:
+                self._stacks.clear()
+                self.requests = 0
+                self.samples = 0
+            self.settings = settings
+
+    def should_profile(self, user_key: str, now_ts: float) -> bool:
+        settings = self.settings
+        if not settings.enabled or now_ts >= settings.expires_at:
+            return False
+        if settings.user_key and settings.user_key != user_key:
+            return False
+        return random.random() < settings.sample_rate
+
+    def call(self, label: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Runs fn with this thread's stacks sampled under label; frames above this call are left out."""
+        ident = threading.get_ident()
+        with self._lock:
+            self._tracked[ident] = (label, sys._getframe())
+            self._active.set()
+            self._ensure_sampler()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._tracked.pop(ident, None)
+                if not self._tracked:
+                    self._active.clear()
+
+    def profile_request(self, label: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        with self._lock:
+            self.requests += 1
+        return self.call(label, fn, *args, **kwargs)
+
+    def wrap_executor(self, executor: Executor | None, label: str) -> Executor | None:
+        """An executor whose tasks are sampled under label too, so work handed to a pool is not lost."""
+        return None if executor is None else _ProfiledExecutor(self, executor, label)
+
+    def maybe_flush(self, directory: Path, now_ts: float, interval_seconds: float) -> None:
+        if now_ts - self._last_flush >= interval_seconds:
+            self.flush(directory)
+
+    def flush(self, directory: Path) -> None:
+        """Writes this process's stacks for the current session, for export from any process."""
+        with self._lock:
+            session_id = self.settings.session_id
+            payload = {
+                "pid": os.getpid(),
+                "requests": self.requests,
+                "samples": self.samples,
+                "interval_ms": self.settings.interval_ms,
+                "stacks": [[[list(frame) for frame in stack], count] for stack, count in self._stacks.items()],
+            }
+            self._last_flush = time.time()
+        if not session_id or not (payload["requests"] or payload["samples"]):
+            return
+        file_path = directory / session_id / f"{os.getpid()}.json"
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = file_path.with_name(file_path.name + ".part")
+        partial_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(partial_path, file_path)
+
+    def stats(self) -> dict[str, Any]:
+        return {"requests": self.requests, "samples": self.samples, "active_threads": len(self._tracked)}
+
+    def _ensure_sampler(self) -> None:
+        if self._sampler is None or not self._sampler.is_alive():
+            self._sampler = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self) -> None:
+        sampler_ident = threading.get_ident()
+        while True:
+            self._active.wait()
+            time.sleep(self.settings.interval_ms / 1000.0)
+            frames = sys._current_frames()
+            with self._lock:
+                tracked = list(self._tracked.items())
+            stacks: list[Stack] = []
+            for ident, (label, base) in tracked:
+                frame = frames.get(ident)
+                if frame is None or ident == sampler_ident:
+                    continue
+                stack: list[StackFrame] = []
+                while frame is not None and frame is not base:
+                    code = frame.f_code
+                    stack.append((code.co_name, _short_path(code.co_filename), code.co_firstlineno))
+                    frame = frame.f_back
+                stack.append((label, "", 0))
+                stacks.append(tuple(reversed(stack)))
+            del frames
+            with self._lock:
+                self._stacks.update(stacks)
+                self.samples += len(stacks)
+
+
+class _ProfiledExecutor(Executor):
+    def __init__(self, profiler: SamplingProfiler, inner: Executor, label: str) -> None:
+        self._profiler = profiler
+        self._inner = inner
+        self._label = label
+
+    def submit(self, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> "Future[T]":
+        return self._inner.submit(self._profiler.call, self._label, fn, *args, **kwargs)
+
+
+def load_profiler_settings(directory: Path) -> ProfilerSettings:
+    try:
+        payload = json.loads((directory / SETTINGS_FILE_NAME).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return ProfilerSettings()
+    return ProfilerSettings.from_dict(payload if isinstance(payload, dict) else {})
+
+
+def save_profiler_settings(directory: Path, settings: ProfilerSettings) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    file_path = directory / SETTINGS_FILE_NAME
+    partial_path = file_path.with_name(file_path.name + ".part")
+    partial_path.write_text(json.dumps(settings.to_dict()), encoding="utf-8")
+    os.replace(partial_path, file_path)
+
+
+def load_session_profiles(directory: Path, session_id: str) -> tuple[Counter[Stack], dict[str, Any]]:
+    """Stacks merged across every process that profiled this session, plus totals."""
+    stacks: Counter[Stack] = Counter()
+    totals = {"processes": 0, "requests": 0, "samples": 0, "interval_ms": 0.0}
+    session_dir = directory / session_id
+    if not session_id or not session_dir.is_dir():
+        return stacks, totals
+    for file_path in sorted(session_dir.glob("*.json")):
+        try:
+            payload = json.loads(file_path.read_text(encoding="utf-8"))
+            for frames, count in payload.get("stacks", []):
+                stacks[tuple((str(name), str(path), int(line)) for name, path, line in frames)] += int(count)
+        except (OSError, ValueError, TypeError):
+            continue
+        totals["processes"] += 1
+        totals["requests"] += int(payload.get("requests", 0))
+        totals["samples"] += int(payload.get("samples", 0))
+        totals["interval_ms"] = float(payload.get("interval_ms", totals["interval_ms"]))
+    return stacks, totals
+
+
+def remove_other_sessions(directory: Path, keep_session_id: str) -> None:
+    if not directory.is_dir():
+        return
+    for session_dir in directory.iterdir():
+        if session_dir.is_dir() and session_dir.name != keep_session_id:
+            for file_path in session_dir.iterdir():
+                file_path.unlink(missing_ok=True)
+            session_dir.rmdir()
+
+
+def format_collapsed(stacks: Counter[Stack]) -> str:
+    """Brendan Gregg's folded format, as read by flamegraph.pl, speedscope and most flame graph viewers."""
+    lines = [
+        ";".join(_frame_label(frame) for frame in stack) + f" {count}"
+        for stack, count in sorted(stacks.items(), key=lambda item: -item[1])
+    ]
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def build_speedscope(stacks: Counter[Stack], name: str, interval_ms: float) -> dict[str, Any]:
+    frame_ids: dict[StackFrame, int] = {}
+    frames: list[dict[str, Any]] = []
+    samples: list[list[int]] = []
+    weights: list[float] = []
+    for stack, count in stacks.items():
+        sample: list[int] = []
+        for frame in stack:
+            if frame not in frame_ids:
+                frame_ids[frame] = len(frames)
+                entry: dict[str, Any] = {"name": frame[0]}
+                if frame[1]:
+                    entry["file"] = frame[1]
+                    entry["line"] = frame[2]
+                frames.append(entry)
+            sample.append(frame_ids[frame])
+        samples.append(sample)
+        weights.append(count * interval_ms)
+    return {
+        "$schema": SPEEDSCOPE_SCHEMA,
+        "name": name,
+        "exporter": "proctoring-tool",
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+def _frame_label(frame: StackFrame) -> str:
+    name, path, line = frame
+    label = f"{name} ({path}:{line})" if path else name
+    # ";" separates frames in the folded format.
+    return label.replace(";", ",")
+
+
+@lru_cache(maxsize=4096)
+def _short_path(path: str) -> str:
+    marker = "site-packages" + os.sep
+    if marker in path:
+        return path.split(marker, 1)[1]
+    try:
+        return str(Path(path).relative_to(BASE_DIR))
+    except ValueError:
+        return path
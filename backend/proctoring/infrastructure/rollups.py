@@ -0,0 +1,193 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from proctoring.infrastructure.event_index import event_epoch
+
+SNAPSHOT_VERSION = 1
+MAX_SERIES_POINTS = 1440
+
+
+class ViolationRollups:
+    """
+    Violation counts bucketed by time: globally, per violation type, per user
+    and per user and type.
+    Counts are added as events are recorded and are not reduced when evidence is
+    trimmed or collected. last_event_id records how far the event store has
+    been folded in, so a restart only replays the newer events.
+    """
+
+    def __init__(self, bucket_seconds: int, retention_seconds: float) -> None:
+        self.bucket_seconds = max(1, int(bucket_seconds))
+        self.retention_seconds = float(retention_seconds)
+        self.last_event_id = 0
+        self._global: dict[int, int] = {}
+        self._by_type: dict[str, dict[int, int]] = {}
+        self._by_user: dict[str, dict[int, int]] = {}
+        self._by_user_type: dict[str, dict[int, int]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def record(self, user_key: str, event: dict[str, Any]) -> bool:
+        event_id = event.get("event_id")
+        with self._lock:
+            if not isinstance(event_id, int) or event_id <= self.last_event_id:
+                return False
+            bucket = int(event_epoch(event) // self.bucket_seconds) * self.bucket_seconds
+            self._global[bucket] = self._global.get(bucket, 0) + 1
+            per_user = self._by_user.setdefault(user_key, {})
+            per_user[bucket] = per_user.get(bucket, 0) + 1
+            for violation in set(event.get("violations", [])):
+                per_type = self._by_type.setdefault(str(violation), {})
+                per_type[bucket] = per_type.get(bucket, 0) + 1
+                per_user_type = self._by_user_type.setdefault(f"{user_key}\t{violation}", {})
+                per_user_type[bucket] = per_user_type.get(bucket, 0) + 1
+            self.last_event_id = event_id
+            self._dirty = True
+            return True
+
+    def catch_up(self, events: dict[str, list[dict[str, Any]]], latest_event_id: int) -> int:
+        """Fold in events newer than the snapshot; returns how many were added."""
+        with self._lock:
+            if self.last_event_id > latest_event_id:
+                # The event store was replaced behind the snapshot's back: start over.
+                self._reset()
+        pending = [
+            (event["event_id"], user_key, event)
+            for user_key, per_user in events.items()
+            for event in per_user
+            if isinstance(event.get("event_id"), int) and event["event_id"] > self.last_event_id
+        ]
+        pending.sort(key=lambda item: item[0])
+        return sum(1 for _, user_key, event in pending if self.record(user_key, event))
+
+    def prune(self, now_ts: float) -> None:
+        cutoff = now_ts - self.retention_seconds
+        with self._lock:
+            for series in (
+                self._global,
+                *self._by_type.values(),
+                *self._by_user.values(),
+                *self._by_user_type.values(),
+            ):
+                for bucket in [bucket for bucket in series if bucket < cutoff]:
+                    del series[bucket]
+            self._by_type = {key: series for key, series in self._by_type.items() if series}
+            self._by_user = {key: series for key, series in self._by_user.items() if series}
+            self._by_user_type = {key: series for key, series in self._by_user_type.items() if series}
+
+    def series(
+        self,
+        *,
+        since: float,
+        until: float,
+        step_seconds: int = 0,
+        violation_type: str | None = None,
+        user_key: str | None = None,
+    ) -> tuple[int, list[tuple[int, int]]]:
+        """Zero-filled (bucket start, count) pairs; the step is a whole number of buckets."""
+        step = max(self.bucket_seconds, int(step_seconds))
+        step = -(-step // self.bucket_seconds) * self.bucket_seconds
+        while (until - since) / step > MAX_SERIES_POINTS:
+            step *= 2
+
+        with self._lock:
+            if user_key and violation_type:
+                source = dict(self._by_user_type.get(f"{user_key}\t{violation_type}", {}))
+            elif user_key:
+                source = dict(self._by_user.get(user_key, {}))
+            elif violation_type:
+                source = dict(self._by_type.get(violation_type, {}))
+            else:
+                source = dict(self._global)
+
+        start = int(since // step) * step
+        points = {bucket: 0 for bucket in range(start, int(until) + 1, step)}
+        for bucket, count in source.items():
+            slot = int(bucket // step) * step
+            if slot in points:
+                points[slot] += count
+        return step, sorted(points.items())
+
+    def totals_by_type(self, since: float, until: float, user_key: str | None = None) -> dict[str, int]:
+        with self._lock:
+            if user_key:
+                prefix = f"{user_key}\t"
+                source = {
+                    key[len(prefix) :]: series for key, series in self._by_user_type.items() if key.startswith(prefix)
+                }
+            else:
+                source = self._by_type
+            return {
+                violation: total
+                for violation, series in sorted(source.items())
+                if (total := sum(count for bucket, count in series.items() if since <= bucket <= until))
+            }
+
+    def save(self, file_path: Path) -> None:
+        with self._lock:
+            payload = {
+                "version": SNAPSHOT_VERSION,
+                "bucket_seconds": self.bucket_seconds,
+                "last_event_id": self.last_event_id,
+                "global": _encode_series(self._global),
+                "by_type": {key: _encode_series(series) for key, series in self._by_type.items()},
+                "by_user": {key: _encode_series(series) for key, series in self._by_user.items()},
+                "by_user_type": {key: _encode_series(series) for key, series in self._by_user_type.items()},
+            }
+            self._dirty = False
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        partial_path = file_path.with_name(file_path.name + ".part")
+        partial_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(partial_path, file_path)
+
+    def load(self, file_path: Path) -> bool:
+        if not file_path.exists():
+            return False
+        try:
+            payload = json.loads(file_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return False
+        if (
+            not isinstance(payload, dict)
+            or payload.get("version") != SNAPSHOT_VERSION
+            or payload.get("bucket_seconds") != self.bucket_seconds
+        ):
+            return False
+
+        try:
+            with self._lock:
+                self._global = _decode_series(payload.get("global"))
+                self._by_type = {str(k): _decode_series(v) for k, v in (payload.get("by_type") or {}).items()}
+                self._by_user = {str(k): _decode_series(v) for k, v in (payload.get("by_user") or {}).items()}
+                self._by_user_type = {
+                    str(k): _decode_series(v) for k, v in (payload.get("by_user_type") or {}).items()
+                }
+                self.last_event_id = int(payload.get("last_event_id", 0))
+        except (AttributeError, TypeError, ValueError):
+            with self._lock:
+                self._reset()
+            return False
+        return True
+
+    def _reset(self) -> None:
+        self.last_event_id = 0
+        self._global = {}
+        self._by_type = {}
+        self._by_user = {}
+        self._by_user_type = {}
+        self._dirty = True
+
+
+def _encode_series(series: dict[int, int]) -> list[list[int]]:
+    return [[bucket, count] for bucket, count in sorted(series.items())]
+
+
+def _decode_series(raw: Any) -> dict[int, int]:
+    return {int(bucket): int(count) for bucket, count in (raw or [])}
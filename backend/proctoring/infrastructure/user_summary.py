@@ -0,0 +1,104 @@
+import secrets
+import threading
+from bisect import bisect_left, insort
+from typing import Any
+
+from proctoring.domain import RegisteredUser
+
+
+def _sort_key(key: str, username: str) -> tuple[str, str]:
+    return username.lower(), key
+
+
+class UserSummaryIndex:
+    """
+    Admin dashboard rows kept sorted by username and updated in place on
+    registration and on each violation event. Every change bumps `version`,
+    which doubles as the ETag for unchanged polls.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._rows: dict[str, dict[str, Any]] = {}
+        self._search_text: dict[str, str] = {}
+        self._order: list[tuple[str, str]] = []
+        self._version = 0
+        # Versions restart with the process, so tag them to never match an older ETag.
+        self._generation = secrets.token_hex(4)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def etag(self) -> str:
+        return f"users-{self._generation}-{self._version}"
+
+    def rebuild(
+        self,
+        registered_faces: dict[str, RegisteredUser],
+        violation_events: dict[str, list[dict[str, Any]]],
+    ) -> None:
+        with self._lock:
+            self._rows = {}
+            self._search_text = {}
+            for key, user in registered_faces.items():
+                self._rows[key] = self._build_row(key, user, violation_events.get(key, []))
+                self._search_text[key] = self._build_search_text(self._rows[key])
+            self._order = sorted(_sort_key(key, row["username"]) for key, row in self._rows.items())
+            self._version += 1
+
+    def upsert_user(self, key: str, user: RegisteredUser, events: list[dict[str, Any]]) -> None:
+        with self._lock:
+            previous = self._rows.get(key)
+            if previous is not None:
+                self._remove_order(key, previous["username"])
+            row = self._build_row(key, user, events)
+            self._rows[key] = row
+            self._search_text[key] = self._build_search_text(row)
+            insort(self._order, _sort_key(key, row["username"]))
+            self._version += 1
+
+    def update_violations(self, key: str, events: list[dict[str, Any]]) -> None:
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return
+            row["violation_count"] = len(events)
+            row["last_violation"] = str(events[-1].get("timestamp", "")) if events else ""
+            self._version += 1
+
+    def page(self, search: str = "", offset: int = 0, limit: int | None = None) -> tuple[list[dict[str, Any]], int]:
+        """Rows in username order, optionally filtered by name or email, plus the total match count."""
+        needle = search.strip().lower()
+        with self._lock:
+            if needle:
+                keys = [key for _, key in self._order if needle in self._search_text[key]]
+            else:
+                keys = [key for _, key in self._order]
+            selected = keys[offset:] if limit is None else keys[offset : offset + limit]
+            return [dict(self._rows[key]) for key in selected], len(keys)
+
+    def _remove_order(self, key: str, username: str) -> None:
+        entry = _sort_key(key, username)
+        idx = bisect_left(self._order, entry)
+        if idx < len(self._order) and self._order[idx] == entry:
+            del self._order[idx]
+
+    @staticmethod
+    def _build_row(key: str, user: RegisteredUser, events: list[dict[str, Any]]) -> dict[str, Any]:
+        return {
+            "key": key,
+            "username": user.username,
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "email": user.email,
+            "samples": len(user.signatures),
+            "violation_count": len(events),
+            "last_violation": str(events[-1].get("timestamp", "")) if events else "",
+        }
+
+    @staticmethod
+    def _build_search_text(row: dict[str, Any]) -> str:
+        fields = (row["username"], row["first_name"], row["last_name"], f"{row['first_name']} {row['last_name']}", row["email"])
+        return "\n".join(str(value).lower() for value in fields)
@@ -0,0 +1,368 @@
+import base64
+import http.client
+import http.cookiejar
+import json
+import math
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+FRAME_SUFFIXES = (".jpg", ".jpeg", ".png")
+# analyze_frame turns mobile clients away, so simulated candidates present as desktop Chrome.
+DESKTOP_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0"
+
+
+@dataclass
+class LevelReport:
+    candidates: int
+    duration_seconds: float
+    requests: int = 0
+    analyzed: int = 0
+    quality_skipped: int = 0
+    overloaded: int = 0
+    errors: int = 0
+    late_ticks: int = 0
+    throughput_fps: float = 0.0
+    error_rate: float = 0.0
+    overload_rate: float = 0.0
+    # Only analyzed frames; quality-skipped ones return before analysis and would flatter the percentiles.
+    latency_ms: dict[str, float] = field(default_factory=dict)
+    skipped_latency_ms: dict[str, float] = field(default_factory=dict)
+    errors_by_kind: dict[str, int] = field(default_factory=dict)
+    server: dict[str, float] | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class CandidateClient:
+    """One simulated candidate: its own cookie jar, so verify_face's session sticks."""
+
+    def __init__(self, base_url: str, username: str, timeout_seconds: float) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.timeout_seconds = float(timeout_seconds)
+        self._opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def post(self, path: str, payload: dict[str, Any]) -> tuple[int, dict[str, Any]]:
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json", "User-Agent": DESKTOP_USER_AGENT},
+            method="POST",
+        )
+        try:
+            with self._opener.open(request, timeout=self.timeout_seconds) as response:
+                return response.status, _parse_json(response.read())
+        except urllib.error.HTTPError as exc:
+            return exc.code, _parse_json(exc.read())
+
+    def enroll(self, registration_images: list[str]) -> None:
+        """Registers and verifies the candidate; raises RuntimeError when the server refuses either."""
+        status, body = self.post(
+            "/register_face",
+            {
+                "username": self.username,
+                "first_name": "Load",
+                "last_name": "Tester",
+                "email": f"{self.username}@loadtest.invalid",
+                "images": registration_images,
+            },
+        )
+        if status != 200:
+            raise RuntimeError(f"register_face failed for {self.username}: {status} {body.get('error', '')}")
+        status, body = self.post("/verify_face", {"username": self.username, "image": registration_images[0]})
+        if status != 200 or not body.get("match"):
+            reason = body.get("error", body.get("score"))
+            raise RuntimeError(f"verify_face failed for {self.username}: {status} {reason}")
+
+
+class ServerSampler:
+    """
+    CPU time and memory of a server process and all its descendants (gunicorn
+    workers), from /proc. Memory is the summed PSS, so pages the workers share
+    with the preloading master are split between them instead of counted once
+    per process; RSS stands in where smaps_rollup is unavailable.
+    """
+
+    def __init__(self, pid: int, interval_seconds: float = 0.5) -> None:
+        self.pid = int(pid)
+        self.interval_seconds = float(interval_seconds)
+        self._clock_ticks = os.sysconf("SC_CLK_TCK")
+        self._page_size = os.sysconf("SC_PAGE_SIZE")
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._started_at = 0.0
+        self._cpu_at_start = 0.0
+        self.peak_memory_bytes = 0
+        self.peak_processes = 0
+
+    def start(self) -> None:
+        self._stop.clear()
+        self.peak_memory_bytes = 0
+        self.peak_processes = 0
+        self._started_at = time.monotonic()
+        self._cpu_at_start = self._sample()
+        self._thread = threading.Thread(target=self._run, name="loadtest-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> dict[str, float]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        elapsed = max(1e-6, time.monotonic() - self._started_at)
+        cpu_seconds = self._sample() - self._cpu_at_start
+        return {
+            "cpu_cores": round(cpu_seconds / elapsed, 2),
+            "pss_mb_peak": round(self.peak_memory_bytes / (1024 * 1024), 1),
+            "processes": self.peak_processes,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self._sample()
+
+    def _sample(self) -> float:
+        cpu_ticks = 0
+        memory_bytes = 0
+        pids = self._process_tree()
+        for pid in pids:
+            try:
+                stat = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+                cpu_ticks += int(stat[11]) + int(stat[12])
+                memory_bytes += self._memory_bytes(pid)
+            except (OSError, IndexError, ValueError):
+                continue
+        self.peak_memory_bytes = max(self.peak_memory_bytes, memory_bytes)
+        self.peak_processes = max(self.peak_processes, len(pids))
+        return cpu_ticks / self._clock_ticks
+
+    def _memory_bytes(self, pid: int) -> int:
+        try:
+            for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return int(Path(f"/proc/{pid}/statm").read_text().split()[1]) * self._page_size
+
+    def _process_tree(self) -> list[int]:
+        children: dict[int, list[int]] = {}
+        for entry in Path("/proc").iterdir():
+            if not entry.name.isdigit():
+                continue
+            try:
+                parent = int((entry / "stat").read_text().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(parent, []).append(int(entry.name))
+        tree = [self.pid]
+        for pid in tree:
+            tree.extend(children.get(pid, []))
+        return tree
+
+
+def load_frame_corpus(path: str | Path) -> list[bytes]:
+    """Encoded frames from a file or a directory (searched recursively), in name order."""
+    root = Path(path)
+    files = [root] if root.is_file() else sorted(p for p in root.rglob("*") if p.suffix.lower() in FRAME_SUFFIXES)
+    frames = [file.read_bytes() for file in files]
+    if not frames:
+        raise ValueError(f"No .jpg or .png frames found in {root}")
+    return frames
+
+
+def synthesize_frames(seeds: list[bytes], count: int, seed: int = 0) -> list[bytes]:
+    """
+    Varied frames derived from recorded ones: exposure changes, small camera
+    shifts and sensor noise, with an occasional dark frame for the low-light
+    path. They still show the recorded faces, so identity checks pass.
+    """
+    import cv2
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    images = [cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR) for data in seeds]
+    images = [image for image in images if image is not None]
+    if not images:
+        raise ValueError("None of the seed frames could be decoded")
+
+    frames: list[bytes] = []
+    for index in range(int(count)):
+        image = images[index % len(images)].astype(np.float32)
+        gain = 0.25 if rng.random() < 0.1 else rng.uniform(0.7, 1.3)
+        height, width = image.shape[:2]
+        shift = np.float32([[1, 0, rng.uniform(-0.04, 0.04) * width], [0, 1, rng.uniform(-0.04, 0.04) * height]])
+        image = cv2.warpAffine(image * gain, shift, (width, height), borderMode=cv2.BORDER_REFLECT)
+        image += rng.normal(0.0, 4.0, size=image.shape).astype(np.float32)
+        ok, encoded = cv2.imencode(".jpg", np.clip(image, 0, 255).astype(np.uint8), [cv2.IMWRITE_JPEG_QUALITY, 75])
+        if ok:
+            frames.append(encoded.tobytes())
+    return frames
+
+
+def to_data_url(frame: bytes) -> str:
+    return "data:image/jpeg;base64," + base64.b64encode(frame).decode("ascii")
+
+
+def run_level(
+    clients: list[CandidateClient],
+    frames: list[str],
+    fps: float,
+    duration_seconds: float,
+    sampler: ServerSampler | None = None,
+) -> LevelReport:
+    """
+    Every client posts frames at fps for duration_seconds, the way the exam
+    page does: one request at a time, starts staggered over the first interval,
+    and a shed frame's retry_after_ms is honoured before the next one.
+    """
+    interval = 1.0 / max(fps, 1e-3)
+    report = LevelReport(candidates=len(clients), duration_seconds=float(duration_seconds))
+    latencies: list[float] = []
+    skipped_latencies: list[float] = []
+    outcomes: Counter[str] = Counter()
+    late_ticks = [0]
+    lock = threading.Lock()
+    started = time.monotonic()
+    stop_at = started + float(duration_seconds)
+
+    def candidate_loop(position: int, client: CandidateClient) -> None:
+        next_send = started + random.uniform(0.0, interval)
+        frame_index = position * 7
+        local_latencies: list[float] = []
+        local_skipped_latencies: list[float] = []
+        local_outcomes: Counter[str] = Counter()
+        local_late = 0
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= stop_at:
+                    break
+                if next_send > now:
+                    time.sleep(min(next_send - now, stop_at - now))
+                    continue
+                if now - next_send >= interval:
+                    # Fell a whole tick behind; resynchronise rather than bursting to catch up.
+                    local_late += 1
+                    next_send = now
+                payload = {"username": client.username, "image": frames[frame_index % len(frames)]}
+                frame_index += 1
+                request_started = time.perf_counter()
+                try:
+                    status, body = client.post("/analyze_frame", payload)
+                except (OSError, http.client.HTTPException) as exc:
+                    status, body = -1, {"error": _error_kind(exc)}
+                elapsed_ms = (time.perf_counter() - request_started) * 1000.0
+                next_send += interval
+
+                if status == 200 and body.get("overloaded"):
+                    local_outcomes["overloaded"] += 1
+                    next_send = max(next_send, time.monotonic() + float(body.get("retry_after_ms", 0)) / 1000.0)
+                elif status == 200 and body.get("skipped"):
+                    local_outcomes["quality_skipped"] += 1
+                    local_skipped_latencies.append(elapsed_ms)
+                elif status == 200:
+                    local_outcomes["analyzed"] += 1
+                    local_latencies.append(elapsed_ms)
+                else:
+                    kind = body.get("error") if status == -1 else f"http_{status}"
+                    local_outcomes[f"error:{kind}"] += 1
+        finally:
+            # A candidate that dies early still reports what it saw.
+            with lock:
+                latencies.extend(local_latencies)
+                skipped_latencies.extend(local_skipped_latencies)
+                outcomes.update(local_outcomes)
+                late_ticks[0] += local_late
+
+    if sampler is not None:
+        sampler.start()
+    threads = [
+        threading.Thread(target=candidate_loop, args=(position, client), name=f"loadtest-{position}", daemon=True)
+        for position, client in enumerate(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = max(1e-6, time.monotonic() - started)
+    if sampler is not None:
+        report.server = sampler.stop()
+
+    report.analyzed = outcomes["analyzed"]
+    report.quality_skipped = outcomes["quality_skipped"]
+    report.overloaded = outcomes["overloaded"]
+    report.errors_by_kind = {
+        kind.split(":", 1)[1]: count for kind, count in outcomes.items() if kind.startswith("error:")
+    }
+    report.errors = sum(report.errors_by_kind.values())
+    report.requests = report.analyzed + report.quality_skipped + report.overloaded + report.errors
+    report.late_ticks = late_ticks[0]
+    report.throughput_fps = round((report.analyzed + report.quality_skipped) / elapsed, 2)
+    if report.requests:
+        report.error_rate = round(report.errors / report.requests, 4)
+        report.overload_rate = round(report.overloaded / report.requests, 4)
+    report.latency_ms = latency_summary(latencies)
+    report.skipped_latency_ms = latency_summary(skipped_latencies)
+    return report
+
+
+def latency_summary(latencies_ms: list[float]) -> dict[str, float]:
+    if not latencies_ms:
+        return {}
+    ordered = sorted(latencies_ms)
+    return {
+        "p50": round(percentile(ordered, 50), 1),
+        "p90": round(percentile(ordered, 90), 1),
+        "p99": round(percentile(ordered, 99), 1),
+        "max": round(ordered[-1], 1),
+        "mean": round(sum(ordered) / len(ordered), 1),
+    }
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(len(ordered) * q / 100.0))
+    return ordered[min(len(ordered), rank) - 1]
+
+
+def format_reports(reports: list[LevelReport]) -> str:
+    header = (
+        f"{'candidates':>10} {'frames/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} "
+        f"{'skip p50':>8} {'errors':>7} {'shed':>7} {'late':>5} {'cpu':>6} {'pss MB':>8}"
+    )
+    rows = [header]
+    for report in reports:
+        server = report.server or {}
+        rows.append(
+            f"{report.candidates:>10} {report.throughput_fps:>9.2f} "
+            f"{report.latency_ms.get('p50', 0.0):>8.1f} {report.latency_ms.get('p90', 0.0):>8.1f} "
+            f"{report.latency_ms.get('p99', 0.0):>8.1f} {report.skipped_latency_ms.get('p50', 0.0):>8.1f} "
+            f"{report.error_rate:>7.1%} {report.overload_rate:>7.1%} "
+            f"{report.late_ticks:>5} {server.get('cpu_cores', float('nan')):>6.2f} "
+            f"{server.get('pss_mb_peak', float('nan')):>8.1f}"
+        )
+    return "\n".join(rows)
+
+
+def _error_kind(exc: Exception) -> str:
+    reason = getattr(exc, "reason", exc)
+    if isinstance(reason, TimeoutError):
+        return "timeout"
+    return type(reason).__name__ if isinstance(reason, BaseException) else str(reason)
+
+
+def _parse_json(raw: bytes) -> dict[str, Any]:
+    try:
+        parsed = json.loads(raw or b"{}")
+    except ValueError:
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
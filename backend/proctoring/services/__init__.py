@@ -1,3 +1,12 @@
-from .analyzer import ProctorAnalyzer
+from typing import Any
 
 __all__ = ["ProctorAnalyzer"]
+
+
+def __getattr__(name: str) -> Any:
+    # Resolved on first use so importing proctoring.services does not load mediapipe.
+    if name == "ProctorAnalyzer":
+        from .analyzer import ProctorAnalyzer
+
+        return ProctorAnalyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,100 @@
+import os
+import random
+import threading
+
+from proctoring.config import (
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_PRIORITY_MAX_IN_FLIGHT,
+    ADMISSION_PRIORITY_RESERVED_THREADS,
+    REQUEST_THREADS_DEFAULT,
+    REQUEST_THREADS_ENV,
+)
+from proctoring.services.sessions import SessionRecord
+
+
+def request_threads() -> int:
+    """Requests this process serves at once; gunicorn.conf.py exports its thread count."""
+    try:
+        return max(1, int(os.environ.get(REQUEST_THREADS_ENV, REQUEST_THREADS_DEFAULT)))
+    except ValueError:
+        return REQUEST_THREADS_DEFAULT
+
+
+def admission_limits(threads: int) -> tuple[int, int]:
+    """
+    (max_in_flight, priority_max_in_flight) for a process serving this many
+    requests at once. A limit at or above the thread count can never be
+    reached, because requests past it wait for a thread instead of running.
+    """
+    priority_max_in_flight = ADMISSION_PRIORITY_MAX_IN_FLIGHT or threads
+    max_in_flight = ADMISSION_MAX_IN_FLIGHT or max(1, threads - ADMISSION_PRIORITY_RESERVED_THREADS)
+    return max_in_flight, priority_max_in_flight
+
+
+class AdmissionController:
+    """
+    Bounds the frames under analysis in this process. Up to max_in_flight any
+    session is admitted; beyond that only priority sessions are, up to
+    priority_max_in_flight. A frame that already waited past its queue budget
+    is shed too, since its verdict would arrive late and hold up fresher ones.
+    Shed frames are answered at once with a retry hint instead of queueing.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        priority_max_in_flight: int,
+        max_queue_age_seconds: float,
+        priority_max_queue_age_seconds: float,
+        stale_session_seconds: float,
+        retry_after_ms: int,
+    ) -> None:
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.priority_max_in_flight = max(self.max_in_flight, int(priority_max_in_flight))
+        self.max_queue_age_seconds = float(max_queue_age_seconds)
+        self.priority_max_queue_age_seconds = max(self.max_queue_age_seconds, float(priority_max_queue_age_seconds))
+        self.stale_session_seconds = float(stale_session_seconds)
+        self.retry_after_ms = max(1, int(retry_after_ms))
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def set_limits(self, max_in_flight: int, priority_max_in_flight: int) -> None:
+        with self._lock:
+            self.max_in_flight = max(1, int(max_in_flight))
+            self.priority_max_in_flight = max(self.max_in_flight, int(priority_max_in_flight))
+
+    def is_priority(self, record: SessionRecord, now_ts: float) -> bool:
+        """Sessions with active suspicion, or ones not analyzed for a while, go first."""
+        if record.identity.mismatch_streak > 0 or record.phone_visible_streak > 0:
+            return True
+        return now_ts - record.last_analyzed_ts >= self.stale_session_seconds
+
+    def try_admit(self, priority: bool, queue_age_seconds: float = 0.0) -> bool:
+        limit = self.priority_max_in_flight if priority else self.max_in_flight
+        max_age = self.priority_max_queue_age_seconds if priority else self.max_queue_age_seconds
+        with self._lock:
+            if self.in_flight >= limit or queue_age_seconds > max_age:
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def retry_after(self) -> int:
+        # Jittered, so candidates shed together at exam start do not all come back at once.
+        return random.randint(self.retry_after_ms, self.retry_after_ms * 3 // 2 + 1)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "priority_max_in_flight": self.priority_max_in_flight,
+            "admitted": self.admitted,
+            "shed": self.shed,
+        }
@@ -1,3 +1,6 @@
+import threading
+from typing import Any
+
 import cv2
 import mediapipe as mp
 import numpy as np
@@ -6,20 +9,77 @@ from proctoring.config import SIDEWAYS_THRESHOLD
 from proctoring.domain import AnalysisResult
 
 
+class _SerializedGraph:
+    """A MediaPipe solution graph takes one frame at a time; overlapping process() calls corrupt it for good."""
+
+    def __init__(self, graph: Any) -> None:
+        self._graph = graph
+        self._lock = threading.Lock()
+
+    def process(self, image: np.ndarray) -> Any:
+        with self._lock:
+            return self._graph.process(image)
+
+
 class ProctorAnalyzer:
+    """
+    MediaPipe graphs are built on first use: they own native threads that do
+    not survive fork(), so a preloading master must never start them. Each
+    graph serializes its own calls, so request threads, warmup and
+    concurrent analysis stages can share one analyzer.
+    """
+
     def __init__(self) -> None:
-        self.face_detection = mp.solutions.face_detection.FaceDetection(
-            model_selection=0,
-            min_detection_confidence=0.6,
-        )
-        self.face_mesh = mp.solutions.face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=False,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-        )
+        self._face_detection: Any = None
+        self._face_mesh: Any = None
+        self._face_crop_mesh: Any = None
+        self._graph_lock = threading.Lock()
         self.sideways_threshold = SIDEWAYS_THRESHOLD
 
+    @property
+    def face_detection(self) -> Any:
+        if self._face_detection is None:
+            with self._graph_lock:
+                if self._face_detection is None:
+                    self._face_detection = _SerializedGraph(
+                        mp.solutions.face_detection.FaceDetection(
+                            model_selection=0,
+                            min_detection_confidence=0.6,
+                        )
+                    )
+        return self._face_detection
+
+    @property
+    def face_mesh(self) -> Any:
+        if self._face_mesh is None:
+            with self._graph_lock:
+                if self._face_mesh is None:
+                    self._face_mesh = _SerializedGraph(
+                        mp.solutions.face_mesh.FaceMesh(
+                            max_num_faces=1,
+                            refine_landmarks=False,
+                            min_detection_confidence=0.5,
+                            min_tracking_confidence=0.5,
+                        )
+                    )
+        return self._face_mesh
+
+    @property
+    def face_crop_mesh(self) -> Any:
+        # A graph of its own: a face region tracked in a full frame means nothing in a crop, and vice versa.
+        if self._face_crop_mesh is None:
+            with self._graph_lock:
+                if self._face_crop_mesh is None:
+                    self._face_crop_mesh = _SerializedGraph(
+                        mp.solutions.face_mesh.FaceMesh(
+                            max_num_faces=1,
+                            refine_landmarks=False,
+                            min_detection_confidence=0.5,
+                            min_tracking_confidence=0.5,
+                        )
+                    )
+        return self._face_crop_mesh
+
     def analyze(self, frame_bgr: np.ndarray) -> AnalysisResult:
         frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
         detections = self.face_detection.process(frame_rgb).detections or []
@@ -34,7 +94,15 @@ class ProctorAnalyzer:
             violations.append("multiple_faces")
             return AnalysisResult(face_count=face_count, sideways_score=None, violations=violations)
 
-        mesh_result = self.face_mesh.process(frame_rgb)
+        return self._analyze_single_face(self.face_mesh, frame_rgb)
+
+    def analyze_face_crop(self, face_crop_bgr: np.ndarray) -> AnalysisResult:
+        """A single face already found and cropped by the client; only head pose is measured."""
+        return self._analyze_single_face(self.face_crop_mesh, cv2.cvtColor(face_crop_bgr, cv2.COLOR_BGR2RGB))
+
+    def _analyze_single_face(self, face_mesh: Any, image_rgb: np.ndarray) -> AnalysisResult:
+        violations: list[str] = []
+        mesh_result = face_mesh.process(image_rgb)
         if not mesh_result.multi_face_landmarks:
             return AnalysisResult(face_count=1, sideways_score=None, violations=violations)
 
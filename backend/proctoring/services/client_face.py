@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from typing import Any
+
+from proctoring.config import CLIENT_FACE_DETECTION_ENABLED, CLIENT_FACE_FULL_FRAME_INTERVAL_SECONDS
+from proctoring.services.heartbeat import FrameHeartbeat, scene_frame_request
+from proctoring.services.sessions import SessionRecord
+
+
+@dataclass
+class FaceCropClaim:
+    """What the exam page reports with a face crop: its own face count, plus scene change and brightness."""
+
+    face_count: int
+    scene: FrameHeartbeat
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "FaceCropClaim":
+        face_count = parse_client_face_count(payload.get("face_count"))
+        if face_count is None:
+            raise ValueError("Invalid face_count")
+        return cls(face_count=face_count, scene=FrameHeartbeat.from_payload(payload))
+
+
+def parse_client_face_count(raw: Any) -> int | None:
+    if raw is None or isinstance(raw, bool):
+        return None
+    try:
+        face_count = int(raw)
+    except (TypeError, ValueError):
+        return None
+    return face_count if face_count >= 0 else None
+
+
+def face_crop_frame_request(
+    record: SessionRecord,
+    claim: FaceCropClaim,
+    now_ts: float,
+    full_frame_interval_seconds: float = CLIENT_FACE_FULL_FRAME_INTERVAL_SECONDS,
+) -> str | None:
+    """
+    Why a full frame is needed instead of this crop, or None when the crop
+    can stand in for it. The crop is analyzed, so the scene may have changed;
+    phones and other people only show up on the periodic full frames, so
+    anything beyond one well-lit, verified face goes to a full frame.
+    """
+    if not CLIENT_FACE_DETECTION_ENABLED:
+        return "disabled"
+    if not record.client_faces_verified:
+        return "unverified"
+    if claim.face_count != 1:
+        return "face_count"
+    return scene_frame_request(record, claim.scene, record.last_full_frame_ts, now_ts, full_frame_interval_seconds)
@@ -0,0 +1,79 @@
+import math
+from dataclasses import dataclass
+from typing import Any
+
+from proctoring.config import (
+    FRAME_HEARTBEAT_MAX_INTERVAL_SECONDS,
+    FRAME_PREFILTER_ENABLED,
+    FRAME_PREFILTER_MIN_CHANGE,
+    LOW_LIGHT_MEAN_THRESHOLD,
+    QUALITY_FROZEN_MAX_DELTA,
+)
+from proctoring.services.sessions import SessionRecord
+
+
+@dataclass
+class FrameHeartbeat:
+    """What the exam page saw instead of uploading: change against the last uploaded frame, and brightness."""
+
+    change: float
+    brightness: float
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "FrameHeartbeat":
+        values: dict[str, float] = {}
+        for name in ("change", "brightness"):
+            try:
+                value = float(payload.get(name))  # type: ignore[arg-type]
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid heartbeat {name}") from None
+            if not math.isfinite(value) or value < 0:
+                raise ValueError(f"Invalid heartbeat {name}")
+            values[name] = value
+        return cls(**values)
+
+
+def heartbeat_frame_request(
+    record: SessionRecord,
+    heartbeat: FrameHeartbeat,
+    now_ts: float,
+    max_interval_seconds: float = FRAME_HEARTBEAT_MAX_INTERVAL_SECONDS,
+) -> str | None:
+    """
+    Why a real frame is needed instead of this heartbeat, or None when the
+    last verdict still holds. Only a clean verdict is carried forward, so
+    streaks and repeated violations always advance on real frames.
+    """
+    if not FRAME_PREFILTER_ENABLED:
+        return "disabled"
+    reason = scene_frame_request(record, heartbeat, record.last_analyzed_ts, now_ts, max_interval_seconds)
+    if reason is None and heartbeat.change >= FRAME_PREFILTER_MIN_CHANGE:
+        return "changed"
+    return reason
+
+
+def scene_frame_request(
+    record: SessionRecord,
+    scene: FrameHeartbeat,
+    since_ts: float,
+    now_ts: float,
+    max_interval_seconds: float,
+) -> str | None:
+    """
+    Why a stand-in for a full frame (a heartbeat or a face crop) is not
+    enough for this scene, or None. since_ts is when the stand-in's interval
+    started. Scene change is left to the caller: a heartbeat carries the last
+    verdict forward and needs an unchanged scene, a crop is analyzed afresh.
+    """
+    if not record.last_frame_clean:
+        return "unresolved"
+    if record.identity.mismatch_streak > 0 or record.phone_visible_streak > 0:
+        return "suspicion"
+    if now_ts - since_ts >= max_interval_seconds:
+        return "interval"
+    if scene.brightness < LOW_LIGHT_MEAN_THRESHOLD:
+        return "low_light"
+    # A camera that stopped updating looks unchanged too; its real frames feed the frozen check.
+    if scene.change <= QUALITY_FROZEN_MAX_DELTA:
+        return "frozen"
+    return None
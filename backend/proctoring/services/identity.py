@@ -6,15 +6,11 @@ from typing import Any
 import cv2
 import numpy as np
 
-from proctoring.domain import RegisteredUser
+from proctoring.domain import ReceivedFrame, RegisteredUser
+from proctoring.services.phone_backends import PhoneDetectionBackend, create_phone_backend
 
-try:
-    from ultralytics import YOLO
-except ImportError:  # pragma: no cover - optional runtime dependency.
-    YOLO = None
 
-
-def decode_data_url_image(data_url: str) -> np.ndarray:
+def decode_data_url_frame(data_url: str) -> ReceivedFrame:
     if not data_url or "," not in data_url:
         raise ValueError("Invalid image payload")
 
@@ -24,13 +20,21 @@ def decode_data_url_image(data_url: str) -> np.ndarray:
     frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
     if frame is None:
         raise ValueError("Could not decode frame")
-    return frame
+    return ReceivedFrame(image=frame, encoded=img_bytes)
+
+
+def decode_data_url_image(data_url: str) -> np.ndarray:
+    return decode_data_url_frame(data_url).image
 
 
 def decode_payload_frame(payload: dict[str, Any], key: str = "image") -> np.ndarray:
     return decode_data_url_image(str(payload.get(key, "")))
 
 
+def decode_payload_received_frame(payload: dict[str, Any], key: str = "image") -> ReceivedFrame:
+    return decode_data_url_frame(str(payload.get(key, "")))
+
+
 def collect_registration_image_payloads(payload: dict[str, Any]) -> list[str]:
     image_data = payload.get("image", "")
     images_data = payload.get("images")
@@ -141,13 +145,24 @@ def verify_identity_for_user(
     username: str,
     frame_bgr: np.ndarray,
     threshold: float,
+) -> tuple[bool, float]:
+    if username.lower() not in registered_faces:
+        raise ValueError("User is not registered")
+    face_crop = extract_single_face_crop(face_detection, frame_bgr)
+    return verify_face_crop_for_user(registered_faces, username, face_crop, threshold)
+
+
+def verify_face_crop_for_user(
+    registered_faces: dict[str, RegisteredUser],
+    username: str,
+    face_crop_bgr: np.ndarray,
+    threshold: float,
 ) -> tuple[bool, float]:
     user = registered_faces.get(username.lower())
     if user is None:
         raise ValueError("User is not registered")
 
-    face_crop = extract_single_face_crop(face_detection, frame_bgr)
-    signature = compute_face_signature(face_crop)
+    signature = compute_face_signature(face_crop_bgr)
     best_score = max(cosine_similarity(signature, reference) for reference in user.signatures)
     return best_score >= threshold, best_score
 
@@ -166,6 +181,8 @@ class PhoneDetector:
         image_size: int,
         frame_skip: int,
         max_dim: int,
+        backend: str = "ultralytics",
+        threads: int = 0,
     ) -> None:
         self._confidence = float(confidence)
         self._iou = float(iou)
@@ -178,22 +195,43 @@ class PhoneDetector:
         self._persist_frames = max(1, self._frame_skip - 1)
         self._class_ids: list[int] | None = None
 
-        self.enabled = YOLO is not None
-        self._model = None
-        if self.enabled:
-            try:
-                self._model = YOLO(model_path)
-                self._class_ids = self._resolve_phone_class_ids()
-            except Exception:
-                self._model = None
-                self.enabled = False
-                self._class_ids = None
+        self.backend_name = str(backend).strip().lower()
+        self.model_path = model_path
+        self._threads = max(0, int(threads))
+        self._backend: PhoneDetectionBackend | None = None
+        self._load_backend()
+
+    def _load_backend(self) -> None:
+        try:
+            self._backend = create_phone_backend(self.backend_name, self.model_path, self._threads)
+            self._class_ids = self._resolve_phone_class_ids()
+        except Exception:
+            self._backend = None
+            self._class_ids = None
+        self.enabled = self._backend is not None
+
+    def prepare_for_worker(self) -> None:
+        # ONNX Runtime sessions own thread pools that do not survive fork(); torch
+        # weights loaded before fork do, and stay shared copy-on-write.
+        if self.backend_name == "onnx":
+            self._load_backend()
+
+    def warm_up(self, frame_bgr: np.ndarray) -> None:
+        if self._backend is None:
+            return
+        self._backend.detect(
+            self._prepare_frame(frame_bgr),
+            confidence=self._confidence,
+            iou=self._iou,
+            image_size=self._image_size,
+            class_ids=self._class_ids,
+        )
 
     def detect_phone(self, frame_bgr: np.ndarray) -> bool:
         self._frame_counter += 1
         should_infer = self._frame_counter == 1 or (self._frame_counter % self._frame_skip == 0)
 
-        if not self.enabled or self._model is None:
+        if not self.enabled or self._backend is None:
             return detect_phone_like_object(frame_bgr)
 
         if not should_infer:
@@ -203,33 +241,28 @@ class PhoneDetector:
 
         infer_frame = self._prepare_frame(frame_bgr)
         try:
-            results = self._model.predict(
-                source=infer_frame,
-                conf=self._confidence,
+            boxes = self._backend.detect(
+                infer_frame,
+                confidence=self._confidence,
                 iou=self._iou,
-                imgsz=self._image_size,
-                classes=self._class_ids,
-                verbose=False,
+                image_size=self._image_size,
+                class_ids=self._class_ids,
             )
         except Exception:
             self._last_detected = detect_phone_like_object(frame_bgr)
             self._last_infer_frame = self._frame_counter
             return self._last_detected
 
-        detected = False
-        if results:
-            boxes = results[0].boxes
-            detected = bool(boxes is not None and len(boxes) > 0)
-
+        detected = bool(len(boxes) > 0)
         self._last_detected = detected
         self._last_infer_frame = self._frame_counter
         return detected
 
     def _resolve_phone_class_ids(self) -> list[int] | None:
-        if self._model is None:
+        if self._backend is None:
             return None
-        names = getattr(self._model, "names", None)
-        if not isinstance(names, dict):
+        names = self._backend.names
+        if not names:
             return None
 
         tokens = ("cell phone", "mobile phone", "phone", "mobile")
@@ -237,10 +270,7 @@ class PhoneDetector:
         for class_id, raw_name in names.items():
             label = str(raw_name).strip().lower()
             if any(token in label for token in tokens):
-                try:
-                    class_ids.append(int(class_id))
-                except (TypeError, ValueError):
-                    continue
+                class_ids.append(int(class_id))
 
         return class_ids or None
 
@@ -0,0 +1,102 @@
+from proctoring.config import (
+    IDENTITY_FAST_VERIFY_CHECKS,
+    IDENTITY_SCORE_EWMA_ALPHA,
+    IDENTITY_STABLE_VERIFY_INTERVAL,
+    LIVE_MATCH_THRESHOLD,
+)
+
+
+class IdentityTracker:
+    """
+    Per-candidate live identity state.
+    Verifies every eligible frame right after start or after the face track breaks,
+    then only every few frames while the smoothed similarity stays above threshold.
+    """
+
+    __slots__ = (
+        "threshold",
+        "alpha",
+        "fast_checks",
+        "stable_interval",
+        "score",
+        "last_score",
+        "mismatch_streak",
+        "checks",
+        "_fast_remaining",
+        "_frames_since_check",
+    )
+
+    def __init__(self) -> None:
+        self.threshold = LIVE_MATCH_THRESHOLD
+        self.alpha = IDENTITY_SCORE_EWMA_ALPHA
+        self.fast_checks = max(1, int(IDENTITY_FAST_VERIFY_CHECKS))
+        self.stable_interval = max(1, int(IDENTITY_STABLE_VERIFY_INTERVAL))
+
+        self.score: float | None = None
+        self.last_score: float | None = None
+        self.mismatch_streak = 0
+        self.checks = 0
+        self._fast_remaining = self.fast_checks
+        self._frames_since_check = 0
+
+    @property
+    def is_suspicious(self) -> bool:
+        if self.mismatch_streak > 0:
+            return True
+        return self.last_score is not None and self.last_score < self.threshold
+
+    def should_verify(self) -> bool:
+        if self._fast_remaining > 0 or self.is_suspicious:
+            return True
+        return self._frames_since_check + 1 >= self.stable_interval
+
+    def skip(self) -> None:
+        self._frames_since_check += 1
+
+    def record(self, raw_score: float) -> bool:
+        self.checks += 1
+        self._frames_since_check = 0
+        self.last_score = float(raw_score)
+        if self._fast_remaining > 0:
+            self._fast_remaining -= 1
+
+        if self.score is None:
+            self.score = float(raw_score)
+        else:
+            self.score = self.alpha * float(raw_score) + (1.0 - self.alpha) * self.score
+
+        is_match = self.score >= self.threshold
+        self.mismatch_streak = 0 if is_match else self.mismatch_streak + 1
+        return is_match
+
+    def reset_streak(self) -> None:
+        self.mismatch_streak = 0
+
+    def to_state(self) -> dict[str, float | int | None]:
+        return {
+            "score": self.score,
+            "last_score": self.last_score,
+            "mismatch_streak": self.mismatch_streak,
+            "checks": self.checks,
+            "fast_remaining": self._fast_remaining,
+            "frames_since_check": self._frames_since_check,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, float | int | None]) -> "IdentityTracker":
+        tracker = cls()
+        tracker.score = None if state.get("score") is None else float(state["score"])
+        tracker.last_score = None if state.get("last_score") is None else float(state["last_score"])
+        tracker.mismatch_streak = int(state.get("mismatch_streak") or 0)
+        tracker.checks = int(state.get("checks") or 0)
+        tracker._fast_remaining = int(state.get("fast_remaining", tracker.fast_checks) or 0)
+        tracker._frames_since_check = int(state.get("frames_since_check") or 0)
+        return tracker
+
+    def note_track_break(self) -> None:
+        # The person in front of the camera may have changed: drop the accumulated
+        # score and go back to checking every frame.
+        self.score = None
+        self.last_score = None
+        self._fast_remaining = self.fast_checks
+        self._frames_since_check = 0
@@ -0,0 +1,151 @@
+import json
+import math
+import os
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from proctoring.config import (
+    MIN_DOWNLOAD_MBPS,
+    MIN_UPLOAD_MBPS,
+    NETWORK_CAPTURE_PROFILES,
+    NETWORK_FRAME_BUDGET_RATIO,
+    NETWORK_PROBE_DEFAULT_KB,
+    NETWORK_PROBE_SIZES_KB,
+)
+from proctoring.infrastructure.evidence import evidence_user_dir_name
+
+
+@dataclass(frozen=True)
+class CaptureProfile:
+    name: str
+    max_width: int
+    jpeg_quality: float
+    interval_ms: int
+    frame_kb: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+CAPTURE_PROFILES = tuple(CaptureProfile(*profile) for profile in NETWORK_CAPTURE_PROFILES)
+DEFAULT_CAPTURE_PROFILE = CAPTURE_PROFILES[0]
+
+
+@dataclass
+class NetworkMeasurement:
+    download_mbps: float
+    upload_mbps: float
+    rtt_ms: float
+    jitter_ms: float
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "NetworkMeasurement":
+        values: dict[str, float] = {}
+        for name in ("download_mbps", "upload_mbps", "rtt_ms", "jitter_ms"):
+            try:
+                value = float(payload.get(name))  # type: ignore[arg-type]
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid {name}") from None
+            if not math.isfinite(value) or value < 0:
+                raise ValueError(f"Invalid {name}")
+            values[name] = value
+        return cls(**values)
+
+    @property
+    def passed(self) -> bool:
+        return self.download_mbps >= MIN_DOWNLOAD_MBPS and self.upload_mbps >= MIN_UPLOAD_MBPS
+
+
+def resolve_probe_size_kb(raw: Any) -> int:
+    if raw in (None, ""):
+        return NETWORK_PROBE_DEFAULT_KB
+    try:
+        size_kb = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid probe size") from None
+    if size_kb not in NETWORK_PROBE_SIZES_KB:
+        raise ValueError(f"Probe size must be one of {', '.join(str(size) for size in NETWORK_PROBE_SIZES_KB)} KB")
+    return size_kb
+
+
+@lru_cache(maxsize=None)
+def probe_body(size_kb: int) -> bytes:
+    """Random, so neither proxies nor the browser can shrink it in transit; built once per size."""
+    return os.urandom(size_kb * 1024)
+
+
+def recommend_capture_profile(
+    measurement: NetworkMeasurement,
+    profiles: tuple[CaptureProfile, ...] = CAPTURE_PROFILES,
+    budget_ratio: float = NETWORK_FRAME_BUDGET_RATIO,
+) -> CaptureProfile:
+    """
+    The richest profile whose frames still reach the server well within one
+    capture interval, so a weak link sends smaller frames less often instead
+    of falling behind. KB * 8 / Mbps is the upload time in milliseconds.
+    """
+    round_trip_ms = measurement.rtt_ms + 2 * measurement.jitter_ms
+    upload_mbps = max(measurement.upload_mbps, 1e-3)
+    for profile in profiles:
+        if profile.frame_kb * 8 / upload_mbps + round_trip_ms <= profile.interval_ms * budget_ratio:
+            return profile
+    return profiles[-1]
+
+
+def save_network_check(
+    directory: Path,
+    user_key: str,
+    username: str,
+    measurement: NetworkMeasurement,
+    profile: CaptureProfile,
+) -> dict[str, Any]:
+    record = {
+        "user_key": user_key,
+        "username": username,
+        "checked_at": time.time(),
+        "passed": measurement.passed,
+        "measurement": asdict(measurement),
+        "profile": profile.to_dict(),
+    }
+    directory.mkdir(parents=True, exist_ok=True)
+    file_path = directory / f"{evidence_user_dir_name(user_key)}.json"
+    partial_path = file_path.with_name(file_path.name + ".part")
+    partial_path.write_text(json.dumps(record), encoding="utf-8")
+    os.replace(partial_path, file_path)
+    return record
+
+
+def prune_network_checks(directory: Path, max_age_seconds: float, now_ts: float | None = None) -> int:
+    """Delete records (and abandoned partial writes) older than max_age_seconds; returns how many."""
+    cutoff = (time.time() if now_ts is None else now_ts) - max_age_seconds
+    removed = 0
+    for file_path in [*directory.glob("*.json"), *directory.glob("*.json.part")]:
+        try:
+            if file_path.stat().st_mtime < cutoff:
+                file_path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+def load_network_check(directory: Path, user_key: str) -> dict[str, Any] | None:
+    try:
+        payload = json.loads((directory / f"{evidence_user_dir_name(user_key)}.json").read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(payload, dict) or payload.get("user_key") != user_key:
+        return None
+    return payload
+
+
+def load_capture_profile(directory: Path, user_key: str) -> CaptureProfile | None:
+    record = load_network_check(directory, user_key)
+    if record is None:
+        return None
+    name = str((record.get("profile") or {}).get("name", ""))
+    # Resolved by name, so a changed profile table applies to candidates checked earlier.
+    return next((profile for profile in CAPTURE_PROFILES if profile.name == name), None)
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import ast
+import shutil
+from pathlib import Path
+from typing import Any, Protocol
+
+import cv2
+import numpy as np
+
+try:
+    from ultralytics import YOLO
+except ImportError:  # pragma: no cover - optional runtime dependency.
+    YOLO = None
+
+try:
+    import onnxruntime as ort
+except ImportError:  # pragma: no cover - optional runtime dependency.
+    ort = None
+
+
+class PhoneDetectionBackend(Protocol):
+    names: dict[int, str]
+
+    def detect(
+        self,
+        frame_bgr: np.ndarray,
+        *,
+        confidence: float,
+        iou: float,
+        image_size: int,
+        class_ids: list[int] | None,
+    ) -> np.ndarray: ...
+
+
+class UltralyticsPhoneBackend:
+    def __init__(self, model_path: str) -> None:
+        if YOLO is None:
+            raise RuntimeError("ultralytics is not installed")
+        self._model = YOLO(model_path)
+        self.names = _normalize_names(getattr(self._model, "names", None))
+
+    def detect(
+        self,
+        frame_bgr: np.ndarray,
+        *,
+        confidence: float,
+        iou: float,
+        image_size: int,
+        class_ids: list[int] | None,
+    ) -> np.ndarray:
+        results = self._model.predict(
+            source=frame_bgr,
+            conf=confidence,
+            iou=iou,
+            imgsz=image_size,
+            classes=class_ids,
+            verbose=False,
+        )
+        if not results or results[0].boxes is None or len(results[0].boxes) == 0:
+            return np.zeros((0, 6), dtype=np.float32)
+        return np.asarray(results[0].boxes.data.cpu().numpy(), dtype=np.float32)
+
+
+class OnnxPhoneBackend:
+    """
+    CPU-only YOLO detector running on ONNX Runtime.
+    Only the score rows of the requested classes are decoded, so restricting
+    to the phone classes also skips most of the post-processing work.
+    """
+
+    def __init__(self, model_path: str, intra_op_threads: int = 0) -> None:
+        if ort is None:
+            raise RuntimeError("onnxruntime is not installed")
+        if not Path(model_path).exists():
+            raise FileNotFoundError(f"ONNX model not found: {model_path}")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads > 0:
+            options.intra_op_num_threads = int(intra_op_threads)
+        self._session = ort.InferenceSession(
+            model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self._input_size = _static_input_size(model_input.shape)
+        metadata = self._session.get_modelmeta().custom_metadata_map
+        self.names = _normalize_names(_parse_metadata_literal(metadata.get("names")))
+
+    def detect(
+        self,
+        frame_bgr: np.ndarray,
+        *,
+        confidence: float,
+        iou: float,
+        image_size: int,
+        class_ids: list[int] | None,
+    ) -> np.ndarray:
+        size = self._input_size or int(image_size)
+        blob, scale, pad = letterbox_to_blob(frame_bgr, size)
+        output = self._session.run(None, {self._input_name: blob})[0]
+        boxes, scores, classes = decode_yolo_output(output, class_ids=class_ids, confidence=confidence)
+        if scores.size == 0:
+            return np.zeros((0, 6), dtype=np.float32)
+
+        keep = non_max_suppression(boxes, scores, iou)
+        boxes = boxes[keep]
+        boxes[:, [0, 2]] = (boxes[:, [0, 2]] - pad[0]) / scale
+        boxes[:, [1, 3]] = (boxes[:, [1, 3]] - pad[1]) / scale
+        return np.concatenate(
+            [boxes, scores[keep, None], classes[keep, None].astype(np.float32)],
+            axis=1,
+        )
+
+
+def create_phone_backend(backend: str, model_path: str, threads: int = 0) -> PhoneDetectionBackend:
+    name = str(backend).strip().lower()
+    if name == "onnx":
+        return OnnxPhoneBackend(model_path, intra_op_threads=threads)
+    if name == "ultralytics":
+        return UltralyticsPhoneBackend(model_path)
+    raise ValueError(f"Unknown phone detector backend: {backend}")
+
+
+def letterbox_to_blob(frame_bgr: np.ndarray, size: int) -> tuple[np.ndarray, float, tuple[float, float]]:
+    frame_h, frame_w = frame_bgr.shape[:2]
+    scale = min(size / float(frame_w), size / float(frame_h))
+    target_w = max(1, int(round(frame_w * scale)))
+    target_h = max(1, int(round(frame_h * scale)))
+    resized = cv2.resize(frame_bgr, (target_w, target_h), interpolation=cv2.INTER_LINEAR)
+
+    pad_x = (size - target_w) / 2.0
+    pad_y = (size - target_h) / 2.0
+    top = int(round(pad_y - 0.1))
+    left = int(round(pad_x - 0.1))
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[top : top + target_h, left : left + target_w] = resized
+
+    blob = cv2.dnn.blobFromImage(canvas, scalefactor=1.0 / 255.0, swapRB=True)
+    return blob, scale, (float(left), float(top))
+
+
+def decode_yolo_output(
+    output: np.ndarray,
+    class_ids: list[int] | None,
+    confidence: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # YOLOv8/11 heads export as (1, 4 + num_classes, num_anchors) with cx, cy, w, h first.
+    predictions = np.asarray(output, dtype=np.float32)[0]
+    num_classes = predictions.shape[0] - 4
+    selected = np.arange(num_classes) if not class_ids else np.asarray(class_ids, dtype=np.int64)
+    selected = selected[(selected >= 0) & (selected < num_classes)]
+    if selected.size == 0:
+        return np.zeros((0, 4), np.float32), np.zeros((0,), np.float32), np.zeros((0,), np.int64)
+
+    class_scores = predictions[4 + selected]
+    best = np.argmax(class_scores, axis=0)
+    scores = class_scores[best, np.arange(class_scores.shape[1])]
+    mask = scores >= float(confidence)
+    if not np.any(mask):
+        return np.zeros((0, 4), np.float32), np.zeros((0,), np.float32), np.zeros((0,), np.int64)
+
+    cx, cy, w, h = predictions[:4, mask]
+    boxes = np.stack([cx - w / 2.0, cy - h / 2.0, cx + w / 2.0, cy + h / 2.0], axis=1)
+    return boxes.astype(np.float32), scores[mask].astype(np.float32), selected[best[mask]]
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    if scores.size == 0:
+        return np.zeros((0,), dtype=np.int64)
+
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.maximum(0.0, x2 - x1) * np.maximum(0.0, y2 - y1)
+    order = np.argsort(-scores)
+    keep: list[int] = []
+    while order.size > 0:
+        current = int(order[0])
+        keep.append(current)
+        rest = order[1:]
+        inter_w = np.maximum(0.0, np.minimum(x2[current], x2[rest]) - np.maximum(x1[current], x1[rest]))
+        inter_h = np.maximum(0.0, np.minimum(y2[current], y2[rest]) - np.maximum(y1[current], y1[rest]))
+        inter = inter_w * inter_h
+        union = areas[current] + areas[rest] - inter + 1e-8
+        order = rest[(inter / union) <= float(iou_threshold)]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def export_phone_model(
+    weights_path: str,
+    output_path: str,
+    image_size: int,
+    quantize_int8: bool = False,
+) -> Path:
+    if YOLO is None:
+        raise RuntimeError("ultralytics is required to export the phone detector")
+
+    exported = Path(YOLO(weights_path).export(format="onnx", imgsz=int(image_size), dynamic=False, simplify=False))
+    target = Path(output_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if not quantize_int8:
+        if exported.resolve() != target.resolve():
+            shutil.move(str(exported), str(target))
+        return target
+
+    try:
+        import onnx
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as exc:
+        raise RuntimeError("onnx and onnxruntime are required for int8 quantization") from exc
+
+    quantize_dynamic(str(exported), str(target), weight_type=QuantType.QUInt8)
+    # Keep the class names and image size metadata written by the exporter.
+    source_model = onnx.load(str(exported))
+    quantized_model = onnx.load(str(target))
+    existing_keys = {prop.key for prop in quantized_model.metadata_props}
+    for prop in source_model.metadata_props:
+        if prop.key not in existing_keys:
+            quantized_model.metadata_props.add(key=prop.key, value=prop.value)
+    onnx.save(quantized_model, str(target))
+    if exported.resolve() != target.resolve():
+        exported.unlink(missing_ok=True)
+    return target
+
+
+def _normalize_names(raw: Any) -> dict[int, str]:
+    if isinstance(raw, (list, tuple)):
+        raw = dict(enumerate(raw))
+    if not isinstance(raw, dict):
+        return {}
+    names: dict[int, str] = {}
+    for class_id, label in raw.items():
+        try:
+            names[int(class_id)] = str(label)
+        except (TypeError, ValueError):
+            continue
+    return names
+
+
+def _parse_metadata_literal(value: str | None) -> Any:
+    if not value:
+        return None
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return None
+
+
+def _static_input_size(shape: list[Any]) -> int | None:
+    if len(shape) != 4:
+        return None
+    height, width = shape[2], shape[3]
+    if isinstance(height, int) and isinstance(width, int) and height == width:
+        return height
+    return None
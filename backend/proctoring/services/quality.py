@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+from proctoring.config import (
+    QUALITY_FROZEN_MAX_DELTA,
+    QUALITY_MAX_OVEREXPOSED_RATIO,
+    QUALITY_MIN_BRIGHTNESS,
+    QUALITY_MIN_SHARPNESS,
+    QUALITY_OVEREXPOSED_PIXEL_VALUE,
+    QUALITY_THUMBNAIL_WIDTH,
+)
+from proctoring.domain import FrameQuality
+
+
+def make_quality_thumbnail(frame_bgr: np.ndarray, width: int = QUALITY_THUMBNAIL_WIDTH) -> np.ndarray:
+    frame_h, frame_w = frame_bgr.shape[:2]
+    if frame_w > width:
+        target_h = max(1, int(round(frame_h * (width / float(frame_w)))))
+        frame_bgr = cv2.resize(frame_bgr, (width, target_h), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+
+
+def assess_frame_quality(
+    frame_bgr: np.ndarray,
+    previous_thumbnail: np.ndarray | None = None,
+) -> tuple[FrameQuality, np.ndarray]:
+    thumbnail = make_quality_thumbnail(frame_bgr)
+
+    brightness = float(np.mean(thumbnail))
+    sharpness = float(cv2.Laplacian(thumbnail, cv2.CV_32F).var())
+    overexposed_ratio = float(np.count_nonzero(thumbnail >= QUALITY_OVEREXPOSED_PIXEL_VALUE)) / float(thumbnail.size)
+
+    frame_delta: float | None = None
+    if previous_thumbnail is not None and previous_thumbnail.shape == thumbnail.shape:
+        frame_delta = float(cv2.norm(thumbnail, previous_thumbnail, cv2.NORM_L1)) / float(thumbnail.size)
+
+    if brightness < QUALITY_MIN_BRIGHTNESS:
+        verdict = "too_dark"
+    elif overexposed_ratio > QUALITY_MAX_OVEREXPOSED_RATIO:
+        verdict = "overexposed"
+    elif frame_delta is not None and frame_delta <= QUALITY_FROZEN_MAX_DELTA:
+        verdict = "frozen"
+    elif sharpness < QUALITY_MIN_SHARPNESS:
+        verdict = "blurry"
+    else:
+        verdict = "ok"
+
+    quality = FrameQuality(
+        verdict=verdict,
+        brightness=brightness,
+        sharpness=sharpness,
+        overexposed_ratio=overexposed_ratio,
+        frame_delta=frame_delta,
+    )
+    return quality, thumbnail
@@ -0,0 +1,449 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+
+from proctoring.services.identity_tracker import IdentityTracker
+from proctoring.services.sessions import SessionRecord, SessionRegistry
+
+# Streak counters; save() adds to these instead of overwriting them.
+_COUNTER_FIELDS = frozenset({"phone_visible_streak", "frozen_streak", "blurry_streak", "overexposed_streak"})
+# Appended events kept for other workers to catch up from; one further behind reloads the event store.
+SHARED_EVENT_JOURNAL_SIZE = 1000
+
+
+class SessionStore(Protocol):
+    """
+    Live session state plus the coordination primitives several workers need:
+    an atomic evidence-capture claim, named generation counters used to
+    invalidate per-worker caches, named cross-worker mutexes, named leases
+    that let one worker own a periodic job, and a short journal of appended
+    violation events so other workers can catch up without reloading the
+    whole event store.
+    """
+
+    def load(self, key: str, now_ts: float) -> SessionRecord: ...
+
+    def save(self, key: str, record: SessionRecord) -> None: ...
+
+    def start(self, key: str, now_ts: float) -> SessionRecord: ...
+
+    def discard(self, key: str) -> None: ...
+
+    def try_claim_capture(self, key: str, now_ts: float, cooldown_seconds: float) -> bool: ...
+
+    def generation(self, name: str) -> int: ...
+
+    def bump_generation(self, name: str) -> int: ...
+
+    def mutex(self, name: str) -> AbstractContextManager[None]: ...
+
+    def try_lease(self, name: str, holder: str, now_ts: float, ttl_seconds: float) -> bool: ...
+
+    def append_shared_event(self, user_key: str, event: dict[str, Any]) -> None: ...
+
+    def shared_events_since(self, event_id: int) -> list[tuple[str, dict[str, Any]]] | None: ...
+
+    def stats(self) -> dict[str, int]: ...
+
+
+class InProcessSessionStore:
+    """Single-process backend: records are live objects, so save() is a no-op."""
+
+    def __init__(self, registry: SessionRegistry) -> None:
+        self.registry = registry
+        self._generations: dict[str, int] = {}
+        self._mutexes: dict[str, threading.RLock] = {}
+        self._lock = threading.Lock()
+
+    def load(self, key: str, now_ts: float) -> SessionRecord:
+        return self.registry.touch(key, now_ts)
+
+    def save(self, key: str, record: SessionRecord) -> None:
+        pass
+
+    def start(self, key: str, now_ts: float) -> SessionRecord:
+        return self.registry.start(key, now_ts)
+
+    def discard(self, key: str) -> None:
+        self.registry.discard(key)
+
+    def try_claim_capture(self, key: str, now_ts: float, cooldown_seconds: float) -> bool:
+        with self._lock:
+            record = self.registry.get(key)
+            if record is None or (now_ts - record.last_capture_ts) < cooldown_seconds:
+                return False
+            record.last_capture_ts = now_ts
+            return True
+
+    def generation(self, name: str) -> int:
+        return self._generations.get(name, 0)
+
+    def bump_generation(self, name: str) -> int:
+        with self._lock:
+            self._generations[name] = self._generations.get(name, 0) + 1
+            return self._generations[name]
+
+    @contextmanager
+    def mutex(self, name: str) -> Iterator[None]:
+        with self._lock:
+            lock = self._mutexes.setdefault(name, threading.RLock())
+        with lock:
+            yield
+
+    def try_lease(self, name: str, holder: str, now_ts: float, ttl_seconds: float) -> bool:
+        return True
+
+    def append_shared_event(self, user_key: str, event: dict[str, Any]) -> None:
+        pass
+
+    def shared_events_since(self, event_id: int) -> list[tuple[str, dict[str, Any]]] | None:
+        # No other process shares this store, so there is never anything to catch up on.
+        return None
+
+    def stats(self) -> dict[str, int]:
+        return self.registry.stats()
+
+
+class SqliteSessionStore:
+    """
+    Shared backend for several workers on one host, backed by a SQLite file in
+    WAL mode. Per-candidate writes are single statements; the capture claim is
+    a conditional UPDATE, so two workers can never both record the same cooldown
+    window. Mutexes live in a separate lock database so holding one does not
+    block session writes.
+
+    load() only reads, apart from refreshing last_seen once it is a fair part
+    of the TTL old. save() writes just the fields changed since this thread's
+    load(), in one statement: counters that went up are added as increments,
+    so two workers analyzing frames for the same candidate both count.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_seconds: float,
+        max_sessions: int,
+        on_evict: Callable[[str], None] | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_sessions = max(1, int(max_sessions))
+        self._on_evict = on_evict
+        # last_seen only drives idle eviction, so it need not be rewritten on every frame.
+        self.touch_interval_seconds = min(60.0, self.ttl_seconds / 10.0)
+        self._local = threading.local()
+        self._writes = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if hasattr(os, "register_at_fork"):
+            # SQLite connections must not cross fork(); children open their own.
+            os.register_at_fork(after_in_child=self._forget_connections)
+        connection = self._connect(self.path)
+        try:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    key TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    thumbnail BLOB,
+                    thumbnail_shape TEXT,
+                    last_capture_ts REAL NOT NULL DEFAULT 0,
+                    last_seen REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen);
+                CREATE TABLE IF NOT EXISTS generations (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS leases (
+                    name TEXT PRIMARY KEY,
+                    holder TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS shared_events (
+                    event_id INTEGER PRIMARY KEY,
+                    user_key TEXT NOT NULL,
+                    event TEXT NOT NULL
+                );
+                """
+            )
+        finally:
+            connection.close()
+
+    def load(self, key: str, now_ts: float) -> SessionRecord:
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT state, thumbnail, thumbnail_shape, last_capture_ts, last_seen FROM sessions WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            record = SessionRecord(last_seen=now_ts)
+            with connection:
+                connection.execute(
+                    "INSERT OR IGNORE INTO sessions (key, state, last_seen) VALUES (?, ?, ?)",
+                    (key, _encode_state(record), now_ts),
+                )
+            self._maybe_evict(now_ts)
+        else:
+            *columns, stored_last_seen = row
+            record = _decode_record(*columns)
+            record.last_seen = float(stored_last_seen)
+            if now_ts - record.last_seen >= self.touch_interval_seconds:
+                record.last_seen = now_ts
+                with connection:
+                    connection.execute("UPDATE sessions SET last_seen = ? WHERE key = ?", (now_ts, key))
+                self._maybe_evict(now_ts)
+        # A thread serves one request at a time, so only its latest load can be saved back.
+        self._local.loaded = (key, _state_fields(record), record.quality_thumbnail, record.last_seen)
+        return record
+
+    def save(self, key: str, record: SessionRecord) -> None:
+        loaded = getattr(self._local, "loaded", None)
+        self._local.loaded = None
+        fields = _state_fields(record)
+        if loaded is None or loaded[0] != key:
+            loaded = (key, {}, None, None)
+        _, loaded_fields, loaded_thumbnail, loaded_last_seen = loaded
+
+        paths: list[str] = []
+        params: list[Any] = []
+        for name, value in fields.items():
+            if name not in loaded_fields:
+                paths.append(f"'$.{name}', json(?)")
+                params.append(json.dumps(value))
+                continue
+            previous = loaded_fields[name]
+            if value == previous:
+                continue
+            if name in _COUNTER_FIELDS and value > previous:
+                paths.append(f"'$.{name}', coalesce(json_extract(state, '$.{name}'), 0) + ?")
+                params.append(value - previous)
+            else:
+                paths.append(f"'$.{name}', json(?)")
+                params.append(json.dumps(value))
+
+        # last_capture_ts is owned by try_claim_capture and never written here.
+        assignments: list[str] = []
+        if paths:
+            assignments.append(f"state = json_set(state, {', '.join(paths)})")
+        if record.quality_thumbnail is not loaded_thumbnail:
+            assignments.append("thumbnail = ?, thumbnail_shape = ?")
+            params.extend(_encode_thumbnail(record.quality_thumbnail))
+        if record.last_seen != loaded_last_seen:
+            assignments.append("last_seen = ?")
+            params.append(record.last_seen)
+        if not assignments:
+            return
+        connection = self._connection()
+        with connection:
+            connection.execute(f"UPDATE sessions SET {', '.join(assignments)} WHERE key = ?", (*params, key))
+
+    def start(self, key: str, now_ts: float) -> SessionRecord:
+        self.discard(key)
+        return self.load(key, now_ts)
+
+    def discard(self, key: str) -> None:
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM sessions WHERE key = ?", (key,))
+        if self._on_evict is not None:
+            self._on_evict(key)
+
+    def try_claim_capture(self, key: str, now_ts: float, cooldown_seconds: float) -> bool:
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                "UPDATE sessions SET last_capture_ts = ? WHERE key = ? AND ? - last_capture_ts >= ?",
+                (now_ts, key, now_ts, float(cooldown_seconds)),
+            )
+        return cursor.rowcount == 1
+
+    def generation(self, name: str) -> int:
+        row = self._connection().execute("SELECT value FROM generations WHERE name = ?", (name,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def bump_generation(self, name: str) -> int:
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                """
+                INSERT INTO generations (name, value) VALUES (?, 1)
+                ON CONFLICT (name) DO UPDATE SET value = value + 1
+                """,
+                (name,),
+            )
+            row = connection.execute("SELECT value FROM generations WHERE name = ?", (name,)).fetchone()
+        return int(row[0])
+
+    @contextmanager
+    def mutex(self, name: str) -> Iterator[None]:
+        # Each name has its own lock database, only ever used for this exclusive transaction,
+        # so holders of different names never wait on each other.
+        connection = self._lock_connection(name)
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("INSERT OR REPLACE INTO locks (name, acquired_at) VALUES (?, ?)", (name, time.time()))
+            yield
+        finally:
+            connection.execute("COMMIT")
+
+    def try_lease(self, name: str, holder: str, now_ts: float, ttl_seconds: float) -> bool:
+        """Take or renew the named lease; held until its holder stops renewing it for ttl_seconds."""
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                """
+                INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at
+                WHERE leases.holder = excluded.holder OR leases.expires_at < ?
+                """,
+                (name, holder, now_ts + float(ttl_seconds), now_ts),
+            )
+        return cursor.rowcount == 1
+
+    def append_shared_event(self, user_key: str, event: dict[str, Any]) -> None:
+        event_id = int(event["event_id"])
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO shared_events (event_id, user_key, event) VALUES (?, ?, ?)",
+                (event_id, user_key, json.dumps(event)),
+            )
+            connection.execute("DELETE FROM shared_events WHERE event_id <= ?", (event_id - SHARED_EVENT_JOURNAL_SIZE,))
+
+    def shared_events_since(self, event_id: int) -> list[tuple[str, dict[str, Any]]] | None:
+        """Events appended after event_id in id order, or None when the journal no longer reaches back that far."""
+        rows = self._connection().execute(
+            "SELECT event_id, user_key, event FROM shared_events WHERE event_id > ? ORDER BY event_id",
+            (int(event_id),),
+        ).fetchall()
+        if rows and rows[0][0] != event_id + 1:
+            return None
+        return [(user_key, json.loads(event)) for _, user_key, event in rows]
+
+    def stats(self) -> dict[str, int]:
+        row = self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return {"sessions": int(row[0]), "max_sessions": self.max_sessions}
+
+    def _maybe_evict(self, now_ts: float) -> None:
+        # Eviction scans an index, so it only runs every few hundred writes.
+        self._writes += 1
+        if self._writes % 256 == 0:
+            self.evict_idle(now_ts)
+
+    def evict_idle(self, now_ts: float) -> int:
+        connection = self._connection()
+        with connection:
+            expired = connection.execute(
+                """
+                SELECT key FROM sessions
+                WHERE last_seen < ?
+                OR key IN (SELECT key FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?)
+                """,
+                (now_ts - self.ttl_seconds, self.max_sessions),
+            ).fetchall()
+            connection.executemany("DELETE FROM sessions WHERE key = ?", expired)
+        if self._on_evict is not None:
+            for (key,) in expired:
+                self._on_evict(key)
+        return len(expired)
+
+    def _forget_connections(self) -> None:
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._connect(self.path)
+            self._local.connection = connection
+        return connection
+
+    def lock_path(self, name: str) -> Path:
+        safe_name = "".join(char if char.isalnum() or char in "-_" else "_" for char in name)
+        return self.path.with_name(f"{self.path.stem}.{safe_name}.lock{self.path.suffix}")
+
+    def _lock_connection(self, name: str) -> sqlite3.Connection:
+        connections = getattr(self._local, "lock_connections", None)
+        if connections is None:
+            connections = self._local.lock_connections = {}
+        connection = connections.get(name)
+        if connection is None:
+            connection = self._connect(self.lock_path(name))
+            connection.isolation_level = None
+            connection.execute("CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, acquired_at REAL)")
+            connections[name] = connection
+        return connection
+
+    @staticmethod
+    def _connect(path: Path) -> sqlite3.Connection:
+        connection = sqlite3.connect(str(path), timeout=30.0)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+
+def create_session_store(
+    backend: str,
+    *,
+    path: Path,
+    ttl_seconds: float,
+    max_sessions: int,
+    on_evict: Callable[[str], None] | None = None,
+) -> SessionStore:
+    name = str(backend).strip().lower()
+    if name == "memory":
+        return InProcessSessionStore(SessionRegistry(ttl_seconds, max_sessions, on_evict=on_evict))
+    if name == "sqlite":
+        return SqliteSessionStore(path, ttl_seconds, max_sessions, on_evict=on_evict)
+    raise ValueError(f"Unknown session store backend: {backend}")
+
+
+def _state_fields(record: SessionRecord) -> dict[str, Any]:
+    return {
+        "identity": record.identity.to_state(),
+        "phone_visible_streak": record.phone_visible_streak,
+        "phone_visible_active": record.phone_visible_active,
+        "frozen_streak": record.frozen_streak,
+        "blurry_streak": record.blurry_streak,
+        "overexposed_streak": record.overexposed_streak,
+        "last_analyzed_ts": record.last_analyzed_ts,
+        "last_frame_clean": record.last_frame_clean,
+        "last_full_frame_ts": record.last_full_frame_ts,
+        "client_faces_verified": record.client_faces_verified,
+    }
+
+
+def _encode_state(record: SessionRecord) -> str:
+    return json.dumps(_state_fields(record))
+
+
+def _encode_thumbnail(thumbnail: np.ndarray | None) -> tuple[bytes | None, str | None]:
+    if thumbnail is None:
+        return None, None
+    thumbnail = np.ascontiguousarray(thumbnail, dtype=np.uint8)
+    return thumbnail.tobytes(), json.dumps(list(thumbnail.shape))
+
+
+def _decode_record(state: str, thumbnail: bytes | None, shape: str | None, last_capture_ts: float) -> SessionRecord:
+    payload = json.loads(state)
+    quality_thumbnail = None
+    if thumbnail is not None and shape:
+        quality_thumbnail = np.frombuffer(thumbnail, dtype=np.uint8).reshape(json.loads(shape))
+    return SessionRecord(
+        identity=IdentityTracker.from_state(payload.get("identity") or {}),
+        phone_visible_streak=int(payload.get("phone_visible_streak", 0)),
+        phone_visible_active=bool(payload.get("phone_visible_active", False)),
+        last_capture_ts=float(last_capture_ts),
+        quality_thumbnail=quality_thumbnail,
+        frozen_streak=int(payload.get("frozen_streak", 0)),
+        blurry_streak=int(payload.get("blurry_streak", 0)),
+        overexposed_streak=int(payload.get("overexposed_streak", 0)),
+        last_analyzed_ts=float(payload.get("last_analyzed_ts", 0.0)),
+        last_frame_clean=bool(payload.get("last_frame_clean", False)),
+        last_full_frame_ts=float(payload.get("last_full_frame_ts", 0.0)),
+        client_faces_verified=bool(payload.get("client_faces_verified", False)),
+    )
@@ -0,0 +1,106 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from proctoring.services.identity_tracker import IdentityTracker
+
+
+@dataclass(slots=True)
+class SessionRecord:
+    identity: IdentityTracker = field(default_factory=IdentityTracker)
+    phone_visible_streak: int = 0
+    phone_visible_active: bool = False
+    last_capture_ts: float = 0.0
+    quality_thumbnail: np.ndarray | None = None
+    frozen_streak: int = 0
+    blurry_streak: int = 0
+    overexposed_streak: int = 0
+    last_seen: float = 0.0
+    last_analyzed_ts: float = 0.0
+    last_frame_clean: bool = False
+    last_full_frame_ts: float = 0.0
+    client_faces_verified: bool = False
+
+
+class SessionRegistry:
+    """
+    Live monitoring state for each candidate, one record per user key.
+    Records are kept in last-activity order, so idle sessions past the TTL and
+    the least recently active ones beyond the cap are evicted from the front.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_sessions: int,
+        on_evict: Callable[[str], None] | None = None,
+    ) -> None:
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_sessions = max(1, int(max_sessions))
+        self._on_evict = on_evict
+        self._records: OrderedDict[str, SessionRecord] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._records
+
+    def touch(self, key: str, now_ts: float) -> SessionRecord:
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                record = SessionRecord()
+                self._records[key] = record
+            else:
+                self._records.move_to_end(key)
+            record.last_seen = now_ts
+            evicted = self._evict_locked(now_ts)
+        self._notify(evicted)
+        return record
+
+    def get(self, key: str) -> SessionRecord | None:
+        return self._records.get(key)
+
+    def start(self, key: str, now_ts: float) -> SessionRecord:
+        """Fresh record for a newly verified session, dropping any previous state."""
+        self.discard(key)
+        return self.touch(key, now_ts)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            removed = self._records.pop(key, None) is not None
+        if removed:
+            self._notify([key])
+
+    def evict_idle(self, now_ts: float) -> int:
+        with self._lock:
+            evicted = self._evict_locked(now_ts)
+        self._notify(evicted)
+        return len(evicted)
+
+    def stats(self) -> dict[str, int]:
+        return {"sessions": len(self._records), "max_sessions": self.max_sessions, "evicted": self.evicted}
+
+    def _evict_locked(self, now_ts: float) -> list[str]:
+        evicted: list[str] = []
+        cutoff = now_ts - self.ttl_seconds
+        while self._records:
+            key, record = next(iter(self._records.items()))
+            if len(self._records) <= self.max_sessions and record.last_seen >= cutoff:
+                break
+            del self._records[key]
+            evicted.append(key)
+        self.evicted += len(evicted)
+        return evicted
+
+    def _notify(self, keys: list[str]) -> None:
+        if self._on_evict is None:
+            return
+        for key in keys:
+            self._on_evict(key)
@@ -0,0 +1,76 @@
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from dataclasses import dataclass
+from typing import Any
+
+StageInputs = dict[str, Any]
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[[StageInputs], Any]
+    after: tuple[str, ...] = ()
+    enabled: bool = True
+
+
+class StageGraph:
+    """
+    Per-frame work as stages with declared dependencies. A stage is started as
+    soon as everything it runs after has finished, so independent stages
+    overlap on the executor; the calling thread runs one ready stage itself
+    rather than idling. Disabled stages yield None to their dependents.
+    """
+
+    def __init__(self, stages: Iterable[Stage]) -> None:
+        self.stages: dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage: {stage.name}")
+            unknown = [name for name in stage.after if name not in self.stages]
+            if unknown:
+                # Dependencies must be declared first, which also rules out cycles.
+                raise ValueError(f"Stage {stage.name} runs after unknown stages: {', '.join(unknown)}")
+            self.stages[stage.name] = stage
+
+    def run(self, inputs: StageInputs, executor: Executor | None = None) -> dict[str, Any]:
+        """Run every stage; results are keyed by stage name. The first stage error is re-raised."""
+        results: dict[str, Any] = {}
+        pending = dict(self.stages)
+        running: dict[Future[Any], str] = {}
+        error: BaseException | None = None
+
+        while (pending and error is None) or running:
+            if error is None:
+                ready = [stage for stage in pending.values() if all(name in results for name in stage.after)]
+                for stage in ready:
+                    del pending[stage.name]
+                if executor is not None:
+                    for stage in ready[1:]:
+                        running[executor.submit(_run_stage, stage, {**inputs, **results})] = stage.name
+                    ready = ready[:1]
+                for stage in ready:
+                    try:
+                        results[stage.name] = _run_stage(stage, {**inputs, **results})
+                    except Exception as exc:
+                        error = exc
+                        break
+                if ready and error is None:
+                    continue
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as exc:
+                    error = error or exc
+
+        if error is not None:
+            raise error
+        return results
+
+
+def _run_stage(stage: Stage, inputs: StageInputs) -> Any:
+    return stage.run(inputs) if stage.enabled else None
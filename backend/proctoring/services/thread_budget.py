@@ -0,0 +1,122 @@
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from proctoring.config import (
+    CPU_AFFINITY_ENABLED,
+    CPU_AFFINITY_ENV,
+    CPU_THREAD_BUDGET,
+    CPU_THREAD_BUDGET_ENV,
+    CPU_TORCH_INTEROP_THREADS,
+    WORKERS_PER_NODE_ENV,
+)
+
+# OpenBLAS / MKL / OpenMP read these once, when numpy first loads them.
+BLAS_THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+@dataclass
+class ThreadBudget:
+    threads: int
+    workers_per_node: int
+    blas_env: dict[str, str] = field(default_factory=dict)
+    blas_env_before_numpy: bool = False
+    cpu_affinity: list[int] | None = None
+    opencv_threads: int | None = None
+    torch_threads: int | None = None
+    torch_interop_threads: int | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+_blas_env_before_numpy = False
+
+
+def available_cpus() -> list[int]:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def workers_per_node() -> int:
+    try:
+        return max(1, int(os.environ.get(WORKERS_PER_NODE_ENV, "1")))
+    except ValueError:
+        return 1
+
+
+def resolve_thread_budget() -> int:
+    """Threads this process may keep busy: the configured budget, or its share of the cores."""
+    try:
+        configured = int(os.environ.get(CPU_THREAD_BUDGET_ENV, CPU_THREAD_BUDGET))
+    except ValueError:
+        configured = CPU_THREAD_BUDGET
+    if configured > 0:
+        return configured
+    return max(1, len(available_cpus()) // workers_per_node())
+
+
+def affinity_enabled() -> bool:
+    raw = os.environ.get(CPU_AFFINITY_ENV)
+    if raw is None:
+        return CPU_AFFINITY_ENABLED
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def apply_blas_thread_env() -> dict[str, str]:
+    """Defaults the BLAS thread variables to the budget; values set by the operator win."""
+    global _blas_env_before_numpy
+    if "numpy" not in sys.modules:
+        _blas_env_before_numpy = True
+    threads = str(resolve_thread_budget())
+    for name in BLAS_THREAD_ENV_VARS:
+        os.environ.setdefault(name, threads)
+    return {name: os.environ[name] for name in BLAS_THREAD_ENV_VARS}
+
+
+def apply_thread_budget(cpu_slot: int | None = None) -> ThreadBudget:
+    """
+    Sizes the thread pools of the native libraries loaded in this process to
+    the budget; ones that are not imported (the API role never loads cv2 or
+    torch) are left alone. With affinity on, worker cpu_slot is pinned to its
+    own run of budget-many cores.
+    """
+    threads = resolve_thread_budget()
+    budget = ThreadBudget(
+        threads=threads,
+        workers_per_node=workers_per_node(),
+        blas_env=apply_blas_thread_env(),
+        blas_env_before_numpy=_blas_env_before_numpy,
+    )
+
+    if cpu_slot is not None and affinity_enabled() and hasattr(os, "sched_setaffinity"):
+        cpus = available_cpus()
+        start = (cpu_slot * threads) % len(cpus)
+        os.sched_setaffinity(0, {cpus[(start + offset) % len(cpus)] for offset in range(min(threads, len(cpus)))})
+    if hasattr(os, "sched_getaffinity"):
+        budget.cpu_affinity = sorted(os.sched_getaffinity(0))
+
+    cv2 = sys.modules.get("cv2")
+    if cv2 is not None:
+        cv2.setNumThreads(threads)
+        budget.opencv_threads = cv2.getNumThreads()
+
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(CPU_TORCH_INTEROP_THREADS)
+        except RuntimeError:
+            # Fixed once torch has started any inter-op work in this process.
+            pass
+        budget.torch_threads = torch.get_num_threads()
+        budget.torch_interop_threads = torch.get_num_interop_threads()
+    return budget
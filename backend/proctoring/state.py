@@ -1,40 +1,269 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
 from proctoring.domain import RegisteredUser
 from proctoring.config import (
+    ADMISSION_CONTROL_ENABLED,
+    ADMISSION_MAX_QUEUE_AGE_SECONDS,
+    ADMISSION_PRIORITY_MAX_QUEUE_AGE_SECONDS,
+    ADMISSION_RETRY_AFTER_MS,
+    ADMISSION_STALE_SESSION_SECONDS,
+    ANALYSIS_STAGE_THREADS,
+    APP_ROLE,
+    FRAME_BUFFER_MAX_FRAMES_PER_SESSION,
+    FRAME_BUFFER_MAX_TOTAL_MB,
+    FRAME_BUFFER_SECONDS,
+    EVENT_STREAM_BACKLOG,
+    EVENT_STREAM_MAX_CONCURRENT,
+    PHONE_DETECTOR_BACKEND,
     PHONE_DETECTOR_CONFIDENCE,
     PHONE_DETECTOR_FRAME_SKIP,
     PHONE_DETECTOR_IMAGE_SIZE,
     PHONE_DETECTOR_IOU,
     PHONE_DETECTOR_MAX_DIM,
     PHONE_DETECTOR_MODEL_PATH,
+    ROLLUP_BUCKET_SECONDS,
+    ROLLUP_RETENTION_HOURS,
+    SESSION_IDLE_TTL_SECONDS,
+    SESSION_MAX_ACTIVE,
+    SESSION_STORE_BACKEND,
+    SESSION_STORE_BACKEND_ENV,
+    SESSION_STORE_PATH,
+    VIOLATION_CLIP_MAX_TILES,
+    VIOLATION_CLIP_POST_SECONDS,
+    VIOLATION_CLIP_PRE_SECONDS,
 )
-from proctoring.services import ProctorAnalyzer
-from proctoring.services.identity import PhoneDetector
+from proctoring.infrastructure import load_registered_faces, load_violation_events
+from proctoring.infrastructure.event_index import ViolationEventIndex
+from proctoring.infrastructure.event_stream import ViolationEventBroker
+from proctoring.infrastructure.profiler import SamplingProfiler, load_profiler_settings
+from proctoring.infrastructure.rollups import ViolationRollups
+from proctoring.infrastructure.user_summary import UserSummaryIndex
+from proctoring.services.admission import AdmissionController, admission_limits, request_threads
+from proctoring.services.session_store import SessionStore, create_session_store
+from proctoring.services.thread_budget import ThreadBudget, resolve_thread_budget
+from proctoring.services.warmup import ModelReadiness
+
+if TYPE_CHECKING:
+    from proctoring.infrastructure.frame_buffer import FrameRingBuffer, ViolationClipWriter
+    from proctoring.services.analyzer import ProctorAnalyzer
+    from proctoring.services.identity import PhoneDetector
+
+REGISTERED_FACES_GENERATION = "registered_faces"
+VIOLATION_EVENTS_GENERATION = "violation_events"
+# Bumped, with VIOLATION_EVENTS_GENERATION, by changes other than appends (evidence GC).
+VIOLATION_EVENTS_REWRITE_GENERATION = "violation_events_rewrite"
+PROFILER_GENERATION = "profiler"
+ROLE_ALL = "all"
+ROLE_API = "api"
+ROLE_INFERENCE = "inference"
+APP_ROLES = (ROLE_ALL, ROLE_API, ROLE_INFERENCE)
 
 
 @dataclass
 class AppState:
-    analyzer: ProctorAnalyzer
-    phone_detector: PhoneDetector
+    sessions: SessionStore
+    event_broker: ViolationEventBroker
+    rollups: ViolationRollups
+    role: str = ROLE_ALL
+    # Only built for roles that serve inference; API-only processes never import the models.
+    analyzer: ProctorAnalyzer | None = None
+    phone_detector: PhoneDetector | None = None
+    frame_buffer: FrameRingBuffer | None = None
+    clip_writer: ViolationClipWriter | None = None
+    stage_executor: ThreadPoolExecutor | None = None
+    admission: AdmissionController | None = None
+    thread_budget: ThreadBudget | None = None
     registered_faces: dict[str, RegisteredUser] = field(default_factory=dict)
-    identity_mismatch_streaks: dict[str, int] = field(default_factory=dict)
-    phone_visible_streaks: dict[str, int] = field(default_factory=dict)
-    phone_visible_active: dict[str, bool] = field(default_factory=dict)
     violation_events: dict[str, list[dict[str, Any]]] = field(default_factory=dict)
-    violation_capture_last_ts: dict[str, float] = field(default_factory=dict)
-
-
-def create_app_state() -> AppState:
-    return AppState(
-        analyzer=ProctorAnalyzer(),
-        phone_detector=PhoneDetector(
-            model_path=PHONE_DETECTOR_MODEL_PATH,
-            confidence=PHONE_DETECTOR_CONFIDENCE,
-            iou=PHONE_DETECTOR_IOU,
-            image_size=PHONE_DETECTOR_IMAGE_SIZE,
-            frame_skip=PHONE_DETECTOR_FRAME_SKIP,
-            max_dim=PHONE_DETECTOR_MAX_DIM,
+    violation_events_lock: threading.RLock = field(default_factory=threading.RLock)
+    event_index: ViolationEventIndex = field(default_factory=ViolationEventIndex)
+    user_summary: UserSummaryIndex = field(default_factory=UserSummaryIndex)
+    synced_generations: dict[str, int] = field(default_factory=dict)
+    readiness: ModelReadiness = field(default_factory=ModelReadiness)
+    profiler: SamplingProfiler = field(default_factory=SamplingProfiler)
+
+    @property
+    def serves_inference(self) -> bool:
+        return self.role != ROLE_API
+
+
+def create_app_state(role: str = APP_ROLE) -> AppState:
+    if role not in APP_ROLES:
+        raise ValueError(f"Unknown app role: {role}")
+    frame_buffer = _create_frame_buffer() if role != ROLE_API else None
+    state = AppState(
+        role=role,
+        frame_buffer=frame_buffer,
+        sessions=create_session_store(
+            os.environ.get(SESSION_STORE_BACKEND_ENV) or SESSION_STORE_BACKEND,
+            path=SESSION_STORE_PATH,
+            ttl_seconds=SESSION_IDLE_TTL_SECONDS,
+            max_sessions=SESSION_MAX_ACTIVE,
+            on_evict=frame_buffer.discard if frame_buffer is not None else None,
+        ),
+        event_broker=ViolationEventBroker(
+            backlog=EVENT_STREAM_BACKLOG,
+            max_streams=EVENT_STREAM_MAX_CONCURRENT or max(1, request_threads() // 2),
+        ),
+        rollups=ViolationRollups(
+            bucket_seconds=ROLLUP_BUCKET_SECONDS,
+            retention_seconds=ROLLUP_RETENTION_HOURS * 3600.0,
         ),
     )
+    if state.serves_inference:
+        _load_inference_models(state)
+    return state
+
+
+def _create_frame_buffer() -> FrameRingBuffer:
+    from proctoring.infrastructure.frame_buffer import FrameRingBuffer
+
+    return FrameRingBuffer(
+        window_seconds=FRAME_BUFFER_SECONDS,
+        max_frames_per_session=FRAME_BUFFER_MAX_FRAMES_PER_SESSION,
+        max_total_bytes=int(FRAME_BUFFER_MAX_TOTAL_MB * 1024 * 1024),
+    )
+
+
+def _load_inference_models(state: AppState) -> None:
+    from proctoring.infrastructure.frame_buffer import ViolationClipWriter
+    from proctoring.services.analyzer import ProctorAnalyzer
+    from proctoring.services.identity import PhoneDetector
+
+    state.analyzer = ProctorAnalyzer()
+    state.phone_detector = PhoneDetector(
+        model_path=PHONE_DETECTOR_MODEL_PATH,
+        confidence=PHONE_DETECTOR_CONFIDENCE,
+        iou=PHONE_DETECTOR_IOU,
+        image_size=PHONE_DETECTOR_IMAGE_SIZE,
+        frame_skip=PHONE_DETECTOR_FRAME_SKIP,
+        max_dim=PHONE_DETECTOR_MAX_DIM,
+        backend=PHONE_DETECTOR_BACKEND,
+        threads=resolve_thread_budget(),
+    )
+    state.clip_writer = ViolationClipWriter(
+        state.frame_buffer,
+        pre_seconds=VIOLATION_CLIP_PRE_SECONDS,
+        post_seconds=VIOLATION_CLIP_POST_SECONDS,
+        max_tiles=VIOLATION_CLIP_MAX_TILES,
+    )
+    if ANALYSIS_STAGE_THREADS > 0:
+        # Threads start on first use, so a preloading master never owns any.
+        state.stage_executor = ThreadPoolExecutor(ANALYSIS_STAGE_THREADS, thread_name_prefix="analysis-stage")
+    if ADMISSION_CONTROL_ENABLED:
+        max_in_flight, priority_max_in_flight = admission_limits(request_threads())
+        state.admission = AdmissionController(
+            max_in_flight=max_in_flight,
+            priority_max_in_flight=priority_max_in_flight,
+            max_queue_age_seconds=ADMISSION_MAX_QUEUE_AGE_SECONDS,
+            priority_max_queue_age_seconds=ADMISSION_PRIORITY_MAX_QUEUE_AGE_SECONDS,
+            stale_session_seconds=ADMISSION_STALE_SESSION_SECONDS,
+            retry_after_ms=ADMISSION_RETRY_AFTER_MS,
+        )
+    state.readiness.models_loaded = True
+
+
+def refresh_shared_state(
+    state: AppState,
+    faces_file: Path,
+    events_file: Path,
+    max_events_per_user: int,
+    on_new_event: Callable[[str, dict[str, Any]], None] | None = None,
+) -> None:
+    """
+    Catch up with face registry and event store changes other workers made
+    since we last looked. Appended events are applied from the session store's
+    journal; anything else reloads the file. Events another worker appended
+    are passed to on_new_event in id order, under the events lock.
+    """
+    generation = state.sessions.generation(REGISTERED_FACES_GENERATION)
+    if generation != state.synced_generations.get(REGISTERED_FACES_GENERATION, 0):
+        registered_faces: dict[str, RegisteredUser] = {}
+        load_registered_faces(faces_file, registered_faces)
+        state.registered_faces = registered_faces
+        state.user_summary.rebuild(state.registered_faces, state.violation_events)
+        state.synced_generations[REGISTERED_FACES_GENERATION] = generation
+
+    generation = state.sessions.generation(VIOLATION_EVENTS_GENERATION)
+    if generation != state.synced_generations.get(VIOLATION_EVENTS_GENERATION, 0):
+        with state.violation_events_lock:
+            rewrite_generation = state.sessions.generation(VIOLATION_EVENTS_REWRITE_GENERATION)
+            appended = None
+            if rewrite_generation == state.synced_generations.get(VIOLATION_EVENTS_REWRITE_GENERATION, 0):
+                appended = state.sessions.shared_events_since(state.event_index.last_event_id)
+            if appended is not None:
+                for user_key, event in appended:
+                    _apply_shared_event(state, user_key, event, max_events_per_user)
+                    if on_new_event is not None:
+                        on_new_event(user_key, event)
+            else:
+                _reload_violation_events(state, events_file, on_new_event)
+            state.synced_generations[VIOLATION_EVENTS_REWRITE_GENERATION] = rewrite_generation
+        state.synced_generations[VIOLATION_EVENTS_GENERATION] = generation
+
+
+def _apply_shared_event(state: AppState, user_key: str, event: dict[str, Any], max_events_per_user: int) -> None:
+    # Mirrors append_violation_event, minus the files the appending worker already wrote.
+    per_user = state.violation_events.setdefault(user_key, [])
+    per_user.append(event)
+    state.event_index.add(user_key, event)
+    if len(per_user) > max_events_per_user:
+        for old_event in per_user[: len(per_user) - max_events_per_user]:
+            state.event_index.remove(old_event)
+        del per_user[: len(per_user) - max_events_per_user]
+    state.user_summary.update_violations(user_key, per_user)
+    state.rollups.record(user_key, event)
+
+
+def _reload_violation_events(
+    state: AppState,
+    events_file: Path,
+    on_new_event: Callable[[str, dict[str, Any]], None] | None,
+) -> None:
+    previous_event_id = state.event_index.last_event_id
+    state.violation_events = load_violation_events(events_file)
+    state.event_index.rebuild(state.violation_events)
+    state.user_summary.rebuild(state.registered_faces, state.violation_events)
+    state.rollups.catch_up(state.violation_events, state.event_index.last_event_id)
+    if on_new_event is not None:
+        appended = sorted(
+            (
+                (event["event_id"], user_key, event)
+                for user_key, events in state.violation_events.items()
+                for event in events
+                if isinstance(event.get("event_id"), int) and event["event_id"] > previous_event_id
+            ),
+            key=lambda item: item[0],
+        )
+        for _, user_key, event in appended:
+            on_new_event(user_key, event)
+
+
+def refresh_profiler_settings(state: AppState, profiler_dir: Path) -> None:
+    """Pick up profiling switched on or off from an admin request served by another process."""
+    generation = state.sessions.generation(PROFILER_GENERATION)
+    if generation == state.synced_generations.get(PROFILER_GENERATION, 0):
+        return
+    state.profiler.configure(load_profiler_settings(profiler_dir))
+    if not state.profiler.settings.enabled:
+        state.profiler.flush(profiler_dir)
+    state.synced_generations[PROFILER_GENERATION] = generation
+
+
+def publish_shared_change(state: AppState, name: str) -> None:
+    # Callers hold state.sessions.mutex(name), so no other worker's change can slip in between.
+    state.synced_generations[name] = state.sessions.bump_generation(name)
+
+
+def publish_violation_event(state: AppState, user_key: str, event: dict[str, Any]) -> None:
+    """Journal an appended event for other workers, then announce it; callers hold the events mutex."""
+    state.sessions.append_shared_event(user_key, event)
+    publish_shared_change(state, VIOLATION_EVENTS_GENERATION)
@@ -0,0 +1,213 @@
+import asyncio
+import io
+import sys
+import time
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+WsgiApp = Callable[[dict[str, Any], Callable[..., Any]], Iterable[bytes]]
+# When the request body was fully received; the view can tell from it how long it queued.
+RECEIVED_AT_ENVIRON_KEY = "proctoring.received_at"
+
+
+class _Disconnected(Exception):
+    pass
+
+
+class AsgiAdapter:
+    """
+    Serves a WSGI app over ASGI. Request bodies are read and responses written
+    on the event loop, so a slow upload or download holds no thread; only the
+    view itself runs on an executor. Model-backed paths get their own small
+    pool so admin traffic and event streams never queue behind inference, and
+    streamed bodies are pulled on a third, so a long-lived event stream holds
+    a stream thread rather than one that serves views.
+    """
+
+    def __init__(
+        self,
+        wsgi_app: WsgiApp,
+        *,
+        inference_paths: Iterable[str],
+        inference_threads: int,
+        io_threads: int,
+        stream_threads: int,
+        max_body_bytes: int,
+        buffered_response_bytes: int,
+    ) -> None:
+        self.wsgi_app = wsgi_app
+        self.inference_paths = frozenset(inference_paths)
+        self.max_body_bytes = int(max_body_bytes)
+        self.buffered_response_bytes = int(buffered_response_bytes)
+        self.inference_executor = ThreadPoolExecutor(
+            max(1, int(inference_threads)),
+            thread_name_prefix="asgi-inference",
+        )
+        self.io_executor = ThreadPoolExecutor(max(1, int(io_threads)), thread_name_prefix="asgi-io")
+        self.stream_executor = ThreadPoolExecutor(max(1, int(stream_threads)), thread_name_prefix="asgi-stream")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            try:
+                await self._http(scope, receive, send)
+            except _Disconnected:
+                pass
+
+    def shutdown(self) -> None:
+        self.inference_executor.shutdown(wait=False, cancel_futures=True)
+        self.io_executor.shutdown(wait=False, cancel_futures=True)
+        self.stream_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        body = await self._read_body(scope, receive)
+        if body is None:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 413,
+                    "headers": [(b"content-type", b"application/json"), (b"connection", b"close")],
+                }
+            )
+            await send({"type": "http.response.body", "body": b'{"error": "Request body too large"}'})
+            return
+
+        executor = self.inference_executor if scope["path"] in self.inference_paths else self.io_executor
+        loop = asyncio.get_running_loop()
+        status, headers, chunks, iterator, iterable = await loop.run_in_executor(
+            executor, self._run_view, _build_environ(scope, body)
+        )
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        try:
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            if chunks:
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+            # Streamed bodies (SSE, ZIP exports) pull one chunk per stream-pool hop and
+            # stop as soon as the client goes away.
+            while iterator is not None and not disconnected.done():
+                chunk = await loop.run_in_executor(self.stream_executor, next, iterator, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            if not disconnected.done():
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            disconnected.cancel()
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                await loop.run_in_executor(self.stream_executor, close)
+
+    async def _read_body(self, scope: Scope, receive: Receive) -> bytes | None:
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_body_bytes:
+                return None
+        parts: list[bytes] = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise _Disconnected()
+            part = message.get("body", b"")
+            size += len(part)
+            if size > self.max_body_bytes:
+                return None
+            parts.append(part)
+            if not message.get("more_body", False):
+                return b"".join(parts)
+
+    def _run_view(
+        self, environ: dict[str, Any]
+    ) -> tuple[int, list[tuple[bytes, bytes]], list[bytes], Iterator[bytes] | None, Iterable[bytes] | None]:
+        started: list[Any] = []
+
+        def start_response(
+            status: str,
+            headers: list[tuple[str, str]],
+            exc_info: Any = None,
+        ) -> Callable[[bytes], None]:
+            if exc_info is not None and started:
+                raise exc_info[1].with_traceback(exc_info[2])
+            started[:] = [status, headers]
+            return _write_not_supported
+
+        iterable = self.wsgi_app(environ, start_response)
+        iterator = iter(iterable)
+        chunks: list[bytes] = []
+        if not started:
+            # WSGI lets an app defer start_response until its first chunk.
+            first = next(iterator, None)
+            if first is not None:
+                chunks.append(first)
+        status_line, header_items = started
+        headers = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in header_items]
+        content_length = next((value for name, value in headers if name == b"content-length"), b"")
+        if content_length.isdigit() and int(content_length) <= self.buffered_response_bytes:
+            # Small bodies with a known length (JSON, thumbnails) are drained in this hop.
+            chunks.extend(iterator)
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+            return int(status_line.split(" ", 1)[0]), headers, chunks, None, None
+        return int(status_line.split(" ", 1)[0]), headers, chunks, iterator, iterable
+
+
+async def _wait_for_disconnect(receive: Receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def _write_not_supported(data: bytes) -> None:
+    raise NotImplementedError("The WSGI write() callable is not supported; return an iterable instead")
+
+
+def _build_environ(scope: Scope, body: bytes) -> dict[str, Any]:
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    client = scope.get("client")
+    environ: dict[str, Any] = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": str(server_name),
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0] if client else "",
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+        RECEIVED_AT_ENVIRON_KEY: time.time(),
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name == "CONTENT_LENGTH":
+            continue
+        if name != "CONTENT_TYPE":
+            name = f"HTTP_{name}"
+        if name in environ:
+            environ[name] += ("; " if name == "HTTP_COOKIE" else ",") + value
+        else:
+            environ[name] = value
+    return environ
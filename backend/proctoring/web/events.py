@@ -0,0 +1,53 @@
+from pathlib import Path
+from typing import Any
+
+from flask import Flask, url_for
+
+from proctoring.infrastructure.evidence import resolve_evidence_path
+from proctoring.state import ROLE_INFERENCE, AppState, refresh_profiler_settings, refresh_shared_state
+
+
+def evidence_url(relative_path: str, variant: str = "full") -> str:
+    return url_for("admin_evidence_file", variant=variant, relative_path=relative_path)
+
+
+def serialize_event(captures_dir: Path, user_key: str, event: dict[str, Any]) -> dict[str, Any] | None:
+    relative_path = str(event.get("image_path", "")).strip()
+    if not relative_path:
+        return None
+    clip_url = None
+    clip_relative_path = str(event.get("clip_path", "") or "").strip()
+    clip_full_path = resolve_evidence_path(captures_dir, clip_relative_path)
+    if clip_full_path is not None and clip_full_path.exists():
+        clip_url = evidence_url(clip_relative_path)
+    return {
+        "event_id": event.get("event_id"),
+        "user_key": user_key,
+        "username": str(event.get("username", "")),
+        "timestamp": str(event.get("timestamp", "")),
+        "violations": list(event.get("violations", [])),
+        "image_url": evidence_url(relative_path),
+        "thumbnail_url": evidence_url(relative_path, "thumb"),
+        "clip_url": clip_url,
+    }
+
+
+def publish_violation(app: Flask, state: AppState, user_key: str, event: dict[str, Any]) -> None:
+    # Inference-only processes serve no event stream (or evidence URLs) to publish to.
+    if state.role == ROLE_INFERENCE:
+        return
+    published = serialize_event(app.config["VIOLATION_CAPTURES_DIR"], user_key, event)
+    if published is not None:
+        published["violation_count"] = len(state.violation_events.get(user_key, []))
+        state.event_broker.publish("violation", user_key, published)
+
+
+def sync_shared_state(app: Flask, state: AppState) -> None:
+    refresh_shared_state(
+        state,
+        app.config["REGISTERED_FACES_FILE"],
+        app.config["VIOLATION_EVENTS_FILE"],
+        int(app.config["MAX_VIOLATION_EVENTS_PER_USER"]),
+        on_new_event=lambda user_key, event: publish_violation(app, state, user_key, event),
+    )
+    refresh_profiler_settings(state, app.config["PROFILER_DIR"])
@@ -0,0 +1,57 @@
+import urllib.error
+import urllib.request
+from typing import Any
+
+from flask import Flask, Response, jsonify, request
+
+# Model-backed routes: served by processes with role "all" or "inference".
+INFERENCE_ENDPOINTS = {
+    "register_face": "/register_face",
+    "registration_pose_check": "/registration_pose_check",
+    "verify_face": "/verify_face",
+    "analyze_frame": "/analyze_frame",
+}
+FORWARDED_REQUEST_HEADERS = ("Content-Type", "Cookie", "User-Agent", "Accept")
+# Shed frames carry a Retry-After hint the exam page must still see.
+FORWARDED_RESPONSE_HEADERS = ("Retry-After",)
+
+
+def register_inference_forwarding(app: Flask, upstream_url: str, timeout_seconds: float) -> None:
+    """
+    Stand-ins for the inference routes in an API-only process. Requests are
+    relayed to upstream_url when it is set, so a single public origin still
+    works; otherwise the load balancer is expected to route these paths.
+    """
+    upstream_url = upstream_url.rstrip("/")
+
+    def forward() -> tuple[Any, int] | Any:
+        if not upstream_url:
+            return jsonify({"error": "Inference is served by dedicated workers"}), 503
+
+        headers = {name: request.headers[name] for name in FORWARDED_REQUEST_HEADERS if name in request.headers}
+        headers["X-Forwarded-For"] = request.remote_addr or ""
+        upstream_request = urllib.request.Request(
+            upstream_url + request.full_path.rstrip("?"),
+            data=request.get_data(),
+            headers=headers,
+            method=request.method,
+        )
+        try:
+            with urllib.request.urlopen(upstream_request, timeout=timeout_seconds) as upstream:
+                status, body, upstream_headers = upstream.status, upstream.read(), upstream.headers
+        except urllib.error.HTTPError as exc:
+            status, body, upstream_headers = exc.code, exc.read(), exc.headers
+        except OSError:
+            return jsonify({"error": "Inference workers are unavailable"}), 502
+
+        response = Response(body, status=status, content_type=upstream_headers.get("Content-Type"))
+        for name in FORWARDED_RESPONSE_HEADERS:
+            if name in upstream_headers:
+                response.headers[name] = upstream_headers[name]
+        # verify_face stores the verified user in the session cookie.
+        for cookie in upstream_headers.get_all("Set-Cookie") or []:
+            response.headers.add("Set-Cookie", cookie)
+        return response
+
+    for endpoint, path in INFERENCE_ENDPOINTS.items():
+        app.add_url_rule(path, endpoint=endpoint, view_func=forward, methods=["POST"])
@@ -0,0 +1,550 @@
+from __future__ import annotations
+
+import math
+import sqlite3
+import time
+from concurrent.futures import Executor
+from typing import Any
+
+import numpy as np
+from flask import Flask, jsonify, request, session
+
+from proctoring.config import (
+    ANALYSIS_IDENTITY_STAGE_ENABLED,
+    ANALYSIS_PHONE_STAGE_ENABLED,
+    CLIENT_FACE_CROP_MAX_DIM,
+    EVIDENCE_THUMBNAIL_WIDTH,
+    LIVE_IDENTITY_MISMATCH_STREAK_THRESHOLD,
+    LIVE_MATCH_THRESHOLD,
+    LOW_LIGHT_MEAN_THRESHOLD,
+    PHONE_VISIBLE_STREAK_THRESHOLD,
+    PROFILER_FLUSH_INTERVAL_SECONDS,
+    QUALITY_DEGRADED_STREAK_THRESHOLD,
+    QUALITY_FROZEN_STREAK_THRESHOLD,
+    REGISTRATION_CENTER_MAX,
+    REGISTRATION_MIN_FACE_AREA_RATIO,
+    REGISTRATION_SIDE_MIN,
+    START_MATCH_THRESHOLD,
+    VIOLATION_CAPTURE_COOLDOWN_SECONDS,
+    VIOLATION_CLIP_ENABLED,
+)
+from proctoring.domain import AnalysisResult, ReceivedFrame, RegisteredUser
+from proctoring.infrastructure import append_violation_event, save_registered_faces
+from proctoring.infrastructure.evidence import resolve_evidence_path
+from proctoring.services.identity import (
+    collect_registration_image_payloads,
+    compute_face_signature,
+    decode_data_url_image,
+    decode_payload_frame,
+    decode_payload_received_frame,
+    extract_single_face_crop,
+    get_single_face_area_ratio,
+    is_face_close_enough,
+    verify_face_crop_for_user,
+    verify_identity_for_user,
+)
+from proctoring.services.client_face import FaceCropClaim, face_crop_frame_request, parse_client_face_count
+from proctoring.services.heartbeat import FrameHeartbeat, heartbeat_frame_request
+from proctoring.services.quality import assess_frame_quality
+from proctoring.services.sessions import SessionRecord
+from proctoring.services.stage_graph import Stage, StageGraph, StageInputs
+from proctoring.state import (
+    REGISTERED_FACES_GENERATION,
+    VIOLATION_EVENTS_GENERATION,
+    AppState,
+    publish_shared_change,
+    publish_violation_event,
+)
+from proctoring.web.events import publish_violation, sync_shared_state
+from proctoring.web.request_utils import (
+    get_request_queue_age,
+    get_verified_user_key,
+    is_mobile_request,
+    mobile_not_supported_response,
+    normalize_username,
+    is_valid_person_name,
+)
+
+
+def register_inference_routes(app: Flask, state: AppState) -> None:
+    """Model-backed routes; only registered in processes whose role loads the vision models."""
+    analyzer = state.analyzer
+    phone_detector = state.phone_detector
+    frame_buffer = state.frame_buffer
+    clip_writer = state.clip_writer
+    if analyzer is None or phone_detector is None or frame_buffer is None or clip_writer is None:
+        raise RuntimeError("Inference routes need the vision models; load them with the app state")
+
+    def verify_live_identity(inputs: StageInputs) -> tuple[bool | None, float | None]:
+        result: AnalysisResult = inputs["face"]
+        identity_tracker = inputs["record"].identity
+        if result.face_count != 1:
+            identity_tracker.note_track_break()
+        elif "looking_sideways" in result.violations:
+            identity_tracker.reset_streak()
+        elif inputs["low_light"]:
+            # Skip mismatch streak updates in poor lighting to reduce false positives.
+            pass
+        elif identity_tracker.should_verify():
+            if inputs.get("face_crop"):
+                _, identity_score = verify_face_crop_for_user(
+                    registered_faces=state.registered_faces,
+                    username=inputs["username"],
+                    face_crop_bgr=inputs["frame"],
+                    threshold=LIVE_MATCH_THRESHOLD,
+                )
+            else:
+                _, identity_score = verify_identity_for_user(
+                    registered_faces=state.registered_faces,
+                    face_detection=analyzer.face_detection,
+                    username=inputs["username"],
+                    frame_bgr=inputs["frame"],
+                    threshold=LIVE_MATCH_THRESHOLD,
+                )
+            return identity_tracker.record(identity_score), identity_score
+        else:
+            identity_tracker.skip()
+        return None, None
+
+    # Phone detection needs nothing from the face models, so it overlaps with face analysis
+    # and identity verification.
+    analysis_graph = StageGraph(
+        [
+            Stage("face", lambda inputs: analyzer.analyze(inputs["frame"])),
+            Stage(
+                "phone",
+                lambda inputs: phone_detector.detect_phone(inputs["frame"]),
+                enabled=ANALYSIS_PHONE_STAGE_ENABLED,
+            ),
+            Stage("identity", verify_live_identity, after=("face",), enabled=ANALYSIS_IDENTITY_STAGE_ENABLED),
+        ]
+    )
+    # A client-cropped face skips face detection and phone detection; both run on the periodic full frames.
+    face_crop_graph = StageGraph(
+        [
+            Stage("face", lambda inputs: analyzer.analyze_face_crop(inputs["frame"])),
+            Stage("identity", verify_live_identity, after=("face",), enabled=ANALYSIS_IDENTITY_STAGE_ENABLED),
+        ]
+    )
+
+    def capture_violation_evidence(key: str, username: str, violations: list[str], frame: ReceivedFrame) -> None:
+        now_ts = time.time()
+        # Claimed atomically in the session store, so only one worker captures per cooldown window.
+        if not state.sessions.try_claim_capture(key, now_ts, VIOLATION_CAPTURE_COOLDOWN_SECONDS):
+            return
+        try:
+            with state.sessions.mutex(VIOLATION_EVENTS_GENERATION), state.violation_events_lock:
+                sync_shared_state(app, state)
+                event = append_violation_event(
+                    events=state.violation_events,
+                    file_path=app.config["VIOLATION_EVENTS_FILE"],
+                    captures_dir=app.config["VIOLATION_CAPTURES_DIR"],
+                    user_key=key,
+                    username=username,
+                    violations=list(violations),
+                    max_events_per_user=int(app.config["MAX_VIOLATION_EVENTS_PER_USER"]),
+                    frame_bgr=frame.image,
+                    encoded_jpeg=frame.jpeg_bytes,
+                    with_clip=VIOLATION_CLIP_ENABLED,
+                    thumbnail_width=EVIDENCE_THUMBNAIL_WIDTH,
+                    index=state.event_index,
+                )
+                user_events = state.violation_events.get(key, [])
+                state.user_summary.update_violations(key, user_events)
+                state.rollups.record(key, event)
+                publish_violation(app, state, key, event)
+                publish_violation_event(state, key, event)
+            clip_path = resolve_evidence_path(app.config["VIOLATION_CAPTURES_DIR"], event.get("clip_path", ""))
+            if clip_path is not None:
+                clip_writer.schedule(key, now_ts, clip_path)
+        except OSError:
+            pass
+        except sqlite3.OperationalError:
+            # A busy or locked session store costs this capture, not the analysis response.
+            app.logger.warning("Could not capture violation evidence for %s", key, exc_info=True)
+
+    def analyze_session_heartbeat(
+        record: SessionRecord,
+        payload: dict[str, Any],
+        received_ts: float,
+    ) -> tuple[Any, int] | Any:
+        try:
+            heartbeat = FrameHeartbeat.from_payload(payload)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        reason = heartbeat_frame_request(record, heartbeat, received_ts)
+        return jsonify(
+            {
+                "skipped": True,
+                "heartbeat": True,
+                "frame_required": reason is not None,
+                "reason": reason,
+                "violations": [],
+            }
+        )
+
+    def analyze_session_face_crop(
+        key: str,
+        username: str,
+        payload: dict[str, Any],
+        received_ts: float,
+        record: SessionRecord,
+        stage_executor: Executor | None,
+    ) -> tuple[Any, int] | Any:
+        try:
+            claim = FaceCropClaim.from_payload(payload)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        reason = face_crop_frame_request(record, claim, received_ts)
+        if reason is not None:
+            return jsonify({"skipped": True, "frame_required": True, "reason": reason, "violations": []})
+        try:
+            received = decode_payload_received_frame(payload, key="face_crop")
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 400
+        if max(received.image.shape[:2]) > CLIENT_FACE_CROP_MAX_DIM:
+            return jsonify({"error": f"Face crop must be at most {CLIENT_FACE_CROP_MAX_DIM} pixels"}), 400
+        record.last_analyzed_ts = received_ts
+        record.last_frame_clean = False
+
+        try:
+            stages = face_crop_graph.run(
+                {
+                    "frame": received.image,
+                    "face_crop": True,
+                    "username": username,
+                    "record": record,
+                    # Crops are only accepted when the client's frame brightness cleared this threshold.
+                    "low_light": False,
+                },
+                executor=stage_executor,
+            )
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 400
+        result = stages["face"]
+        identity_tracker = record.identity
+        identity_match, identity_score = stages["identity"] or (None, None)
+        if identity_tracker.mismatch_streak >= LIVE_IDENTITY_MISMATCH_STREAK_THRESHOLD:
+            result.violations.append("identity_mismatch")
+
+        if result.violations:
+            capture_violation_evidence(key, username, result.violations, received)
+        record.last_frame_clean = not result.violations
+
+        return jsonify(
+            {
+                "skipped": False,
+                "face_crop": True,
+                "face_count": result.face_count,
+                "sideways_score": result.sideways_score,
+                "identity_match": identity_match,
+                "identity_score": identity_score,
+                "identity_score_avg": identity_tracker.score,
+                "identity_mismatch_streak": identity_tracker.mismatch_streak,
+                "identity_live_threshold": LIVE_MATCH_THRESHOLD,
+                "brightness": claim.scene.brightness,
+                "violations": result.violations,
+            }
+        )
+
+    def analyze_session_frame(
+        key: str,
+        username: str,
+        payload: dict[str, Any],
+        received_ts: float,
+        record: SessionRecord,
+        stage_executor: Executor | None,
+    ) -> tuple[Any, int] | Any:
+        try:
+            received = decode_payload_received_frame(payload)
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 400
+        record.last_analyzed_ts = received_ts
+        record.last_full_frame_ts = received_ts
+        record.last_frame_clean = False
+        frame = received.image
+        frame_buffer.append(key, received_ts, received.encoded)
+
+        quality, record.quality_thumbnail = assess_frame_quality(frame, record.quality_thumbnail)
+        brightness = quality.brightness
+        record.frozen_streak = record.frozen_streak + 1 if quality.verdict == "frozen" else 0
+        record.blurry_streak = record.blurry_streak + 1 if quality.verdict == "blurry" else 0
+        record.overexposed_streak = record.overexposed_streak + 1 if quality.verdict == "overexposed" else 0
+
+        if not quality.usable:
+            # Unusable frames skip face, phone and identity models entirely, so a camera that keeps
+            # sending them is itself reported.
+            quality_violations: list[str] = []
+            if brightness < LOW_LIGHT_MEAN_THRESHOLD:
+                quality_violations.append("low_lighting")
+            if record.frozen_streak >= QUALITY_FROZEN_STREAK_THRESHOLD:
+                quality_violations.append("camera_frozen")
+            if record.blurry_streak >= QUALITY_DEGRADED_STREAK_THRESHOLD:
+                quality_violations.append("camera_blurry")
+            if record.overexposed_streak >= QUALITY_DEGRADED_STREAK_THRESHOLD:
+                quality_violations.append("camera_overexposed")
+            if quality_violations:
+                capture_violation_evidence(key, username, quality_violations, received)
+            return jsonify(
+                {
+                    "skipped": True,
+                    "quality": quality.to_dict(),
+                    "brightness": brightness,
+                    "violations": quality_violations,
+                }
+            )
+
+        try:
+            stages = analysis_graph.run(
+                {
+                    "frame": frame,
+                    "username": username,
+                    "record": record,
+                    "low_light": brightness < LOW_LIGHT_MEAN_THRESHOLD,
+                },
+                executor=stage_executor,
+            )
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 400
+        result = stages["face"]
+        client_face_count = parse_client_face_count(payload.get("client_face_count"))
+        if client_face_count is not None:
+            # Crops are only trusted while the client's own count agrees with ours on full frames.
+            record.client_faces_verified = client_face_count == result.face_count
+        if brightness < LOW_LIGHT_MEAN_THRESHOLD:
+            result.violations.append("low_lighting")
+        phone_detected = bool(stages["phone"])
+        if phone_detected:
+            record.phone_visible_streak += 1
+        else:
+            record.phone_visible_streak = 0
+            record.phone_visible_active = False
+
+        if record.phone_visible_streak >= PHONE_VISIBLE_STREAK_THRESHOLD and not record.phone_visible_active:
+            result.violations.append("phone_visible")
+            record.phone_visible_active = True
+
+        identity_tracker = record.identity
+        identity_match, identity_score = stages["identity"] or (None, None)
+        if result.face_count == 1 and identity_tracker.mismatch_streak >= LIVE_IDENTITY_MISMATCH_STREAK_THRESHOLD:
+            result.violations.append("identity_mismatch")
+
+        if result.violations:
+            capture_violation_evidence(key, username, result.violations, received)
+        record.last_frame_clean = not result.violations
+
+        return jsonify(
+            {
+                "skipped": False,
+                "quality": quality.to_dict(),
+                "face_count": result.face_count,
+                "sideways_score": result.sideways_score,
+                "identity_match": identity_match,
+                "identity_score": identity_score,
+                "identity_score_avg": identity_tracker.score,
+                "identity_mismatch_streak": identity_tracker.mismatch_streak,
+                "identity_live_threshold": LIVE_MATCH_THRESHOLD,
+                "brightness": brightness,
+                "phone_detected": phone_detected,
+                "phone_visible_streak": record.phone_visible_streak,
+                "phone_detector_enabled": phone_detector.enabled,
+                "violations": result.violations,
+            }
+        )
+
+    @app.post("/register_face")
+    def register_face() -> tuple[Any, int] | Any:
+        if is_mobile_request(request):
+            return mobile_not_supported_response()
+
+        payload = request.get_json(silent=True) or {}
+        username, key = normalize_username(payload.get("username"))
+        first_name = str(payload.get("first_name", "")).strip()
+        last_name = str(payload.get("last_name", "")).strip()
+        email = str(payload.get("email", "")).strip()
+        if not username:
+            return jsonify({"error": "Username is required"}), 400
+        if not is_valid_person_name(first_name):
+            return jsonify({"error": "Valid first name is required"}), 400
+        if not is_valid_person_name(last_name):
+            return jsonify({"error": "Valid last name is required"}), 400
+
+        image_payloads = collect_registration_image_payloads(payload)
+        if not image_payloads:
+            return jsonify({"error": "At least one image is required"}), 400
+
+        signatures: list[np.ndarray] = []
+        try:
+            for encoded_image in image_payloads:
+                frame = decode_data_url_image(encoded_image)
+                if not is_face_close_enough(
+                    analyzer.face_detection,
+                    frame,
+                    min_area_ratio=REGISTRATION_MIN_FACE_AREA_RATIO,
+                ):
+                    raise ValueError("Move closer to the camera and keep your face larger in frame.")
+                face_crop = extract_single_face_crop(analyzer.face_detection, frame)
+                signatures.append(compute_face_signature(face_crop))
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        if not signatures:
+            return jsonify({"error": "Could not build face signatures"}), 400
+
+        with state.sessions.mutex(REGISTERED_FACES_GENERATION):
+            sync_shared_state(app, state)
+            state.registered_faces[key] = RegisteredUser(
+                username=username,
+                signatures=signatures,
+                first_name=first_name,
+                last_name=last_name,
+                email=email,
+            )
+            state.user_summary.upsert_user(key, state.registered_faces[key], state.violation_events.get(key, []))
+            try:
+                save_registered_faces(app.config["REGISTERED_FACES_FILE"], state.registered_faces)
+            except OSError:
+                return jsonify({"error": "Face captured but could not save to disk"}), 500
+            publish_shared_change(state, REGISTERED_FACES_GENERATION)
+        state.event_broker.publish("user", key, {"user_key": key, "username": username})
+        state.sessions.discard(key)
+
+        return jsonify(
+            {
+                "ok": True,
+                "message": f"Face registered for {username} with {len(signatures)} samples",
+            }
+        )
+
+    @app.post("/registration_pose_check")
+    def registration_pose_check() -> tuple[Any, int] | Any:
+        if is_mobile_request(request):
+            return mobile_not_supported_response()
+
+        payload = request.get_json(silent=True) or {}
+        try:
+            frame = decode_payload_frame(payload)
+            result = analyzer.analyze(frame)
+            face_area_ratio = None
+            if result.face_count == 1:
+                face_area_ratio = get_single_face_area_ratio(analyzer.face_detection, frame)
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        pose_hint = "unknown"
+        if result.face_count == 1 and result.sideways_score is not None:
+            score = float(result.sideways_score)
+            if abs(score) <= REGISTRATION_CENTER_MAX:
+                pose_hint = "center"
+            elif score >= REGISTRATION_SIDE_MIN:
+                pose_hint = "right"
+            elif score <= -REGISTRATION_SIDE_MIN:
+                pose_hint = "left"
+
+        close_enough = bool(face_area_ratio is not None and face_area_ratio >= REGISTRATION_MIN_FACE_AREA_RATIO)
+        return jsonify(
+            {
+                "face_count": result.face_count,
+                "sideways_score": result.sideways_score,
+                "face_area_ratio": face_area_ratio,
+                "close_enough": close_enough,
+                "pose_hint": pose_hint,
+                "center_max": REGISTRATION_CENTER_MAX,
+                "side_min": REGISTRATION_SIDE_MIN,
+                "min_face_area_ratio": REGISTRATION_MIN_FACE_AREA_RATIO,
+            }
+        )
+
+    @app.post("/verify_face")
+    def verify_face() -> tuple[Any, int] | Any:
+        if is_mobile_request(request):
+            return mobile_not_supported_response()
+
+        payload = request.get_json(silent=True) or {}
+        username, key = normalize_username(payload.get("username"))
+        if not username:
+            return jsonify({"error": "Username is required"}), 400
+        if key not in state.registered_faces:
+            return jsonify({"error": "User is not registered"}), 400
+
+        try:
+            frame = decode_payload_frame(payload)
+            is_match, score = verify_identity_for_user(
+                registered_faces=state.registered_faces,
+                face_detection=analyzer.face_detection,
+                username=username,
+                frame_bgr=frame,
+                threshold=START_MATCH_THRESHOLD,
+            )
+        except Exception as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        if is_match:
+            session["verified_user"] = key
+            state.sessions.start(key, time.time())
+        else:
+            session.pop("verified_user", None)
+            state.sessions.discard(key)
+
+        return jsonify({"ok": True, "match": is_match, "score": score, "threshold": START_MATCH_THRESHOLD})
+
+    @app.post("/analyze_frame")
+    def analyze_frame() -> tuple[Any, int] | Any:
+        if is_mobile_request(request):
+            return mobile_not_supported_response()
+
+        payload = request.get_json(silent=True) or {}
+        username, key = normalize_username(payload.get("username"))
+
+        if not username:
+            return jsonify({"error": "Username is required"}), 400
+        if get_verified_user_key() != key:
+            return jsonify({"error": "Unauthorized monitoring session"}), 403
+        if key not in state.registered_faces:
+            return jsonify({"error": "User is not registered"}), 400
+
+        received_ts = time.time()
+        record = state.sessions.load(key, received_ts)
+        if payload.get("heartbeat"):
+            # Nothing to decode or analyze, so heartbeats skip admission; the load above kept the session alive.
+            return analyze_session_heartbeat(record, payload, received_ts)
+        admission = state.admission
+        if admission is not None and not admission.try_admit(
+            admission.is_priority(record, received_ts),
+            get_request_queue_age(request, received_ts),
+        ):
+            # Shed before the frame is even decoded, so an overloaded worker spends almost nothing on it.
+            retry_after_ms = admission.retry_after()
+            response = jsonify(
+                {"skipped": True, "overloaded": True, "retry_after_ms": retry_after_ms, "violations": []}
+            )
+            response.headers["Retry-After"] = str(math.ceil(retry_after_ms / 1000))
+            return response
+        try:
+            analyze = analyze_session_face_crop if "face_crop" in payload else analyze_session_frame
+            profiler = state.profiler
+            if not profiler.should_profile(key, received_ts):
+                return analyze(key, username, payload, received_ts, record, state.stage_executor)
+            label = "POST /analyze_frame"
+            response = profiler.profile_request(
+                label,
+                analyze,
+                key,
+                username,
+                payload,
+                received_ts,
+                record,
+                profiler.wrap_executor(state.stage_executor, label),
+            )
+            try:
+                profiler.maybe_flush(app.config["PROFILER_DIR"], time.time(), PROFILER_FLUSH_INTERVAL_SECONDS)
+            except OSError:
+                app.logger.warning("Could not write profiler stacks", exc_info=True)
+            return response
+        finally:
+            try:
+                state.sessions.save(key, record)
+            finally:
+                # A failed save (a busy SQLite store) must not leak the slot, or the process ends up shedding everything.
+                if admission is not None:
+                    admission.release()
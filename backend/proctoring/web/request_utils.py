@@ -1,10 +1,13 @@
+from datetime import datetime, timezone
 from typing import Any
+import os
 import re
 
 from flask import Request, jsonify, session
 
-from proctoring.config import MOBILE_UA_TOKENS
+from proctoring.config import MOBILE_UA_TOKENS, TRUSTED_PROXY_ADDRESSES, TRUSTED_PROXY_ADDRESSES_ENV
 from proctoring.domain import RegisteredUser
+from proctoring.web.asgi import RECEIVED_AT_ENVIRON_KEY
 
 
 def normalize_username(value: Any) -> tuple[str, str]:
@@ -19,6 +22,41 @@ def parse_non_negative_int(value: Any, default: int = 0) -> int:
         return default
 
 
+def parse_limit(value: Any, default: int, maximum: int) -> int:
+    try:
+        parsed = int(value)
+    except (TypeError, ValueError):
+        return default
+    return min(max(1, parsed), maximum)
+
+
+def parse_timestamp_param(value: Any) -> float | None:
+    raw = str(value or "").strip()
+    if not raw:
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError as exc:
+        raise ValueError(f"Invalid timestamp: {raw}") from exc
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_cursor(value: Any) -> int | None:
+    raw = str(value or "").strip()
+    if not raw:
+        return None
+    try:
+        return max(0, int(raw))
+    except ValueError as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
 _NAME_RE = re.compile(r"^[A-Za-z][A-Za-z' -]{0,48}$")
 
 
@@ -86,3 +124,30 @@ def is_mobile_request(req: Request) -> bool:
 
 def mobile_not_supported_response(status_code: int = 400) -> tuple[Any, int]:
     return jsonify({"error": "Mobile devices are not supported. Please use a desktop/laptop browser."}), status_code
+
+
+def get_request_queue_age(req: Request, now_ts: float) -> float:
+    """
+    Seconds the request waited before its view started: stamped by the ASGI
+    adapter, or taken from a trusted proxy's X-Request-Start header
+    (t=<seconds or ms>).
+    """
+    received_at = req.environ.get(RECEIVED_AT_ENVIRON_KEY)
+    if received_at is None:
+        if req.remote_addr not in trusted_proxy_addresses():
+            return 0.0
+        raw = (req.headers.get("X-Request-Start") or "").strip().removeprefix("t=")
+        try:
+            received_at = float(raw)
+        except ValueError:
+            return 0.0
+        if received_at > 1e11:
+            received_at /= 1000.0
+    return max(0.0, now_ts - float(received_at))
+
+
+def trusted_proxy_addresses() -> frozenset[str]:
+    configured = os.environ.get(TRUSTED_PROXY_ADDRESSES_ENV)
+    if configured is None:
+        return frozenset(TRUSTED_PROXY_ADDRESSES)
+    return frozenset(address.strip() for address in configured.split(",") if address.strip())
@@ -1,89 +1,190 @@
 from __future__ import annotations
 
+import json
+import os
 import time
+import uuid
+from datetime import datetime, timezone
 from typing import Any
 
-import numpy as np
-from flask import Flask, jsonify, redirect, render_template, request, session, url_for
-from flask import Response
+from flask import Flask, jsonify, redirect, render_template, request, send_file, session, url_for
+from flask import Response, stream_with_context
 
 from proctoring.config import (
     ADMIN_PASSWORD,
-    LIVE_IDENTITY_MISMATCH_STREAK_THRESHOLD,
-    LIVE_MATCH_THRESHOLD,
-    LOW_LIGHT_MEAN_THRESHOLD,
+    ADMIN_USERS_DEFAULT_LIMIT,
+    ADMIN_USERS_MAX_LIMIT,
+    ANALYTICS_DEFAULT_WINDOW_SECONDS,
+    CLIENT_FACE_CROP_MAX_DIM,
+    CLIENT_FACE_DETECTION_ENABLED,
+    CLIENT_FACE_FULL_FRAME_INTERVAL_SECONDS,
+    EVENT_QUERY_DEFAULT_LIMIT,
+    EVENT_QUERY_MAX_LIMIT,
+    EVENT_STREAM_HEARTBEAT_SECONDS,
+    EVENT_STREAM_MAX_SECONDS,
+    EVENT_STREAM_SYNC_SECONDS,
+    EVIDENCE_CACHE_MAX_AGE_SECONDS,
+    EVIDENCE_THUMBNAIL_WIDTH,
+    FRAME_HEARTBEAT_MAX_INTERVAL_SECONDS,
+    FRAME_PREFILTER_ENABLED,
+    FRAME_PREFILTER_MIN_CHANGE,
+    INFERENCE_UPSTREAM_ENV,
+    INFERENCE_UPSTREAM_TIMEOUT_SECONDS,
     MIN_DOWNLOAD_MBPS,
-    PHONE_VISIBLE_STREAK_THRESHOLD,
-    REGISTRATION_CENTER_MAX,
-    REGISTRATION_MIN_FACE_AREA_RATIO,
-    REGISTRATION_SIDE_MIN,
-    START_MATCH_THRESHOLD,
-    VIOLATION_CAPTURE_COOLDOWN_SECONDS,
+    MIN_UPLOAD_MBPS,
+    NETWORK_UPLOAD_PROBE_MAX_KB,
+    PROFILER_DEFAULT_DURATION_SECONDS,
+    PROFILER_DEFAULT_INTERVAL_MS,
+    PROFILER_DEFAULT_SAMPLE_RATE,
+    PROFILER_MAX_DURATION_SECONDS,
+    QUALITY_THUMBNAIL_WIDTH,
 )
-from proctoring.domain import RegisteredUser
-from proctoring.infrastructure import append_violation_event, save_registered_faces
-from proctoring.services.identity import (
-    collect_registration_image_payloads,
-    compute_face_signature,
-    decode_data_url_image,
-    decode_payload_frame,
-    estimate_frame_brightness,
-    extract_single_face_crop,
-    get_single_face_area_ratio,
-    is_face_close_enough,
-    verify_identity_for_user,
+from proctoring.infrastructure import EvidenceExportItem, iter_evidence_zip
+from proctoring.infrastructure.evidence import (
+    ensure_evidence_thumbnail,
+    evidence_user_dir_name,
+    resolve_evidence_path,
 )
-from proctoring.state import AppState
+from proctoring.infrastructure.profiler import (
+    ProfilerSettings,
+    build_speedscope,
+    format_collapsed,
+    load_session_profiles,
+    remove_other_sessions,
+    save_profiler_settings,
+)
+from proctoring.services.network_check import (
+    DEFAULT_CAPTURE_PROFILE,
+    NetworkMeasurement,
+    load_capture_profile,
+    load_network_check,
+    probe_body,
+    recommend_capture_profile,
+    resolve_probe_size_kb,
+    save_network_check,
+)
+from proctoring.state import PROFILER_GENERATION, ROLE_INFERENCE, AppState, publish_shared_change
+from proctoring.web.events import serialize_event, sync_shared_state
+from proctoring.web.forwarding import register_inference_forwarding
 from proctoring.web.request_utils import (
     ensure_registered_and_verified,
     get_verified_user_key,
     is_mobile_request,
-    mobile_not_supported_response,
     normalize_username,
+    parse_cursor,
+    parse_limit,
     parse_non_negative_int,
-    is_valid_person_name,
+    parse_timestamp_param,
 )
 
 
 def register_routes(app: Flask, state: AppState) -> None:
+    @app.before_request
+    def sync_before_request() -> None:
+        # Cheap generation check; only reloads after another worker wrote the registry or events.
+        sync_shared_state(app, state)
+
+    @app.get("/healthz")
+    def healthz() -> Any:
+        return jsonify({"ok": True, "pid": state.readiness.pid, "role": state.role})
+
+    @app.get("/readyz")
+    def readyz() -> tuple[Any, int]:
+        if state.phone_detector is None:
+            return jsonify({"ready": True, "role": state.role, "pid": state.readiness.pid}), 200
+        readiness = state.readiness.to_dict()
+        readiness["role"] = state.role
+        readiness["phone_detector_enabled"] = state.phone_detector.enabled
+        readiness["phone_detector_backend"] = state.phone_detector.backend_name
+        if state.admission is not None:
+            readiness["admission"] = state.admission.stats()
+        return jsonify(readiness), 200 if state.readiness.ready else 503
+
+    @app.get("/metrics")
+    def metrics() -> Any:
+        return jsonify(
+            {
+                "pid": state.readiness.pid,
+                "role": state.role,
+                "thread_budget": state.thread_budget.to_dict() if state.thread_budget is not None else None,
+                "sessions": state.sessions.stats(),
+                "admission": state.admission.stats() if state.admission is not None else None,
+                "event_streams": {
+                    "open": state.event_broker.open_streams,
+                    "max": state.event_broker.max_streams,
+                },
+            }
+        )
+
+    if state.serves_inference:
+        # Imported here so API-only processes never load the vision stack.
+        from proctoring.web.inference_routes import register_inference_routes
+
+        register_inference_routes(app, state)
+    else:
+        register_inference_forwarding(
+            app,
+            os.environ.get(INFERENCE_UPSTREAM_ENV, ""),
+            INFERENCE_UPSTREAM_TIMEOUT_SECONDS,
+        )
+    if state.role == ROLE_INFERENCE:
+        return
+
     def is_admin_authenticated() -> bool:
         return bool(session.get("admin_authenticated", False))
 
     def build_users_summary() -> list[dict[str, Any]]:
-        users_summary: list[dict[str, Any]] = []
-        for key, user in sorted(state.registered_faces.items(), key=lambda item: item[1].username.lower()):
-            events = state.violation_events.get(key, [])
-            last_violation = str(events[-1].get("timestamp", "")) if events else ""
-            users_summary.append(
-                {
-                    "key": key,
-                    "username": user.username,
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                    "email": user.email,
-                    "samples": len(user.signatures),
-                    "violation_count": len(events),
-                    "last_violation": last_violation,
-                }
-            )
-        return users_summary
+        rows, _ = state.user_summary.page()
+        return rows
 
     def build_user_events(user_key: str) -> list[dict[str, Any]]:
         events = list(reversed(state.violation_events.get(user_key, [])))
         prepared_events: list[dict[str, Any]] = []
         for event in events:
-            relative_path = str(event.get("image_path", "")).strip()
-            if not relative_path:
-                continue
-            prepared_events.append(
-                {
-                    "timestamp": str(event.get("timestamp", "")),
-                    "violations": list(event.get("violations", [])),
-                    "image_url": url_for("static", filename=relative_path),
-                }
-            )
+            prepared = serialize_event(app.config["VIOLATION_CAPTURES_DIR"], user_key, event)
+            if prepared is not None:
+                prepared_events.append(prepared)
         return prepared_events
 
+    def query_events_page(user_key: str | None) -> tuple[list[dict[str, Any]], str | None]:
+        violation_type = str(request.args.get("type", "")).strip() or None
+        since = parse_timestamp_param(request.args.get("since"))
+        until = parse_timestamp_param(request.args.get("until"))
+        before_id = parse_cursor(request.args.get("cursor"))
+        limit = parse_limit(request.args.get("limit"), EVENT_QUERY_DEFAULT_LIMIT, EVENT_QUERY_MAX_LIMIT)
+        page, next_cursor = state.event_index.query(
+            user_key=user_key,
+            violation_type=violation_type,
+            since=since,
+            until=until,
+            before_id=before_id,
+            limit=limit,
+        )
+        events: list[dict[str, Any]] = []
+        for event_user_key, event in page:
+            prepared = serialize_event(app.config["VIOLATION_CAPTURES_DIR"], event_user_key, event)
+            if prepared is not None:
+                events.append(prepared)
+        return events, (str(next_cursor) if next_cursor is not None else None)
+
+    def iter_export_items(user_keys: list[str]) -> Any:
+        # One candidate's events are copied at a time, so a bulk export never
+        # holds the events lock or a copy of the whole store.
+        for key in user_keys:
+            with state.violation_events_lock:
+                events = [dict(event) for event in state.violation_events.get(key, [])]
+            yield EvidenceExportItem(user_key=key, user=state.registered_faces.get(key), events=events)
+
+    def evidence_zip_response(user_keys: list[str], download_name: str) -> Response:
+        response = Response(
+            iter_evidence_zip(iter_export_items(user_keys), app.config["VIOLATION_CAPTURES_DIR"]),
+            mimetype="application/zip",
+        )
+        response.headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+        response.headers["Cache-Control"] = "no-store"
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
     @app.route("/")
     def index() -> str:
         error_code = str(request.args.get("error", "")).strip().lower()
@@ -141,6 +242,49 @@ def register_routes(app: Flask, state: AppState) -> None:
                 "ok": True,
                 "mobile_detected": is_mobile_request(request),
                 "min_download_mbps": MIN_DOWNLOAD_MBPS,
+                "min_upload_mbps": MIN_UPLOAD_MBPS,
+            }
+        )
+
+    @app.post("/api/network_check")
+    def network_check() -> tuple[Any, int] | Any:
+        payload = request.get_json(silent=True) or {}
+        username, key = normalize_username(payload.get("username"))
+        if not key:
+            return jsonify({"error": "Username is required"}), 400
+        # Checks are unauthenticated during setup, so once a candidate has registered only their
+        # own verified session may replace the profile their exam page will use.
+        if key in state.registered_faces and get_verified_user_key() != key:
+            return jsonify({"error": "Candidate is already registered"}), 409
+        try:
+            measurement = NetworkMeasurement.from_payload(payload)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        profile = recommend_capture_profile(measurement)
+        save_network_check(app.config["NETWORK_CHECKS_DIR"], key, username, measurement, profile)
+        return jsonify({"ok": True, "passed": measurement.passed, "profile": profile.to_dict()})
+
+    @app.get("/api/network_profile")
+    def network_profile() -> Any:
+        _, key = normalize_username(request.args.get("username"))
+        profile = load_capture_profile(app.config["NETWORK_CHECKS_DIR"], key) if key else None
+        return jsonify(
+            {
+                "ok": True,
+                "recorded": profile is not None,
+                "profile": (profile or DEFAULT_CAPTURE_PROFILE).to_dict(),
+                "prefilter": {
+                    "enabled": FRAME_PREFILTER_ENABLED,
+                    "min_change": FRAME_PREFILTER_MIN_CHANGE,
+                    "max_interval_ms": int(FRAME_HEARTBEAT_MAX_INTERVAL_SECONDS * 1000),
+                    "thumbnail_width": QUALITY_THUMBNAIL_WIDTH,
+                },
+                "face_crops": {
+                    "enabled": CLIENT_FACE_DETECTION_ENABLED,
+                    "max_dim": CLIENT_FACE_CROP_MAX_DIM,
+                    "full_frame_interval_ms": int(CLIENT_FACE_FULL_FRAME_INTERVAL_SECONDS * 1000),
+                },
             }
         )
 
@@ -166,7 +310,30 @@ def register_routes(app: Flask, state: AppState) -> None:
     def admin_users_api() -> tuple[Any, int] | Any:
         if not is_admin_authenticated():
             return jsonify({"error": "Unauthorized"}), 401
-        return jsonify({"ok": True, "users": build_users_summary()})
+        # Clients revalidate with If-None-Match; the summary version changes on any update.
+        etag = state.user_summary.etag
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        search = str(request.args.get("q", "")).strip()
+        offset = parse_non_negative_int(request.args.get("offset"), 0)
+        limit = parse_limit(request.args.get("limit"), ADMIN_USERS_DEFAULT_LIMIT, ADMIN_USERS_MAX_LIMIT)
+        users, total = state.user_summary.page(search=search, offset=offset, limit=limit)
+        response = jsonify(
+            {
+                "ok": True,
+                "users": users,
+                "total": total,
+                "offset": offset,
+                "limit": limit,
+                "version": state.user_summary.version,
+            }
+        )
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
 
     @app.get("/api/admin/user/<path:user_key>")
     def admin_user_detail_api(user_key: str) -> tuple[Any, int] | Any:
@@ -178,6 +345,11 @@ def register_routes(app: Flask, state: AppState) -> None:
         if user is None:
             return jsonify({"error": "User not found"}), 404
 
+        try:
+            events, next_cursor = query_events_page(key)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
         return jsonify(
             {
                 "ok": True,
@@ -189,18 +361,292 @@ def register_routes(app: Flask, state: AppState) -> None:
                     "email": user.email,
                     "samples": len(user.signatures),
                 },
-                "events": build_user_events(key),
+                "network_check": load_network_check(app.config["NETWORK_CHECKS_DIR"], key),
+                "events": events,
+                "next_cursor": next_cursor,
             }
         )
 
+    @app.get("/api/admin/events")
+    def admin_events_api() -> tuple[Any, int] | Any:
+        if not is_admin_authenticated():
+            return jsonify({"error": "Unauthorized"}), 401
+
+        _, user_key = normalize_username(request.args.get("user"))
+        try:
+            events, next_cursor = query_events_page(user_key or None)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        return jsonify({"ok": True, "events": events, "next_cursor": next_cursor})
+
+    @app.get("/api/admin/export/user/<path:user_key>")
+    def admin_export_user(user_key: str) -> tuple[Any, int] | Any:
+        if not is_admin_authenticated():
+            return jsonify({"error": "Unauthorized"}), 401
+
+        key = str(user_key).strip().lower()
+        if key not in state.registered_faces and key not in state.violation_events:
+            return jsonify({"error": "User not found"}), 404
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        return evidence_zip_response([key], f"evidence_{evidence_user_dir_name(key)}_{stamp}.zip")
+
+    @app.get("/api/admin/export")
+    def admin_export_bulk() -> tuple[Any, int] | Any:
+        if not is_admin_authenticated():
+            return jsonify({"error": "Unauthorized"}), 401
+
+        requested = [
+            normalize_username(raw)[1] for raw in str(request.args.get("users", "")).split(",") if raw.strip()
+        ]
+        if requested:
+            user_keys = [key for key in dict.fromkeys(requested) if key]
+        else:
+            user_keys = sorted(set(state.registered_faces) | set(state.violation_events))
+        unknown = [key for key in user_keys if key not in state.registered_faces and key not in state.violation_events]
+        if unknown:
+            return jsonify({"error": f"Unknown users: {', '.join(unknown)}"}), 404
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        return evidence_zip_response(user_keys, f"evidence_bulk_{stamp}.zip")
+
+    @app.get("/api/admin/analytics")
+    def admin_analytics_api() -> tuple[Any, int] | Any:
+        if not is_admin_authenticated():
+            return jsonify({"error": "Unauthorized"}), 401
+
+        _, user_key = normalize_username(request.args.get("user"))
+        violation_type = str(request.args.get("type", "")).strip() or None
+        try:
+            until = parse_timestamp_param(request.args.get("until"))
+            since = parse_timestamp_param(request.args.get("since"))
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        until = time.time() if until is None else until
+        since = until - ANALYTICS_DEFAULT_WINDOW_SECONDS if since is None else since
+        if since > until:
+            return jsonify({"error": "since must not be after until"}), 400
+
+        step, points = state.rollups.series(
+            since=since,
+            until=until,
+            step_seconds=parse_non_negative_int(request.args.get("bucket"), 0),
+            violation_type=violation_type,
+            user_key=user_key or None,
+        )
+        return jsonify(
+            {
+                "ok": True,
+                "bucket_seconds": step,
+                "series": [
+                    {"start": datetime.fromtimestamp(bucket, timezone.utc).isoformat(), "count": count}
+                    for bucket, count in points
+                ],
+                "totals": state.rollups.totals_by_type(since, until, user_key=user_key or None),
+                "last_event_id": state.rollups.last_event_id,
+            }
+        )
+
+    def publish_profiler_settings(settings: ProfilerSettings) -> None:
+        profiler_dir = app.config["PROFILER_DIR"]
+        with state.sessions.mutex(PROFILER_GENERATION):
+            save_profiler_settings(profiler_dir, settings)
+            state.profiler.configure(settings)
+            publish_shared_change(state, PROFILER_GENERATION)
+        if not settings.enabled:
+            state.profiler.flush(profiler_dir)
+
+    def profiler_status() -> dict[str, Any]:
+        settings = state.profiler.settings
+        state.profiler.flush(app.config["PROFILER_DIR"])
+        _, totals = load_session_profiles(app.config["PROFILER_DIR"], settings.session_id)
+        active = settings.enabled and time.time() < settings.expires_at
+        return {"ok": True, "active": active, "settings": settings.to_dict(), **totals}
+
+    @app.get("/api/admin/profiler")
+    def admin_profiler_status() -> tuple[Any, int] | Any:
+        if not is_admin_authenticated():
+            return jsonify({"error": "Unauthorized"}), 401
+        return jsonify(profiler_status())
+
+    @app.post("/api/admin/profiler")
+    def admin_profiler_start() -> tuple[Any, int] | Any:
+        if not is_admin_authenticated():
+            return jsonify({"error": "Unauthorized"}), 401
+
+        payload = request.get_json(silent=True) or {}
+        _, user_key = normalize_username(payload.get("user"))
+        try:
+            # A single candidate is profiled on every frame unless a rate is given.
+            sample_rate = float(payload.get("sample_rate", 1.0 if user_key else PROFILER_DEFAULT_SAMPLE_RATE))
+            interval_ms = float(payload.get("interval_ms", PROFILER_DEFAULT_INTERVAL_MS))
+            duration = float(payload.get("duration_seconds", PROFILER_DEFAULT_DURATION_SECONDS))
+        except (TypeError, ValueError):
+            return jsonify({"error": "sample_rate, interval_ms and duration_seconds must be numbers"}), 400
+        if not 0.0 < sample_rate <= 1.0:
+            return jsonify({"error": "sample_rate must be in (0, 1]"}), 400
+        if interval_ms < 1.0:
+            return jsonify({"error": "interval_ms must be at least 1"}), 400
+        if not 0.0 < duration <= PROFILER_MAX_DURATION_SECONDS:
+            return jsonify({"error": f"duration_seconds must be in (0, {PROFILER_MAX_DURATION_SECONDS:g}]"}), 400
+
+        now_ts = time.time()
+        settings = ProfilerSettings(
+            enabled=True,
+            session_id=f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{uuid.uuid4().hex[:8]}",
+            sample_rate=sample_rate,
+            user_key=user_key,
+            interval_ms=interval_ms,
+            started_at=now_ts,
+            expires_at=now_ts + duration,
+        )
+        publish_profiler_settings(settings)
+        remove_other_sessions(app.config["PROFILER_DIR"], settings.session_id)
+        return jsonify(profiler_status())
+
+    @app.post("/api/admin/profiler/stop")
+    def admin_profiler_stop() -> tuple[Any, int] | Any:
+        if not is_admin_authenticated():
+            return jsonify({"error": "Unauthorized"}), 401
+        settings = ProfilerSettings.from_dict({**state.profiler.settings.to_dict(), "enabled": False})
+        publish_profiler_settings(settings)
+        return jsonify(profiler_status())
+
+    @app.get("/api/admin/profiler/export")
+    def admin_profiler_export() -> tuple[Any, int] | Any:
+        if not is_admin_authenticated():
+            return jsonify({"error": "Unauthorized"}), 401
+
+        export_format = str(request.args.get("format", "collapsed")).strip().lower()
+        if export_format not in {"collapsed", "speedscope"}:
+            return jsonify({"error": "format must be collapsed or speedscope"}), 400
+        settings = state.profiler.settings
+        state.profiler.flush(app.config["PROFILER_DIR"])
+        stacks, totals = load_session_profiles(app.config["PROFILER_DIR"], settings.session_id)
+        if not stacks:
+            return jsonify({"error": "No profile samples recorded"}), 404
+
+        name = f"analyze_frame-{settings.session_id}"
+        if export_format == "speedscope":
+            body = json.dumps(build_speedscope(stacks, name, totals["interval_ms"] or settings.interval_ms))
+            response = Response(body, mimetype="application/json")
+            filename = f"{name}.speedscope.json"
+        else:
+            response = Response(format_collapsed(stacks), mimetype="text/plain")
+            filename = f"{name}.collapsed.txt"
+        response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @app.get("/api/admin/events/stream")
+    def admin_events_stream() -> tuple[Any, int] | Any:
+        if not is_admin_authenticated():
+            return jsonify({"error": "Unauthorized"}), 401
+
+        _, user_filter = normalize_username(request.args.get("user"))
+        broker = state.event_broker
+        resume_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+        after_seq = broker.parse_id(resume_id) if resume_id else broker.last_seq
+        needs_reset = after_seq is None
+        if after_seq is None:
+            after_seq = broker.last_seq
+        if not broker.try_open_stream():
+            response = jsonify({"error": "Too many open event streams"})
+            response.headers["Retry-After"] = str(int(EVENT_STREAM_MAX_SECONDS))
+            return response, 503
+
+        def stream() -> Any:
+            nonlocal after_seq
+            yield f"retry: 3000\nid: {broker.format_id(after_seq)}\n\n"
+            if needs_reset:
+                yield "event: reset\ndata: {}\n\n"
+            deadline = time.monotonic() + EVENT_STREAM_MAX_SECONDS
+            keepalive_at = time.monotonic() + EVENT_STREAM_HEARTBEAT_SECONDS
+            while time.monotonic() < deadline:
+                events = broker.wait_for(after_seq, timeout=EVENT_STREAM_SYNC_SECONDS)
+                if not events:
+                    # Violations recorded by other processes only reach this broker through a sync.
+                    sync_shared_state(app, state)
+                    if time.monotonic() >= keepalive_at:
+                        keepalive_at = time.monotonic() + EVENT_STREAM_HEARTBEAT_SECONDS
+                        yield ": keepalive\n\n"
+                    else:
+                        # Sends nothing, but hands the thread back after every sync under ASGI.
+                        yield ""
+                    continue
+                keepalive_at = time.monotonic() + EVENT_STREAM_HEARTBEAT_SECONDS
+                for event in events:
+                    after_seq = event.seq
+                    if user_filter and event.user_key != user_filter:
+                        continue
+                    yield f"id: {broker.format_id(event.seq)}\nevent: {event.kind}\ndata: {json.dumps(event.data)}\n\n"
+
+        response = Response(stream_with_context(stream()), mimetype="text/event-stream")
+        # Runs when the server closes the body, even if the client left before the first chunk.
+        response.call_on_close(broker.close_stream)
+        response.headers["Cache-Control"] = "no-cache"
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
+
+    @app.get("/api/admin/evidence/<variant>/<path:relative_path>")
+    def admin_evidence_file(variant: str, relative_path: str) -> tuple[Any, int] | Any:
+        if not is_admin_authenticated():
+            return jsonify({"error": "Unauthorized"}), 401
+
+        captures_dir = app.config["VIOLATION_CAPTURES_DIR"]
+        if variant == "thumb":
+            file_path = ensure_evidence_thumbnail(captures_dir, relative_path, EVIDENCE_THUMBNAIL_WIDTH)
+        elif variant == "full":
+            file_path = resolve_evidence_path(captures_dir, relative_path)
+        else:
+            return jsonify({"error": "Unknown evidence variant"}), 404
+        if file_path is None or not file_path.is_file():
+            return jsonify({"error": "Evidence not found"}), 404
+
+        # Capture file names are unique per event, so their bytes never change.
+        response = send_file(
+            file_path,
+            mimetype="image/jpeg",
+            conditional=True,
+            etag=True,
+            max_age=EVIDENCE_CACHE_MAX_AGE_SECONDS,
+        )
+        response.cache_control.public = False
+        response.cache_control.private = True
+        response.cache_control.immutable = True
+        return response
+
     @app.get("/device_check")
     def device_check() -> Any:
         mobile = is_mobile_request(request)
         return jsonify({"ok": True, "is_mobile": mobile, "supported": not mobile})
 
     @app.get("/speed_probe")
-    def speed_probe() -> Response:
-        return Response(b"0" * 256_000, mimetype="application/octet-stream")
+    def speed_probe() -> tuple[Any, int] | Response:
+        try:
+            size_kb = resolve_probe_size_kb(request.args.get("size"))
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        response = Response(probe_body(size_kb), mimetype="application/octet-stream")
+        response.headers["Cache-Control"] = "no-store, no-transform"
+        return response
+
+    @app.get("/speed_probe/ping")
+    def speed_probe_ping() -> Response:
+        response = Response(status=204)
+        response.headers["Cache-Control"] = "no-store"
+        return response
+
+    @app.post("/speed_probe/upload")
+    def speed_probe_upload() -> tuple[Any, int] | Any:
+        max_bytes = NETWORK_UPLOAD_PROBE_MAX_KB * 1024
+        if (request.content_length or 0) > max_bytes:
+            return jsonify({"error": "Upload probe too large"}), 413
+        received = 0
+        while chunk := request.stream.read(64 * 1024):
+            received += len(chunk)
+            if received > max_bytes:
+                return jsonify({"error": "Upload probe too large"}), 413
+        response = jsonify({"ok": True, "bytes": received})
+        response.headers["Cache-Control"] = "no-store"
+        return response
 
     @app.get("/exam")
     def exam() -> str:
@@ -255,245 +701,3 @@ def register_routes(app: Flask, state: AppState) -> None:
             violations=violations,
             trust_score=trust_score,
         )
-
-    @app.post("/register_face")
-    def register_face() -> tuple[Any, int] | Any:
-        if is_mobile_request(request):
-            return mobile_not_supported_response()
-
-        payload = request.get_json(silent=True) or {}
-        username, key = normalize_username(payload.get("username"))
-        first_name = str(payload.get("first_name", "")).strip()
-        last_name = str(payload.get("last_name", "")).strip()
-        email = str(payload.get("email", "")).strip()
-        if not username:
-            return jsonify({"error": "Username is required"}), 400
-        if not is_valid_person_name(first_name):
-            return jsonify({"error": "Valid first name is required"}), 400
-        if not is_valid_person_name(last_name):
-            return jsonify({"error": "Valid last name is required"}), 400
-
-        image_payloads = collect_registration_image_payloads(payload)
-        if not image_payloads:
-            return jsonify({"error": "At least one image is required"}), 400
-
-        signatures: list[np.ndarray] = []
-        try:
-            for encoded_image in image_payloads:
-                frame = decode_data_url_image(encoded_image)
-                if not is_face_close_enough(
-                    state.analyzer.face_detection,
-                    frame,
-                    min_area_ratio=REGISTRATION_MIN_FACE_AREA_RATIO,
-                ):
-                    raise ValueError("Move closer to the camera and keep your face larger in frame.")
-                face_crop = extract_single_face_crop(state.analyzer.face_detection, frame)
-                signatures.append(compute_face_signature(face_crop))
-        except Exception as exc:
-            return jsonify({"error": str(exc)}), 400
-
-        if not signatures:
-            return jsonify({"error": "Could not build face signatures"}), 400
-
-        state.registered_faces[key] = RegisteredUser(
-            username=username,
-            signatures=signatures,
-            first_name=first_name,
-            last_name=last_name,
-            email=email,
-        )
-        state.identity_mismatch_streaks.pop(key, None)
-        state.phone_visible_streaks.pop(key, None)
-        state.phone_visible_active.pop(key, None)
-        state.violation_capture_last_ts.pop(key, None)
-        try:
-            save_registered_faces(app.config["REGISTERED_FACES_FILE"], state.registered_faces)
-        except OSError:
-            return jsonify({"error": "Face captured but could not save to disk"}), 500
-
-        return jsonify(
-            {
-                "ok": True,
-                "message": f"Face registered for {username} with {len(signatures)} samples",
-            }
-        )
-
-    @app.post("/registration_pose_check")
-    def registration_pose_check() -> tuple[Any, int] | Any:
-        if is_mobile_request(request):
-            return mobile_not_supported_response()
-
-        payload = request.get_json(silent=True) or {}
-        try:
-            frame = decode_payload_frame(payload)
-            result = state.analyzer.analyze(frame)
-            face_area_ratio = None
-            if result.face_count == 1:
-                face_area_ratio = get_single_face_area_ratio(state.analyzer.face_detection, frame)
-        except Exception as exc:
-            return jsonify({"error": str(exc)}), 400
-
-        pose_hint = "unknown"
-        if result.face_count == 1 and result.sideways_score is not None:
-            score = float(result.sideways_score)
-            if abs(score) <= REGISTRATION_CENTER_MAX:
-                pose_hint = "center"
-            elif score >= REGISTRATION_SIDE_MIN:
-                pose_hint = "right"
-            elif score <= -REGISTRATION_SIDE_MIN:
-                pose_hint = "left"
-
-        close_enough = bool(face_area_ratio is not None and face_area_ratio >= REGISTRATION_MIN_FACE_AREA_RATIO)
-        return jsonify(
-            {
-                "face_count": result.face_count,
-                "sideways_score": result.sideways_score,
-                "face_area_ratio": face_area_ratio,
-                "close_enough": close_enough,
-                "pose_hint": pose_hint,
-                "center_max": REGISTRATION_CENTER_MAX,
-                "side_min": REGISTRATION_SIDE_MIN,
-                "min_face_area_ratio": REGISTRATION_MIN_FACE_AREA_RATIO,
-            }
-        )
-
-    @app.post("/verify_face")
-    def verify_face() -> tuple[Any, int] | Any:
-        if is_mobile_request(request):
-            return mobile_not_supported_response()
-
-        payload = request.get_json(silent=True) or {}
-        username, key = normalize_username(payload.get("username"))
-        if not username:
-            return jsonify({"error": "Username is required"}), 400
-        if key not in state.registered_faces:
-            return jsonify({"error": "User is not registered"}), 400
-
-        try:
-            frame = decode_payload_frame(payload)
-            is_match, score = verify_identity_for_user(
-                registered_faces=state.registered_faces,
-                face_detection=state.analyzer.face_detection,
-                username=username,
-                frame_bgr=frame,
-                threshold=START_MATCH_THRESHOLD,
-            )
-        except Exception as exc:
-            return jsonify({"error": str(exc)}), 400
-
-        if is_match:
-            session["verified_user"] = key
-            state.identity_mismatch_streaks[key] = 0
-            state.phone_visible_streaks[key] = 0
-            state.phone_visible_active[key] = False
-            state.violation_capture_last_ts[key] = 0.0
-        else:
-            session.pop("verified_user", None)
-            state.identity_mismatch_streaks.pop(key, None)
-            state.phone_visible_streaks.pop(key, None)
-            state.phone_visible_active.pop(key, None)
-            state.violation_capture_last_ts.pop(key, None)
-
-        return jsonify({"ok": True, "match": is_match, "score": score, "threshold": START_MATCH_THRESHOLD})
-
-    @app.post("/analyze_frame")
-    def analyze_frame() -> tuple[Any, int] | Any:
-        if is_mobile_request(request):
-            return mobile_not_supported_response()
-
-        payload = request.get_json(silent=True) or {}
-        username, key = normalize_username(payload.get("username"))
-
-        if not username:
-            return jsonify({"error": "Username is required"}), 400
-        if get_verified_user_key() != key:
-            return jsonify({"error": "Unauthorized monitoring session"}), 403
-        if key not in state.registered_faces:
-            return jsonify({"error": "User is not registered"}), 400
-
-        try:
-            frame = decode_payload_frame(payload)
-            result = state.analyzer.analyze(frame)
-        except Exception as exc:
-            return jsonify({"error": str(exc)}), 400
-        brightness = estimate_frame_brightness(frame)
-        if brightness < LOW_LIGHT_MEAN_THRESHOLD:
-            result.violations.append("low_lighting")
-        phone_detected = state.phone_detector.detect_phone(frame)
-        if phone_detected:
-            state.phone_visible_streaks[key] = state.phone_visible_streaks.get(key, 0) + 1
-        else:
-            state.phone_visible_streaks[key] = 0
-            state.phone_visible_active[key] = False
-
-        if (
-            state.phone_visible_streaks.get(key, 0) >= PHONE_VISIBLE_STREAK_THRESHOLD
-            and not state.phone_visible_active.get(key, False)
-        ):
-            result.violations.append("phone_visible")
-            state.phone_visible_active[key] = True
-
-        identity_match: bool | None = None
-        identity_score: float | None = None
-        if result.face_count == 1:
-            try:
-                is_sideways = "looking_sideways" in result.violations
-                is_low_light = "low_lighting" in result.violations
-                if is_sideways:
-                    state.identity_mismatch_streaks[key] = 0
-                elif is_low_light:
-                    # Skip mismatch streak updates in poor lighting to reduce false positives.
-                    identity_match = None
-                    identity_score = None
-                else:
-                    identity_match, identity_score = verify_identity_for_user(
-                        registered_faces=state.registered_faces,
-                        face_detection=state.analyzer.face_detection,
-                        username=username,
-                        frame_bgr=frame,
-                        threshold=LIVE_MATCH_THRESHOLD,
-                    )
-                    if identity_match:
-                        state.identity_mismatch_streaks[key] = 0
-                    else:
-                        state.identity_mismatch_streaks[key] = state.identity_mismatch_streaks.get(key, 0) + 1
-
-                if state.identity_mismatch_streaks.get(key, 0) >= LIVE_IDENTITY_MISMATCH_STREAK_THRESHOLD:
-                    result.violations.append("identity_mismatch")
-            except Exception as exc:
-                return jsonify({"error": str(exc)}), 400
-
-        if result.violations:
-            now_ts = time.time()
-            last_capture_ts = float(state.violation_capture_last_ts.get(key, 0.0))
-            if (now_ts - last_capture_ts) >= VIOLATION_CAPTURE_COOLDOWN_SECONDS:
-                try:
-                    append_violation_event(
-                        events=state.violation_events,
-                        file_path=app.config["VIOLATION_EVENTS_FILE"],
-                        captures_dir=app.config["VIOLATION_CAPTURES_DIR"],
-                        user_key=key,
-                        username=username,
-                        violations=list(result.violations),
-                        frame_bgr=frame,
-                        max_events_per_user=int(app.config["MAX_VIOLATION_EVENTS_PER_USER"]),
-                    )
-                    state.violation_capture_last_ts[key] = now_ts
-                except OSError:
-                    pass
-
-        return jsonify(
-            {
-                "face_count": result.face_count,
-                "sideways_score": result.sideways_score,
-                "identity_match": identity_match,
-                "identity_score": identity_score,
-                "identity_mismatch_streak": state.identity_mismatch_streaks.get(key, 0),
-                "identity_live_threshold": LIVE_MATCH_THRESHOLD,
-                "brightness": brightness,
-                "phone_detected": phone_detected,
-                "phone_visible_streak": state.phone_visible_streaks.get(key, 0),
-                "phone_detector_enabled": state.phone_detector.enabled,
-                "violations": result.violations,
-            }
-        )
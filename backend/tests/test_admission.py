@@ -0,0 +1,126 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from flask import Flask, request
+
+from proctoring.config import MODEL_WARMUP_DEFER_ENV, TRUSTED_PROXY_ADDRESSES_ENV
+from proctoring.domain import RegisteredUser
+from proctoring.services.admission import AdmissionController, admission_limits
+from proctoring.services.sessions import SessionRecord
+from proctoring.web.asgi import RECEIVED_AT_ENVIRON_KEY
+from proctoring.web.request_utils import get_request_queue_age
+
+
+def _controller() -> AdmissionController:
+    return AdmissionController(
+        max_in_flight=2,
+        priority_max_in_flight=3,
+        max_queue_age_seconds=1.0,
+        priority_max_queue_age_seconds=3.0,
+        stale_session_seconds=10.0,
+        retry_after_ms=1000,
+    )
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_sheds_normal_frames_past_the_limit_but_keeps_room_for_priority(self) -> None:
+        admission = _controller()
+
+        self.assertTrue(admission.try_admit(priority=False))
+        self.assertTrue(admission.try_admit(priority=False))
+        self.assertFalse(admission.try_admit(priority=False))
+        self.assertTrue(admission.try_admit(priority=True))
+        self.assertFalse(admission.try_admit(priority=True))
+
+        admission.release()
+        self.assertFalse(admission.try_admit(priority=False))
+        admission.release()
+        self.assertTrue(admission.try_admit(priority=False))
+        self.assertEqual(admission.stats()["shed"], 3)
+
+    def test_sheds_frames_that_queued_too_long(self) -> None:
+        admission = _controller()
+
+        self.assertFalse(admission.try_admit(priority=False, queue_age_seconds=1.5))
+        self.assertTrue(admission.try_admit(priority=True, queue_age_seconds=1.5))
+        self.assertFalse(admission.try_admit(priority=True, queue_age_seconds=4.0))
+        self.assertEqual(admission.in_flight, 1)
+
+    def test_priority_goes_to_suspicious_and_stale_sessions(self) -> None:
+        admission = _controller()
+        record = SessionRecord(last_analyzed_ts=100.0)
+
+        self.assertFalse(admission.is_priority(record, 105.0))
+        self.assertTrue(admission.is_priority(record, 111.0))
+        self.assertTrue(admission.is_priority(SessionRecord(), 105.0))
+
+        record.phone_visible_streak = 1
+        self.assertTrue(admission.is_priority(record, 105.0))
+        record.phone_visible_streak = 0
+        record.identity.mismatch_streak = 2
+        self.assertTrue(admission.is_priority(record, 105.0))
+
+    def test_retry_hint_is_jittered_above_the_base(self) -> None:
+        admission = _controller()
+        hints = {admission.retry_after() for _ in range(50)}
+
+        self.assertTrue(all(1000 <= hint <= 1501 for hint in hints))
+        self.assertGreater(len(hints), 1)
+
+    def test_default_limits_fit_inside_the_request_threads(self) -> None:
+        self.assertEqual(admission_limits(4), (3, 4))
+        self.assertEqual(admission_limits(1), (1, 1))
+
+
+class TestRequestQueueAge(unittest.TestCase):
+    def setUp(self) -> None:
+        self.app = Flask(__name__)
+
+    def test_reads_asgi_stamp_and_trusted_proxy_header(self) -> None:
+        now_ts = 1_700_000_000.0
+        with self.app.test_request_context(environ_overrides={RECEIVED_AT_ENVIRON_KEY: now_ts - 2.0}):
+            self.assertEqual(get_request_queue_age(request, now_ts), 2.0)
+        with mock.patch.dict(os.environ, {TRUSTED_PROXY_ADDRESSES_ENV: "10.0.0.1, 127.0.0.1"}):
+            for header, expected in (("t=1699999999500", 0.5), ("t=1699999999.25", 0.75), ("garbage", 0.0)):
+                with self.app.test_request_context(
+                    headers={"X-Request-Start": header}, environ_overrides={"REMOTE_ADDR": "10.0.0.1"}
+                ):
+                    self.assertEqual(get_request_queue_age(request, now_ts), expected)
+
+    def test_ignores_header_from_untrusted_peers(self) -> None:
+        with mock.patch.dict(os.environ, {TRUSTED_PROXY_ADDRESSES_ENV: "10.0.0.1"}):
+            with self.app.test_request_context(
+                headers={"X-Request-Start": "t=1"}, environ_overrides={"REMOTE_ADDR": "10.0.0.2"}
+            ):
+                self.assertEqual(get_request_queue_age(request, 1_700_000_000.0), 0.0)
+
+
+class TestAdmissionRoute(unittest.TestCase):
+    def test_slot_is_released_when_saving_the_session_fails(self) -> None:
+        from proctoring import create_app
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            with (
+                mock.patch.dict(os.environ, {MODEL_WARMUP_DEFER_ENV: "1"}),
+                mock.patch("proctoring.app_factory.REGISTERED_FACES_FILE", tmp / "faces.json"),
+                mock.patch("proctoring.app_factory.VIOLATION_EVENTS_FILE", tmp / "events.json"),
+                mock.patch("proctoring.app_factory.ROLLUP_SNAPSHOT_FILE", tmp / "rollups.json"),
+            ):
+                app = create_app("all")
+        state = app.extensions["proctoring_state"]
+        state.registered_faces["alice"] = RegisteredUser(username="alice", signatures=[])
+        client = app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session["verified_user"] = "alice"
+
+        busy = sqlite3.OperationalError("database is locked")
+        with mock.patch.object(state.sessions, "save", side_effect=busy):
+            response = client.post("/analyze_frame", json={"username": "alice", "image": "not a frame"})
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(state.admission.in_flight, 0)
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import unittest
+from typing import Any
+
+from flask import Flask, Response, jsonify, request
+
+from proctoring.web.asgi import AsgiAdapter
+
+
+def _build_app() -> Flask:
+    app = Flask(__name__)
+
+    @app.post("/analyze_frame")
+    def analyze_frame() -> Any:
+        payload = request.get_json()
+        return jsonify(
+            {
+                "username": payload["username"],
+                "cookie": request.cookies.get("session"),
+                "thread": threading.current_thread().name,
+            }
+        )
+
+    @app.get("/stream")
+    def stream() -> Response:
+        def chunks() -> Any:
+            for index in range(3):
+                yield f"data: {index} {threading.current_thread().name}\n\n"
+
+        return Response(chunks(), mimetype="text/event-stream")
+
+    return app
+
+
+class TestAsgiAdapter(unittest.TestCase):
+    def setUp(self) -> None:
+        self.adapter = AsgiAdapter(
+            _build_app(),
+            inference_paths=["/analyze_frame"],
+            inference_threads=1,
+            io_threads=2,
+            stream_threads=1,
+            max_body_bytes=1024,
+            buffered_response_bytes=4096,
+        )
+
+    def tearDown(self) -> None:
+        self.adapter.shutdown()
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        body: bytes = b"",
+        headers: list[tuple[bytes, bytes]] | None = None,
+    ) -> list[dict[str, Any]]:
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "query_string": b"",
+            "headers": headers or [],
+            "server": ("testserver", 80),
+        }
+        # The body arrives in two parts, the way a slow upload would.
+        incoming = [
+            {"type": "http.request", "body": body[:10], "more_body": True},
+            {"type": "http.request", "body": body[10:], "more_body": False},
+        ]
+        sent: list[dict[str, Any]] = []
+
+        async def receive() -> dict[str, Any]:
+            if incoming:
+                return incoming.pop(0)
+            await asyncio.sleep(3600)
+            return {"type": "http.disconnect"}
+
+        async def send(message: dict[str, Any]) -> None:
+            sent.append(message)
+
+        asyncio.run(self.adapter(scope, receive, send))
+        return sent
+
+    def test_json_view_runs_on_the_inference_pool(self) -> None:
+        sent = self._request(
+            "POST",
+            "/analyze_frame",
+            b'{"username": "alice"}',
+            [(b"content-type", b"application/json"), (b"cookie", b"session=abc")],
+        )
+
+        self.assertEqual(sent[0]["status"], 200)
+        body = b"".join(message.get("body", b"") for message in sent[1:])
+        self.assertIn(b'"username":"alice"', body)
+        self.assertIn(b'"cookie":"abc"', body)
+        self.assertIn(b"asgi-inference", body)
+        self.assertFalse(sent[-1]["more_body"])
+
+    def test_streamed_response_is_pulled_chunk_by_chunk_on_the_stream_pool(self) -> None:
+        sent = self._request("GET", "/stream")
+
+        chunks = [message["body"] for message in sent[1:] if message.get("body")]
+        self.assertEqual([chunk.split(b" ")[0] for chunk in chunks], [b"data:"] * 3)
+        self.assertEqual([chunk.split(b" ")[1] for chunk in chunks], [b"0", b"1", b"2"])
+        self.assertTrue(all(b"asgi-stream" in chunk for chunk in chunks))
+
+    def test_oversized_body_is_rejected(self) -> None:
+        sent = self._request("POST", "/analyze_frame", b"x" * 2048)
+
+        self.assertEqual(sent[0]["status"], 413)
@@ -0,0 +1,107 @@
+import base64
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from proctoring.config import MODEL_WARMUP_DEFER_ENV
+from proctoring.domain import AnalysisResult, RegisteredUser
+from proctoring.services import client_face
+from proctoring.services.client_face import FaceCropClaim, face_crop_frame_request, parse_client_face_count
+from proctoring.services.heartbeat import FrameHeartbeat
+from proctoring.services.identity import compute_face_signature
+from proctoring.services.sessions import SessionRecord
+
+
+def verified_record() -> SessionRecord:
+    return SessionRecord(
+        last_analyzed_ts=100.0,
+        last_full_frame_ts=100.0,
+        last_frame_clean=True,
+        client_faces_verified=True,
+    )
+
+
+def crop_claim(face_count: int = 1, change: float = 1.2) -> FaceCropClaim:
+    return FaceCropClaim(face_count, FrameHeartbeat(change, 120.0))
+
+
+@mock.patch.object(client_face, "CLIENT_FACE_DETECTION_ENABLED", True)
+class TestFaceCropFrameRequest(unittest.TestCase):
+    def test_single_face_crop_stands_in_between_full_frames(self) -> None:
+        self.assertIsNone(face_crop_frame_request(verified_record(), crop_claim(), 102.0))
+
+    def test_full_frame_interval_runs_from_the_last_full_frame(self) -> None:
+        record = verified_record()
+        record.last_analyzed_ts = 104.0
+
+        self.assertEqual(face_crop_frame_request(record, crop_claim(), 105.0), "interval")
+
+    def test_crops_stand_in_for_changed_scenes_with_one_verified_face(self) -> None:
+        record = verified_record()
+
+        self.assertIsNone(face_crop_frame_request(record, crop_claim(change=9.0), 101.0))
+        self.assertEqual(face_crop_frame_request(record, crop_claim(face_count=2), 101.0), "face_count")
+        record.client_faces_verified = False
+        self.assertEqual(face_crop_frame_request(record, crop_claim(), 101.0), "unverified")
+
+    def test_claims_are_validated(self) -> None:
+        claim = FaceCropClaim.from_payload({"face_count": 1, "change": 2.5, "brightness": 80})
+        self.assertEqual(claim, FaceCropClaim(1, FrameHeartbeat(2.5, 80.0)))
+        for face_count in (None, -1, True, "many"):
+            self.assertIsNone(parse_client_face_count(face_count))
+            with self.assertRaises(ValueError):
+                FaceCropClaim.from_payload({"face_count": face_count, "change": 2.5, "brightness": 80})
+
+
+class TestFaceCropDisabled(unittest.TestCase):
+    def test_crop_mode_is_off_by_default(self) -> None:
+        self.assertEqual(face_crop_frame_request(verified_record(), crop_claim(), 101.0), "disabled")
+
+
+@mock.patch.object(client_face, "CLIENT_FACE_DETECTION_ENABLED", True)
+class TestFaceCropRoute(unittest.TestCase):
+    def test_crop_of_a_changed_scene_is_analyzed_instead_of_a_full_frame(self) -> None:
+        from proctoring import create_app
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            with (
+                mock.patch.dict(os.environ, {MODEL_WARMUP_DEFER_ENV: "1"}),
+                mock.patch("proctoring.app_factory.REGISTERED_FACES_FILE", tmp / "faces.json"),
+                mock.patch("proctoring.app_factory.VIOLATION_EVENTS_FILE", tmp / "events.json"),
+                mock.patch("proctoring.app_factory.VIOLATION_CAPTURES_DIR", tmp / "captures"),
+                mock.patch("proctoring.app_factory.ROLLUP_SNAPSHOT_FILE", tmp / "rollups.json"),
+            ):
+                app = create_app("all")
+            state = app.extensions["proctoring_state"]
+            client = app.test_client()
+            with client.session_transaction() as flask_session:
+                flask_session["verified_user"] = "alice"
+            now_ts = time.time()
+            record = state.sessions.load("alice", now_ts)
+            record.last_analyzed_ts = record.last_full_frame_ts = now_ts
+            record.last_frame_clean = record.client_faces_verified = True
+            state.sessions.save("alice", record)
+            ok, buffer = cv2.imencode(".jpg", np.random.default_rng(0).integers(40, 220, (96, 96, 3), dtype=np.uint8))
+            assert ok
+            face_crop = "data:image/jpeg;base64," + base64.b64encode(buffer.tobytes()).decode("ascii")
+            signature = compute_face_signature(cv2.imdecode(buffer, cv2.IMREAD_COLOR))
+            state.registered_faces["alice"] = RegisteredUser(username="alice", signatures=[signature])
+
+            clean = AnalysisResult(face_count=1, sideways_score=0.0, violations=[])
+            payload = {"username": "alice", "face_crop": face_crop, "face_count": 1, "change": 9.0, "brightness": 120}
+            with mock.patch.object(state.analyzer, "analyze_face_crop", return_value=clean) as analyze_face_crop:
+                response = client.post("/analyze_frame", json=payload)
+
+        body = response.get_json()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(body["face_crop"])
+        self.assertNotIn("frame_required", body)
+        self.assertGreater(body["identity_score"], 0.99)
+        analyze_face_crop.assert_called_once()
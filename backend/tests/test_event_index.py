@@ -0,0 +1,91 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from proctoring.infrastructure.event_index import ViolationEventIndex
+from proctoring.web.request_utils import parse_cursor, parse_limit, parse_timestamp_param
+
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _event(minute: int, *violations: str) -> dict:
+    return {
+        "timestamp": (BASE_TIME + timedelta(minutes=minute)).isoformat(),
+        "violations": list(violations),
+        "image_path": f"violation_captures/{minute}.jpg",
+    }
+
+
+class TestViolationEventIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.events = {
+            "alice": [_event(0, "phone_visible"), _event(2, "no_face"), _event(4, "phone_visible", "no_face")],
+            "bob": [_event(1, "no_face"), _event(3, "phone_visible")],
+        }
+        self.index = ViolationEventIndex()
+        self.index.rebuild(self.events)
+
+    def _timestamps(self, page: list) -> list[str]:
+        return [event["timestamp"] for _, event in page]
+
+    def test_rebuild_assigns_ids_in_time_order(self) -> None:
+        page, next_cursor = self.index.query(limit=10)
+
+        self.assertIsNone(next_cursor)
+        self.assertEqual([event["event_id"] for _, event in page], [5, 4, 3, 2, 1])
+        self.assertEqual([user_key for user_key, _ in page], ["alice", "bob", "alice", "bob", "alice"])
+
+    def test_cursor_pages_through_user_and_type_filter(self) -> None:
+        first, cursor = self.index.query(violation_type="no_face", limit=2)
+        second, final_cursor = self.index.query(violation_type="no_face", before_id=cursor, limit=2)
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertIsNone(final_cursor)
+        self.assertEqual(self._timestamps(first + second), [_event(m)["timestamp"] for m in (4, 2, 1)])
+
+        page, _ = self.index.query(user_key="alice", violation_type="phone_visible", limit=10)
+        self.assertEqual(self._timestamps(page), [_event(m)["timestamp"] for m in (4, 0)])
+
+    def test_time_range_is_inclusive(self) -> None:
+        since = (BASE_TIME + timedelta(minutes=1)).timestamp()
+        until = (BASE_TIME + timedelta(minutes=3)).timestamp()
+
+        page, _ = self.index.query(since=since, until=until, limit=10)
+
+        self.assertEqual(self._timestamps(page), [_event(m)["timestamp"] for m in (3, 2, 1)])
+
+    def test_add_and_remove_keep_indexes_current(self) -> None:
+        added = _event(5, "phone_visible")
+        event_id = self.index.add("bob", added)
+        self.index.remove(self.events["alice"][0])
+
+        page, _ = self.index.query(violation_type="phone_visible", limit=10)
+
+        self.assertEqual(event_id, 6)
+        self.assertEqual(page[0], ("bob", added))
+        self.assertEqual(self._timestamps(page), [_event(m)["timestamp"] for m in (5, 4, 3)])
+        self.assertIsNone(self.index.get(1))
+
+    def test_rebuild_keeps_existing_ids(self) -> None:
+        reloaded = ViolationEventIndex()
+        reloaded.rebuild(self.events)
+
+        self.assertEqual(reloaded.last_event_id, self.index.last_event_id)
+        self.assertEqual(reloaded.add("alice", _event(9, "no_face")), 6)
+
+
+class TestQueryParams(unittest.TestCase):
+    def test_parse_helpers(self) -> None:
+        self.assertEqual(parse_limit(None, 50, 200), 50)
+        self.assertEqual(parse_limit("1000", 50, 200), 200)
+        self.assertEqual(parse_cursor("12"), 12)
+        self.assertIsNone(parse_timestamp_param(""))
+        self.assertEqual(parse_timestamp_param("2025-01-01T00:00:00+00:00"), BASE_TIME.timestamp())
+        with self.assertRaises(ValueError):
+            parse_timestamp_param("yesterday")
+        with self.assertRaises(ValueError):
+            parse_cursor("abc")
+
+
+if __name__ == "__main__":
+    unittest.main()
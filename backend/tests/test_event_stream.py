@@ -0,0 +1,138 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from flask.testing import FlaskClient
+
+from proctoring.config import MODEL_WARMUP_DEFER_ENV, SESSION_STORE_BACKEND_ENV
+from proctoring.infrastructure import append_violation_event
+from proctoring.infrastructure.event_stream import ViolationEventBroker
+from proctoring.infrastructure.rollups import ViolationRollups
+from proctoring.services.session_store import SqliteSessionStore
+from proctoring.state import VIOLATION_EVENTS_GENERATION, AppState, publish_violation_event
+
+
+class TestViolationEventBroker(unittest.TestCase):
+    def test_waiter_wakes_on_publish(self) -> None:
+        broker = ViolationEventBroker(backlog=10, max_streams=2)
+        received: list = []
+        waiter = threading.Thread(target=lambda: received.extend(broker.wait_for(0, timeout=5.0)))
+        waiter.start()
+
+        broker.publish("violation", "alice", {"event_id": 1})
+        waiter.join(timeout=5.0)
+
+        self.assertEqual([(event.seq, event.user_key) for event in received], [(1, "alice")])
+
+    def test_wait_times_out_without_events(self) -> None:
+        broker = ViolationEventBroker(backlog=10, max_streams=2)
+
+        self.assertEqual(broker.wait_for(broker.last_seq, timeout=0.01), [])
+
+    def test_resume_from_backlog(self) -> None:
+        broker = ViolationEventBroker(backlog=3, max_streams=2)
+        for idx in range(5):
+            broker.publish("violation", "alice", {"event_id": idx})
+
+        resumed = broker.parse_id(broker.format_id(3))
+
+        self.assertEqual(resumed, 3)
+        self.assertEqual([event.seq for event in broker.wait_for(resumed, timeout=0.0)], [4, 5])
+
+    def test_unresumable_ids_are_rejected(self) -> None:
+        broker = ViolationEventBroker(backlog=3, max_streams=2)
+        for idx in range(5):
+            broker.publish("violation", "alice", {"event_id": idx})
+
+        self.assertIsNone(broker.parse_id(broker.format_id(1)))
+        self.assertIsNone(broker.parse_id(broker.format_id(9)))
+        self.assertIsNone(broker.parse_id(f"{ViolationEventBroker(backlog=3, max_streams=2).generation}-4"))
+        self.assertIsNone(broker.parse_id("garbage"))
+
+
+def admin_client(tmp: Path) -> FlaskClient:
+    from proctoring import create_app
+
+    env = {SESSION_STORE_BACKEND_ENV: "sqlite", MODEL_WARMUP_DEFER_ENV: "1"}
+    with (
+        mock.patch.dict(os.environ, env),
+        mock.patch("proctoring.state.SESSION_STORE_PATH", tmp / "sessions.sqlite3"),
+        mock.patch("proctoring.app_factory.REGISTERED_FACES_FILE", tmp / "faces.json"),
+        mock.patch("proctoring.app_factory.VIOLATION_EVENTS_FILE", tmp / "events.json"),
+        mock.patch("proctoring.app_factory.VIOLATION_CAPTURES_DIR", tmp / "captures"),
+        mock.patch("proctoring.app_factory.ROLLUP_SNAPSHOT_FILE", tmp / "rollups.json"),
+    ):
+        app = create_app("api")
+    client = app.test_client()
+    with client.session_transaction() as flask_session:
+        flask_session["admin_authenticated"] = True
+    return client
+
+
+class TestEventStreamRoute(unittest.TestCase):
+    def test_stream_delivers_violations_recorded_by_another_process(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            client = admin_client(tmp)
+            # Another worker, sharing only the session store and the files.
+            other = AppState(
+                sessions=SqliteSessionStore(tmp / "sessions.sqlite3", ttl_seconds=60.0, max_sessions=10),
+                event_broker=ViolationEventBroker(backlog=10, max_streams=2),
+                rollups=ViolationRollups(bucket_seconds=60, retention_seconds=3600.0),
+            )
+
+            with mock.patch("proctoring.web.routes.EVENT_STREAM_MAX_SECONDS", 5.0):
+                response = client.get("/api/admin/events/stream", buffered=False)
+                chunks = response.iter_encoded()
+                self.assertIn(b"retry:", next(chunks))
+                with other.sessions.mutex(VIOLATION_EVENTS_GENERATION), other.violation_events_lock:
+                    event = append_violation_event(
+                        events=other.violation_events,
+                        file_path=tmp / "events.json",
+                        captures_dir=tmp / "captures",
+                        user_key="alice",
+                        username="alice",
+                        violations=["phone_visible"],
+                        max_events_per_user=10,
+                        encoded_jpeg=b"\xff\xd8\xff",
+                        index=other.event_index,
+                    )
+                    publish_violation_event(other, "alice", event)
+                received = next(chunk for chunk in chunks if b"event: violation" in chunk)
+                response.close()
+
+        self.assertIn(b"phone_visible", received)
+
+    def test_idle_stream_yields_after_every_sync(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            client = admin_client(Path(tmpdir))
+            with mock.patch("proctoring.web.routes.EVENT_STREAM_SYNC_SECONDS", 0.05):
+                response = client.get("/api/admin/events/stream", buffered=False)
+                chunks = response.iter_encoded()
+                next(chunks)
+                started = time.monotonic()
+                self.assertEqual(next(chunks), b"")
+                self.assertLess(time.monotonic() - started, 1.0)
+                response.close()
+
+    def test_streams_past_the_limit_are_refused(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            client = admin_client(Path(tmpdir))
+            client.application.extensions["proctoring_state"].event_broker.max_streams = 1
+
+            first = client.get("/api/admin/events/stream", buffered=False)
+            refused = client.get("/api/admin/events/stream", buffered=False)
+            self.assertEqual(refused.status_code, 503)
+            self.assertIn("Retry-After", refused.headers)
+            first.close()
+            second = client.get("/api/admin/events/stream", buffered=False)
+            self.assertEqual(second.status_code, 200)
+            second.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from proctoring.infrastructure.evidence import (
+    append_violation_event,
+    ensure_evidence_thumbnail,
+    load_violation_events,
+    thumbnail_relative_path,
+)
+from proctoring.infrastructure.evidence_gc import collect_evidence_garbage, scan_evidence_files
+
+
+def _jpeg_bytes(seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 255, size=(48, 64, 3), dtype=np.uint8)
+    ok, buffer = cv2.imencode(".jpg", frame)
+    assert ok
+    return buffer.tobytes()
+
+
+class TestViolationEvidence(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.events_file = self.root / "events.json"
+        self.captures_dir = self.root / "static" / "violation_captures"
+        self.events: dict[str, list[dict]] = {}
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _append(self, **kwargs) -> dict:
+        params = {
+            "events": self.events,
+            "file_path": self.events_file,
+            "captures_dir": self.captures_dir,
+            "user_key": "jane doe",
+            "username": "Jane Doe",
+            "violations": ["no_face"],
+            "max_events_per_user": 5,
+        }
+        params.update(kwargs)
+        return append_violation_event(**params)
+
+    def test_received_jpeg_is_stored_bit_exact(self) -> None:
+        encoded = _jpeg_bytes()
+
+        event = self._append(encoded_jpeg=encoded)
+
+        stored = self.captures_dir.parent / event["image_path"]
+        self.assertEqual(stored.read_bytes(), encoded)
+        self.assertEqual(load_violation_events(self.events_file)["jane doe"][0]["image_path"], event["image_path"])
+
+    def test_decoded_frame_is_reencoded_without_bytes(self) -> None:
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+        event = self._append(frame_bgr=frame)
+
+        stored = self.captures_dir.parent / event["image_path"]
+        self.assertEqual(cv2.imread(str(stored)).shape, frame.shape)
+
+    def test_captures_are_sharded_by_user_and_day(self) -> None:
+        event = self._append(encoded_jpeg=_jpeg_bytes(), user_key="../Jane Doe")
+
+        parts = Path(event["image_path"]).parts
+        self.assertEqual(parts[0], "violation_captures")
+        self.assertEqual(parts[1], "jane_doe")
+        self.assertRegex(parts[2], r"^\d{4}-\d{2}-\d{2}$")
+
+    def test_trimmed_events_delete_their_captures(self) -> None:
+        first = self._append(encoded_jpeg=_jpeg_bytes(), max_events_per_user=2)
+        self._append(encoded_jpeg=_jpeg_bytes(), max_events_per_user=2)
+        self._append(encoded_jpeg=_jpeg_bytes(), max_events_per_user=2)
+
+        self.assertEqual(len(self.events["jane doe"]), 2)
+        self.assertFalse((self.captures_dir.parent / first["image_path"]).exists())
+        self.assertEqual(len(list(self.captures_dir.rglob("*.jpg"))), 2)
+
+    def test_thumbnail_written_with_capture_and_trimmed_with_it(self) -> None:
+        first = self._append(encoded_jpeg=_jpeg_bytes(), thumbnail_width=32, max_events_per_user=1)
+        thumbnail = self.captures_dir.parent / thumbnail_relative_path(first["image_path"])
+        self.assertEqual(cv2.imread(str(thumbnail)).shape[1], 32)
+
+        self._append(encoded_jpeg=_jpeg_bytes(), thumbnail_width=32, max_events_per_user=1)
+
+        self.assertFalse(thumbnail.exists())
+
+    def test_missing_thumbnail_is_generated_lazily(self) -> None:
+        event = self._append(encoded_jpeg=_jpeg_bytes())
+
+        thumbnail = ensure_evidence_thumbnail(self.captures_dir, event["image_path"], 16)
+
+        self.assertIsNotNone(thumbnail)
+        self.assertEqual(cv2.imread(str(thumbnail)).shape[1], 16)
+        self.assertIsNone(ensure_evidence_thumbnail(self.captures_dir, "violation_captures/../../x.jpg", 16))
+
+    def _gc(self, **kwargs):
+        params = {
+            "events": self.events,
+            "file_path": self.events_file,
+            "captures_dir": self.captures_dir,
+            "max_age_seconds": 0,
+            "max_total_bytes": 0,
+            "orphan_grace_seconds": 0,
+            "now": time.time() + 10,
+        }
+        params.update(kwargs)
+        return collect_evidence_garbage(**params)
+
+    def test_gc_removes_orphans_and_missing_events(self) -> None:
+        kept = self._append(encoded_jpeg=_jpeg_bytes())
+        missing = self._append(encoded_jpeg=_jpeg_bytes())
+        (self.captures_dir.parent / missing["image_path"]).unlink()
+        orphan = self.captures_dir / "stale" / "orphan.jpg"
+        orphan.parent.mkdir(parents=True)
+        orphan.write_bytes(b"x")
+
+        report = self._gc()
+
+        self.assertEqual(report.missing_events, 1)
+        self.assertEqual(report.orphan_files, 1)
+        self.assertFalse(orphan.parent.exists())
+        self.assertEqual(self.events["jane doe"], [kept])
+        self.assertEqual(load_violation_events(self.events_file)["jane doe"][0]["image_path"], kept["image_path"])
+
+    def test_gc_with_a_prescan_keeps_events_captured_after_it(self) -> None:
+        scanned = self._append(encoded_jpeg=_jpeg_bytes(1))
+        orphan = self.captures_dir / "stale" / "orphan.jpg"
+        orphan.parent.mkdir(parents=True)
+        orphan.write_bytes(b"x")
+        files = scan_evidence_files(self.captures_dir)
+        later = self._append(encoded_jpeg=_jpeg_bytes(2))
+
+        report = self._gc(files=files)
+
+        self.assertEqual(report.missing_events, 0)
+        self.assertEqual(report.orphan_files, 1)
+        self.assertFalse(orphan.exists())
+        self.assertEqual(self.events["jane doe"], [scanned, later])
+        later_size = (self.captures_dir.parent / later["image_path"]).stat().st_size
+        self.assertGreaterEqual(report.total_bytes, later_size)
+
+    def test_gc_enforces_age_and_quota(self) -> None:
+        old = self._append(encoded_jpeg=_jpeg_bytes(1))
+        old["timestamp"] = "2020-01-01T00:00:00+00:00"
+        middle = self._append(encoded_jpeg=_jpeg_bytes(2))
+        newest = self._append(encoded_jpeg=_jpeg_bytes(3))
+        newest_size = (self.captures_dir.parent / newest["image_path"]).stat().st_size
+
+        report = self._gc(max_age_seconds=86400, max_total_bytes=newest_size)
+
+        self.assertEqual(report.expired_events, 1)
+        self.assertEqual(report.quota_events, 1)
+        self.assertEqual(self.events["jane doe"], [newest])
+        self.assertFalse((self.captures_dir.parent / middle["image_path"]).exists())
+
+    def test_gc_dry_run_keeps_everything(self) -> None:
+        event = self._append(encoded_jpeg=_jpeg_bytes())
+        event["timestamp"] = "2020-01-01T00:00:00+00:00"
+
+        report = self._gc(max_age_seconds=86400, dry_run=True)
+
+        self.assertEqual(report.expired_events, 1)
+        self.assertGreater(report.freed_bytes, 0)
+        self.assertTrue((self.captures_dir.parent / event["image_path"]).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import io
+import json
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from proctoring.domain import RegisteredUser
+from proctoring.infrastructure.evidence_export import EvidenceExportItem, iter_evidence_zip
+
+
+class TestEvidenceExport(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.captures_dir = Path(self._tmp.name) / "violation_captures"
+        (self.captures_dir / "alice").mkdir(parents=True)
+        self.image_bytes = b"\xff\xd8" + bytes(range(256)) * 2000
+        (self.captures_dir / "alice" / "a1.jpg").write_bytes(self.image_bytes)
+        (self.captures_dir / "alice" / "a1_clip.jpg").write_bytes(b"\xff\xd8clip")
+        self.user = RegisteredUser(username="Alice", signatures=[np.zeros(4)], email="alice@example.com")
+        self.events = [
+            {
+                "timestamp": "2025-01-01T00:00:00+00:00",
+                "violations": ["no_face"],
+                "image_path": "violation_captures/alice/a1.jpg",
+                "clip_path": "violation_captures/alice/a1_clip.jpg",
+            },
+            {"timestamp": "2025-01-01T00:01:00+00:00", "violations": ["no_face"], "image_path": "violation_captures/gone.jpg"},
+        ]
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _export(self, items: list[EvidenceExportItem], chunk_size: int = 64 * 1024) -> tuple[list[bytes], zipfile.ZipFile]:
+        chunks = list(iter_evidence_zip(items, self.captures_dir, chunk_size=chunk_size))
+        return chunks, zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    def test_bundle_contains_profile_events_and_captures(self) -> None:
+        _, archive = self._export([EvidenceExportItem("alice", self.user, self.events)])
+
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.read("alice/captures/a1.jpg"), self.image_bytes)
+        self.assertEqual(archive.getinfo("alice/captures/a1.jpg").compress_type, zipfile.ZIP_STORED)
+        profile = json.loads(archive.read("alice/profile.json"))
+        events = json.loads(archive.read("alice/events.json"))
+        self.assertEqual(profile["email"], "alice@example.com")
+        self.assertNotIn("signatures", profile)
+        self.assertEqual(events[0]["image_path"], "captures/a1.jpg")
+        self.assertEqual(events[0]["clip_path"], "captures/a1_clip.jpg")
+        self.assertIsNone(events[1]["image_path"])
+
+    def test_archive_is_streamed_in_bounded_chunks(self) -> None:
+        chunks, archive = self._export([EvidenceExportItem("alice", self.user, self.events)], chunk_size=16 * 1024)
+
+        self.assertGreater(len(chunks), 10)
+        self.assertLess(max(len(chunk) for chunk in chunks), 32 * 1024)
+        self.assertTrue(all(chunks))
+        self.assertEqual(len(archive.namelist()), 4)
+
+    def test_bulk_export_uses_one_folder_per_candidate(self) -> None:
+        _, archive = self._export(
+            [
+                EvidenceExportItem("alice", self.user, self.events[:1]),
+                EvidenceExportItem("bob/../x", None, []),
+            ]
+        )
+
+        self.assertIn("alice/events.json", archive.namelist())
+        self.assertIn("bob_.._x/events.json", archive.namelist())
+        self.assertNotIn("bob_.._x/profile.json", archive.namelist())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import base64
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from proctoring.config import MODEL_WARMUP_DEFER_ENV
+from proctoring.domain import AnalysisResult, RegisteredUser
+from proctoring.infrastructure.evidence import resolve_evidence_path
+from proctoring.infrastructure.frame_buffer import FrameRingBuffer, ViolationClipWriter
+
+
+def _jpeg(value: int) -> bytes:
+    ok, buffer = cv2.imencode(".jpg", np.full((120, 160, 3), value, dtype=np.uint8))
+    assert ok
+    return buffer.tobytes()
+
+
+class TestFrameRingBuffer(unittest.TestCase):
+    def test_window_and_per_session_cap(self) -> None:
+        buffer = FrameRingBuffer(window_seconds=5.0, max_frames_per_session=3, max_total_bytes=10_000)
+        for ts in range(6):
+            buffer.append("a", float(ts), b"x" * 10)
+
+        frames = buffer.snapshot("a", 0.0, 10.0)
+
+        self.assertEqual([ts for ts, _ in frames], [3.0, 4.0, 5.0])
+        self.assertEqual(buffer.total_bytes, 30)
+
+    def test_global_cap_evicts_least_recent_session_first(self) -> None:
+        buffer = FrameRingBuffer(window_seconds=60.0, max_frames_per_session=10, max_total_bytes=100)
+        buffer.append("idle", 0.0, b"x" * 40)
+        buffer.append("idle", 1.0, b"x" * 40)
+        buffer.append("active", 2.0, b"y" * 40)
+
+        self.assertEqual(len(buffer.snapshot("idle", 0.0, 10.0)), 1)
+        self.assertEqual(len(buffer.snapshot("active", 0.0, 10.0)), 1)
+        self.assertLessEqual(buffer.total_bytes, 100)
+
+        buffer.discard("active")
+        self.assertEqual(buffer.total_bytes, 40)
+
+    def test_clip_written_after_post_window(self) -> None:
+        buffer = FrameRingBuffer(window_seconds=30.0, max_frames_per_session=30, max_total_bytes=1_000_000)
+        writer = ViolationClipWriter(buffer, pre_seconds=2.0, post_seconds=1.0, max_tiles=4)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = Path(tmpdir) / "clip.jpg"
+            for ts in range(0, 3):
+                buffer.append("a", 100.0 + ts, _jpeg(40 * ts))
+            writer.schedule("a", 101.0, output)
+
+            writer.poll(101.5)
+            self.assertFalse(output.exists())
+
+            buffer.append("a", 103.0, _jpeg(200))
+            writer.poll(103.0)
+            deadline = time.time() + 5
+            while not output.exists() and time.time() < deadline:
+                time.sleep(0.01)
+
+            sheet = cv2.imread(str(output))
+        self.assertIsNotNone(sheet)
+        self.assertEqual(sheet.shape[1], 2 * 320)
+
+    def test_due_clip_is_flushed_without_further_uploads(self) -> None:
+        buffer = FrameRingBuffer(window_seconds=30.0, max_frames_per_session=30, max_total_bytes=1_000_000)
+        writer = ViolationClipWriter(buffer, pre_seconds=2.0, post_seconds=0.2, max_tiles=4)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output = Path(tmpdir) / "clip.jpg"
+            now_ts = time.time()
+            buffer.append("a", now_ts, _jpeg(120))
+            writer.schedule("a", now_ts, output)
+
+            deadline = time.time() + 5
+            while not output.exists() and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertTrue(output.exists())
+
+
+def _noise_data_url(seed: int) -> str:
+    image = np.random.default_rng(seed).integers(40, 220, (240, 320, 3), dtype=np.uint8)
+    ok, buffer = cv2.imencode(".jpg", image)
+    assert ok
+    return "data:image/jpeg;base64," + base64.b64encode(buffer.tobytes()).decode("ascii")
+
+
+class TestViolationClipRoute(unittest.TestCase):
+    def test_contact_sheet_has_a_tile_per_buffered_frame(self) -> None:
+        from proctoring import create_app
+
+        with mock.patch.dict(os.environ, {MODEL_WARMUP_DEFER_ENV: "1"}):
+            app = create_app("all")
+        state = app.extensions["proctoring_state"]
+        state.registered_faces["alice"] = RegisteredUser(username="alice", signatures=[])
+        state.clip_writer.post_seconds = 0.3
+        client = app.test_client()
+        with client.session_transaction() as flask_session:
+            flask_session["verified_user"] = "alice"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            captures_dir = Path(tmpdir) / "captures"
+            app.config["VIOLATION_EVENTS_FILE"] = Path(tmpdir) / "events.json"
+            app.config["VIOLATION_CAPTURES_DIR"] = captures_dir
+            clean = AnalysisResult(face_count=0, sideways_score=None, violations=[])
+            with (
+                mock.patch.object(state.analyzer, "analyze", side_effect=lambda frame: clean),
+                mock.patch.object(state.phone_detector, "detect_phone", return_value=False),
+            ):
+                for seed in range(4):
+                    response = client.post(
+                        "/analyze_frame",
+                        json={"username": "alice", "image": _noise_data_url(seed)},
+                    )
+                    self.assertEqual(response.get_json()["violations"], [])
+            dark = np.full((240, 320, 3), 5, dtype=np.uint8)
+            ok, buffer = cv2.imencode(".jpg", dark)
+            assert ok
+            image = "data:image/jpeg;base64," + base64.b64encode(buffer.tobytes()).decode("ascii")
+            response = client.post("/analyze_frame", json={"username": "alice", "image": image})
+            self.assertIn("low_lighting", response.get_json()["violations"])
+
+            clip_path = resolve_evidence_path(captures_dir, state.violation_events["alice"][-1]["clip_path"])
+            deadline = time.time() + 5
+            while clip_path is not None and not clip_path.exists() and time.time() < deadline:
+                time.sleep(0.01)
+            sheet = cv2.imread(str(clip_path))
+        self.assertIsNotNone(sheet)
+        # Five tiles in a 3 x 2 grid.
+        self.assertEqual(sheet.shape[1], 3 * 320)
+        self.assertEqual(sheet.shape[0], 2 * 240)
+
+
+if __name__ == "__main__":
+    unittest.main()
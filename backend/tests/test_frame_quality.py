@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from proctoring.services.quality import assess_frame_quality
+
+
+def _textured_frame(seed: int, mean: float = 120.0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    frame = rng.normal(mean, 40.0, size=(480, 640, 3))
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+class TestFrameQualityGate(unittest.TestCase):
+    def test_textured_frame_is_usable(self) -> None:
+        quality, thumbnail = assess_frame_quality(_textured_frame(1))
+
+        self.assertEqual(quality.verdict, "ok")
+        self.assertTrue(quality.usable)
+        self.assertEqual(thumbnail.shape, (120, 160))
+
+    def test_dark_frame_is_rejected(self) -> None:
+        quality, _ = assess_frame_quality(np.full((480, 640, 3), 8, dtype=np.uint8))
+
+        self.assertEqual(quality.verdict, "too_dark")
+        self.assertFalse(quality.usable)
+
+    def test_overexposed_frame_is_rejected(self) -> None:
+        quality, _ = assess_frame_quality(np.full((480, 640, 3), 255, dtype=np.uint8))
+
+        self.assertEqual(quality.verdict, "overexposed")
+
+    def test_flat_frame_is_blurry(self) -> None:
+        quality, _ = assess_frame_quality(np.full((480, 640, 3), 128, dtype=np.uint8))
+
+        self.assertEqual(quality.verdict, "blurry")
+
+    def test_duplicate_frame_is_frozen(self) -> None:
+        frame = _textured_frame(2)
+        _, previous = assess_frame_quality(frame)
+
+        quality, _ = assess_frame_quality(frame.copy(), previous)
+        fresh, _ = assess_frame_quality(_textured_frame(3), previous)
+
+        self.assertEqual(quality.verdict, "frozen")
+        self.assertEqual(quality.frame_delta, 0.0)
+        self.assertEqual(fresh.verdict, "ok")
+
+    def test_still_scene_with_sensor_noise_is_not_frozen(self) -> None:
+        frame = _textured_frame(4)
+        rng = np.random.default_rng(5)
+        _, previous = assess_frame_quality(frame)
+        noisy = np.clip(frame + rng.normal(0.0, 1.0, size=frame.shape), 0, 255).astype(np.uint8)
+
+        quality, _ = assess_frame_quality(noisy, previous)
+
+        self.assertEqual(quality.verdict, "ok")
+
+
+if __name__ == "__main__":
+    unittest.main()
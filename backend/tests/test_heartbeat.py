@@ -0,0 +1,39 @@
+import unittest
+
+from proctoring.services.heartbeat import FrameHeartbeat, heartbeat_frame_request
+from proctoring.services.sessions import SessionRecord
+
+
+def clean_record() -> SessionRecord:
+    return SessionRecord(last_analyzed_ts=100.0, last_frame_clean=True)
+
+
+class TestHeartbeatFrameRequest(unittest.TestCase):
+    def test_unchanged_scene_after_a_clean_frame_carries_forward(self) -> None:
+        self.assertIsNone(heartbeat_frame_request(clean_record(), FrameHeartbeat(1.2, 120.0), 102.0))
+
+    def test_real_frames_are_requested_at_the_maximum_interval(self) -> None:
+        self.assertEqual(heartbeat_frame_request(clean_record(), FrameHeartbeat(1.2, 120.0), 105.0), "interval")
+
+    def test_flagged_or_suspicious_sessions_need_real_frames(self) -> None:
+        record = clean_record()
+        record.last_frame_clean = False
+        self.assertEqual(heartbeat_frame_request(record, FrameHeartbeat(1.2, 120.0), 101.0), "unresolved")
+
+        record = clean_record()
+        record.phone_visible_streak = 1
+        self.assertEqual(heartbeat_frame_request(record, FrameHeartbeat(1.2, 120.0), 101.0), "suspicion")
+
+    def test_scene_conditions_need_real_frames(self) -> None:
+        record = clean_record()
+
+        self.assertEqual(heartbeat_frame_request(record, FrameHeartbeat(1.2, 40.0), 101.0), "low_light")
+        self.assertEqual(heartbeat_frame_request(record, FrameHeartbeat(0.0, 120.0), 101.0), "frozen")
+        self.assertEqual(heartbeat_frame_request(record, FrameHeartbeat(9.0, 120.0), 101.0), "changed")
+
+    def test_payload_is_validated(self) -> None:
+        self.assertEqual(FrameHeartbeat.from_payload({"change": "1.5", "brightness": 90}), FrameHeartbeat(1.5, 90.0))
+        with self.assertRaises(ValueError):
+            FrameHeartbeat.from_payload({"change": -1, "brightness": 90})
+        with self.assertRaises(ValueError):
+            FrameHeartbeat.from_payload({"brightness": 90})
@@ -0,0 +1,57 @@
+import unittest
+
+from proctoring.services.identity_tracker import IdentityTracker
+
+
+def _run_frames(tracker: IdentityTracker, frames: int, score: float) -> int:
+    checks = 0
+    for _ in range(frames):
+        if tracker.should_verify():
+            tracker.record(score)
+            checks += 1
+        else:
+            tracker.skip()
+    return checks
+
+
+class TestIdentityTracker(unittest.TestCase):
+    def test_stable_track_is_checked_rarely(self) -> None:
+        tracker = IdentityTracker()
+
+        checks = _run_frames(tracker, 100, score=0.95)
+
+        expected_max = tracker.fast_checks + (100 - tracker.fast_checks) // tracker.stable_interval + 1
+        self.assertLessEqual(checks, expected_max)
+        self.assertEqual(tracker.mismatch_streak, 0)
+
+    def test_single_noisy_frame_does_not_start_streak(self) -> None:
+        tracker = IdentityTracker()
+        for _ in range(tracker.fast_checks):
+            tracker.record(0.95)
+
+        is_match = tracker.record(tracker.threshold - 0.10)
+
+        self.assertTrue(is_match)
+        self.assertEqual(tracker.mismatch_streak, 0)
+
+    def test_persistent_mismatch_is_checked_every_frame(self) -> None:
+        tracker = IdentityTracker()
+        _run_frames(tracker, 30, score=0.95)
+
+        checks = _run_frames(tracker, 20, score=0.40)
+
+        self.assertGreaterEqual(checks, 20 - tracker.stable_interval)
+        self.assertGreaterEqual(tracker.mismatch_streak, 5)
+
+    def test_track_break_restarts_fast_checks(self) -> None:
+        tracker = IdentityTracker()
+        _run_frames(tracker, 30, score=0.95)
+
+        tracker.note_track_break()
+
+        self.assertIsNone(tracker.score)
+        self.assertEqual(_run_frames(tracker, tracker.fast_checks, score=0.95), tracker.fast_checks)
+
+
+if __name__ == "__main__":
+    unittest.main()
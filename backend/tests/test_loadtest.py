@@ -0,0 +1,118 @@
+import http.client
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from proctoring.loadtest import CandidateClient, ServerSampler, latency_summary, percentile, run_level
+
+
+class _ExamServer(BaseHTTPRequestHandler):
+    analyzed = 0
+    lock = threading.Lock()
+
+    def do_POST(self) -> None:
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        cookie = f"session={payload['username']}"
+        if self.path == "/verify_face":
+            self._reply(200, {"ok": True, "match": True}, cookie)
+        elif self.path == "/analyze_frame" and self.headers.get("Cookie") != cookie:
+            self._reply(403, {"error": "Unauthorized monitoring session"})
+        elif self.path == "/analyze_frame":
+            with self.lock:
+                type(self).analyzed += 1
+                turn = type(self).analyzed % 3
+            if turn == 0:
+                body = {"skipped": True, "overloaded": True, "retry_after_ms": 10}
+            else:
+                body = {"skipped": turn == 1, "violations": []}
+            self._reply(200, body)
+        else:
+            self._reply(200, {"ok": True})
+
+    def _reply(self, status: int, body: dict, cookie: str | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if cookie:
+            self.send_header("Set-Cookie", f"{cookie}; Path=/")
+        self.end_headers()
+        self.wfile.write(json.dumps(body).encode("utf-8"))
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class TestLoadTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _ExamServer)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_enrolled_candidates_stream_frames_and_skipped_frames_are_counted_apart(self) -> None:
+        clients = [CandidateClient(self.url, f"candidate-{index}", 5.0) for index in range(3)]
+        for client in clients:
+            client.enroll(["data:image/jpeg;base64,AA=="])
+
+        report = run_level(clients, ["data:image/jpeg;base64,AA=="], fps=20.0, duration_seconds=0.5)
+
+        self.assertEqual(report.candidates, 3)
+        self.assertEqual(report.errors, 0)
+        self.assertGreater(report.analyzed, 0)
+        self.assertGreater(report.overloaded, 0)
+        self.assertGreater(report.quality_skipped, 0)
+        self.assertEqual(report.requests, report.analyzed + report.quality_skipped + report.overloaded)
+        self.assertIn("p99", report.latency_ms)
+        self.assertIn("p99", report.skipped_latency_ms)
+
+    def test_unverified_candidates_are_reported_as_errors(self) -> None:
+        client = CandidateClient(self.url, "stranger", 5.0)
+
+        report = run_level([client], ["data:image/jpeg;base64,AA=="], fps=20.0, duration_seconds=0.2)
+
+        self.assertEqual(report.errors_by_kind, {"http_403": report.requests})
+        self.assertEqual(report.error_rate, 1.0)
+
+    def test_truncated_responses_are_reported_as_errors(self) -> None:
+        client = CandidateClient(self.url, "candidate", 5.0)
+        truncated = http.client.IncompleteRead(b"{", 10)
+
+        with mock.patch.object(client, "post", side_effect=truncated):
+            report = run_level([client], ["data:image/jpeg;base64,AA=="], fps=20.0, duration_seconds=0.2)
+
+        self.assertGreater(report.requests, 0)
+        self.assertEqual(report.errors_by_kind, {"IncompleteRead": report.requests})
+
+    def test_a_crashed_candidate_still_reports_its_frames(self) -> None:
+        client = CandidateClient(self.url, "candidate", 5.0)
+        replies = [(200, {"skipped": False, "violations": []}), RuntimeError("client bug")]
+
+        with (
+            mock.patch.object(client, "post", side_effect=replies),
+            mock.patch("threading.excepthook"),
+        ):
+            report = run_level([client], ["data:image/jpeg;base64,AA=="], fps=50.0, duration_seconds=0.2)
+
+        self.assertEqual(report.analyzed, 1)
+        self.assertEqual(report.requests, 1)
+
+    def test_percentiles_use_nearest_rank(self) -> None:
+        ordered = [float(value) for value in range(1, 101)]
+
+        self.assertEqual(percentile(ordered, 50), 50.0)
+        self.assertEqual(percentile(ordered, 99), 99.0)
+        self.assertEqual(percentile([7.0], 90), 7.0)
+        self.assertEqual(latency_summary([]), {})
+
+    def test_sampler_reports_proportional_memory(self) -> None:
+        sampler = ServerSampler(os.getpid(), interval_seconds=0.01)
+        sampler.start()
+        server = sampler.stop()
+
+        self.assertGreater(server["pss_mb_peak"], 0.0)
+        self.assertGreaterEqual(server["processes"], 1)
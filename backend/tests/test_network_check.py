@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from proctoring.config import MODEL_WARMUP_DEFER_ENV
+
+from proctoring.services.network_check import (
+    CAPTURE_PROFILES,
+    NetworkMeasurement,
+    load_capture_profile,
+    load_network_check,
+    probe_body,
+    prune_network_checks,
+    recommend_capture_profile,
+    resolve_probe_size_kb,
+    save_network_check,
+)
+
+
+def measurement(upload_mbps: float, rtt_ms: float = 50.0, jitter_ms: float = 5.0) -> NetworkMeasurement:
+    return NetworkMeasurement(download_mbps=20.0, upload_mbps=upload_mbps, rtt_ms=rtt_ms, jitter_ms=jitter_ms)
+
+
+class TestProbeBodies(unittest.TestCase):
+    def test_sizes_are_validated(self) -> None:
+        self.assertEqual(resolve_probe_size_kb(None), 256)
+        self.assertEqual(resolve_probe_size_kb("1024"), 1024)
+        for raw in ("100", "big", "-64"):
+            with self.assertRaises(ValueError):
+                resolve_probe_size_kb(raw)
+
+    def test_bodies_are_built_once_and_incompressible(self) -> None:
+        body = probe_body(64)
+
+        self.assertIs(probe_body(64), body)
+        self.assertEqual(len(body), 64 * 1024)
+        # A run of one byte value would compress to almost nothing.
+        self.assertGreater(len(set(body)), 200)
+
+
+class TestCaptureProfiles(unittest.TestCase):
+    def test_weaker_links_get_smaller_frames(self) -> None:
+        names = [recommend_capture_profile(measurement(mbps)).name for mbps in (10.0, 1.0, 0.4, 0.1)]
+
+        self.assertEqual(names, ["high", "medium", "low", "minimal"])
+
+    def test_latency_alone_lowers_the_profile(self) -> None:
+        self.assertEqual(recommend_capture_profile(measurement(10.0, rtt_ms=600.0, jitter_ms=50.0)).name, "low")
+
+    def test_measurements_are_validated(self) -> None:
+        payload = {"download_mbps": 5, "upload_mbps": "1.5", "rtt_ms": 40, "jitter_ms": 3}
+        self.assertTrue(NetworkMeasurement.from_payload(payload).passed)
+
+        for name, value in (("upload_mbps", None), ("rtt_ms", -1), ("jitter_ms", "nan")):
+            with self.assertRaises(ValueError):
+                NetworkMeasurement.from_payload({**payload, name: value})
+
+    def test_records_round_trip_per_candidate(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            slow = measurement(0.4)
+            save_network_check(directory, "alice smith", "Alice Smith", slow, recommend_capture_profile(slow))
+
+            record = load_network_check(directory, "alice smith")
+            self.assertEqual(record["username"], "Alice Smith")
+            self.assertEqual(record["measurement"]["upload_mbps"], 0.4)
+            self.assertEqual(load_capture_profile(directory, "alice smith"), CAPTURE_PROFILES[2])
+            self.assertIsNone(load_capture_profile(directory, "bob"))
+
+    def test_old_records_are_pruned(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            fast = measurement(5.0)
+            for key in ("alice", "bob"):
+                save_network_check(directory, key, key, fast, recommend_capture_profile(fast))
+            old = directory / "alice.json"
+            os.utime(old, (old.stat().st_mtime - 86400.0,) * 2)
+
+            self.assertEqual(prune_network_checks(directory, max_age_seconds=3600.0), 1)
+            self.assertIsNone(load_network_check(directory, "alice"))
+            self.assertIsNotNone(load_network_check(directory, "bob"))
+
+
+class TestNetworkCheckRoute(unittest.TestCase):
+    def test_registered_candidates_profile_is_only_replaced_by_their_session(self) -> None:
+        from proctoring import create_app
+
+        payload = {"username": "Alice Smith", "download_mbps": 20, "upload_mbps": 5, "rtt_ms": 40, "jitter_ms": 2}
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            with (
+                mock.patch.dict(os.environ, {MODEL_WARMUP_DEFER_ENV: "1"}),
+                mock.patch("proctoring.app_factory.REGISTERED_FACES_FILE", tmp / "faces.json"),
+                mock.patch("proctoring.app_factory.VIOLATION_EVENTS_FILE", tmp / "events.json"),
+                mock.patch("proctoring.app_factory.NETWORK_CHECKS_DIR", tmp / "network_checks"),
+                mock.patch("proctoring.app_factory.ROLLUP_SNAPSHOT_FILE", tmp / "rollups.json"),
+            ):
+                app = create_app("api")
+            client = app.test_client()
+
+            self.assertEqual(client.post("/api/network_check", json=payload).status_code, 200)
+            app.extensions["proctoring_state"].registered_faces["alice smith"] = mock.Mock()
+            self.assertEqual(client.post("/api/network_check", json=payload).status_code, 409)
+            with client.session_transaction() as flask_session:
+                flask_session["verified_user"] = "alice smith"
+            self.assertEqual(client.post("/api/network_check", json=payload).status_code, 200)
@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from proctoring.services.phone_backends import decode_yolo_output, letterbox_to_blob, non_max_suppression
+
+
+def _yolo_output(num_classes: int, anchors: list[tuple[float, float, float, float, int, float]]) -> np.ndarray:
+    output = np.zeros((1, 4 + num_classes, len(anchors)), dtype=np.float32)
+    for idx, (cx, cy, w, h, class_id, score) in enumerate(anchors):
+        output[0, :4, idx] = (cx, cy, w, h)
+        output[0, 4 + class_id, idx] = score
+    return output
+
+
+class TestOnnxPhonePostprocess(unittest.TestCase):
+    def test_decode_keeps_only_requested_classes(self) -> None:
+        output = _yolo_output(
+            80,
+            [
+                (100.0, 100.0, 40.0, 80.0, 67, 0.90),
+                (200.0, 200.0, 60.0, 60.0, 0, 0.95),
+                (300.0, 120.0, 40.0, 80.0, 67, 0.05),
+            ],
+        )
+        boxes, scores, classes = decode_yolo_output(output, class_ids=[67], confidence=0.1)
+
+        self.assertEqual(boxes.shape, (1, 4))
+        np.testing.assert_allclose(boxes[0], [80.0, 60.0, 120.0, 140.0])
+        self.assertAlmostEqual(float(scores[0]), 0.90, places=5)
+        self.assertEqual(int(classes[0]), 67)
+
+    def test_nms_suppresses_overlapping_boxes(self) -> None:
+        boxes = np.array(
+            [
+                [10.0, 10.0, 50.0, 90.0],
+                [12.0, 12.0, 52.0, 92.0],
+                [200.0, 200.0, 240.0, 280.0],
+            ],
+            dtype=np.float32,
+        )
+        scores = np.array([0.6, 0.8, 0.5], dtype=np.float32)
+
+        keep = non_max_suppression(boxes, scores, iou_threshold=0.45)
+
+        self.assertEqual(keep.tolist(), [1, 2])
+
+    def test_letterbox_pads_to_square_blob(self) -> None:
+        frame = np.full((240, 480, 3), 255, dtype=np.uint8)
+
+        blob, scale, pad = letterbox_to_blob(frame, 416)
+
+        self.assertEqual(blob.shape, (1, 3, 416, 416))
+        self.assertAlmostEqual(scale, 416 / 480)
+        self.assertEqual(pad, (0.0, 104.0))
+        self.assertAlmostEqual(float(blob[0, 0, 208, 208]), 1.0, places=5)
+        self.assertAlmostEqual(float(blob[0, 0, 0, 0]), 114 / 255, places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import tempfile
+import time
+import unittest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from proctoring.infrastructure.profiler import (
+    ProfilerSettings,
+    SamplingProfiler,
+    build_speedscope,
+    format_collapsed,
+    load_profiler_settings,
+    load_session_profiles,
+    save_profiler_settings,
+)
+
+
+def _busy_stage(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+def _settings(**overrides: object) -> ProfilerSettings:
+    values = {"enabled": True, "session_id": "s1", "sample_rate": 1.0, "interval_ms": 1.0, "expires_at": 200.0}
+    values.update(overrides)
+    return ProfilerSettings(**values)
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_profiled_calls_and_executor_work_under_the_label(self) -> None:
+        profiler = SamplingProfiler()
+        profiler.configure(_settings())
+
+        with ThreadPoolExecutor(1) as pool:
+            executor = profiler.wrap_executor(pool, "POST /analyze_frame")
+
+            def request() -> None:
+                future = executor.submit(_busy_stage, 0.15)
+                _busy_stage(0.15)
+                future.result()
+
+            profiler.profile_request("POST /analyze_frame", request)
+
+        stacks = format_collapsed(profiler._stacks)
+        self.assertEqual(profiler.requests, 1)
+        self.assertGreater(profiler.samples, 0)
+        self.assertTrue(all(line.startswith("POST /analyze_frame;") for line in stacks.splitlines()))
+        self.assertIn("request (", stacks)
+        self.assertIn("_busy_stage (", stacks)
+        # Executor stacks start at the submitted task, not in the pool's worker loop.
+        self.assertNotIn("_worker", stacks)
+
+    def test_should_profile_honours_switch_expiry_candidate_and_rate(self) -> None:
+        profiler = SamplingProfiler()
+        self.assertFalse(profiler.should_profile("alice", 100.0))
+
+        profiler.configure(_settings(user_key="alice"))
+        self.assertTrue(profiler.should_profile("alice", 100.0))
+        self.assertFalse(profiler.should_profile("bob", 100.0))
+        self.assertFalse(profiler.should_profile("alice", 250.0))
+
+        profiler.configure(_settings(sample_rate=0.0))
+        self.assertFalse(profiler.should_profile("alice", 100.0))
+
+    def test_new_session_discards_previous_stacks(self) -> None:
+        profiler = SamplingProfiler()
+        profiler.configure(_settings())
+        profiler.profile_request("label", _busy_stage, 0.05)
+
+        profiler.configure(_settings(session_id="s2"))
+
+        self.assertEqual((profiler.requests, profiler.samples), (0, 0))
+
+
+class TestProfileFiles(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_settings_and_flushed_stacks_round_trip(self) -> None:
+        settings = _settings(user_key="alice")
+        save_profiler_settings(self.directory, settings)
+        self.assertEqual(load_profiler_settings(self.directory), settings)
+
+        profiler = SamplingProfiler()
+        profiler.configure(settings)
+        profiler.profile_request("label", _busy_stage, 0.05)
+        profiler.flush(self.directory)
+
+        stacks, totals = load_session_profiles(self.directory, "s1")
+        self.assertEqual(stacks, profiler._stacks)
+        self.assertEqual((totals["processes"], totals["requests"]), (1, 1))
+        self.assertEqual(load_session_profiles(self.directory, "other")[0], Counter())
+
+    def test_speedscope_export_shares_frames_between_samples(self) -> None:
+        stacks = Counter(
+            {
+                (("root", "", 0), ("analyze", "analyzer.py", 66)): 3,
+                (("root", "", 0), ("detect_phone", "identity.py", 219)): 1,
+            }
+        )
+
+        document = build_speedscope(stacks, "profile", interval_ms=5.0)
+
+        self.assertEqual([frame["name"] for frame in document["shared"]["frames"]], ["root", "analyze", "detect_phone"])
+        profile = document["profiles"][0]
+        self.assertEqual(profile["samples"], [[0, 1], [0, 2]])
+        self.assertEqual(profile["weights"], [15.0, 5.0])
+        self.assertEqual(profile["endValue"], 20.0)
+        self.assertEqual(format_collapsed(stacks).splitlines()[0], "root;analyze (analyzer.py:66) 3")
@@ -0,0 +1,99 @@
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from flask import Flask
+
+from proctoring.web.forwarding import INFERENCE_ENDPOINTS, register_inference_forwarding
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+API_ROLE_SCRIPT = """
+import json, sys
+from proctoring import create_app
+
+app = create_app("api")
+app.config["ROLLUP_SNAPSHOT_FILE"] = __import__("pathlib").Path(sys.argv[1])
+client = app.test_client()
+print(json.dumps({
+    "heavy": sorted(name for name in ("mediapipe", "cv2", "ultralytics", "onnxruntime") if name in sys.modules),
+    "readyz": client.get("/readyz").status_code,
+    "analyze_frame": client.post("/analyze_frame", json={}).status_code,
+    "device_check": client.get("/device_check").status_code,
+    "speed_probe": len(client.get("/speed_probe?size=64").data),
+    "upload_probe": client.post("/speed_probe/upload", data=b"x" * 1000).get_json()["bytes"],
+}))
+"""
+
+
+class _Upstream(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        payload = json.dumps({"path": self.path, "echo": json.loads(body), "cookie": self.headers.get("Cookie")})
+        self.send_response(403 if self.path == "/analyze_frame" else 200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Set-Cookie", "session=verified; Path=/")
+        self.send_header("Retry-After", "2")
+        self.end_headers()
+        self.wfile.write(payload.encode("utf-8"))
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+class TestApiRole(unittest.TestCase):
+    def test_api_role_never_imports_vision_models(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = subprocess.run(
+                [sys.executable, "-c", API_ROLE_SCRIPT, str(Path(tmp) / "rollups.json")],
+                cwd=BACKEND_DIR,
+                capture_output=True,
+                text=True,
+                timeout=120,
+            )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        self.assertEqual(report["heavy"], [])
+        self.assertEqual(report["readyz"], 200)
+        self.assertEqual(report["analyze_frame"], 503)
+        self.assertEqual(report["device_check"], 200)
+        self.assertEqual(report["speed_probe"], 64 * 1024)
+        self.assertEqual(report["upload_probe"], 1000)
+
+
+class TestInferenceForwarding(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Upstream)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.app = Flask(__name__)
+        register_inference_forwarding(self.app, f"http://127.0.0.1:{self.server.server_port}/", 5.0)
+        self.client = self.app.test_client()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_relays_body_cookies_and_status(self) -> None:
+        self.client.set_cookie("session", "abc")
+        response = self.client.post("/verify_face", json={"username": "alice"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), {"path": "/verify_face", "echo": {"username": "alice"}, "cookie": "session=abc"})
+        self.assertIn("session=verified; Path=/", response.headers.getlist("Set-Cookie"))
+        self.assertEqual(response.headers.get("Retry-After"), "2")
+
+        self.assertEqual(self.client.post("/analyze_frame", json={}).status_code, 403)
+
+    def test_unreachable_upstream_is_a_bad_gateway(self) -> None:
+        app = Flask(__name__)
+        register_inference_forwarding(app, "http://127.0.0.1:9", 1.0)
+        self.assertEqual(app.test_client().post("/verify_face", json={}).status_code, 502)
+
+    def test_covers_every_inference_endpoint(self) -> None:
+        rules = {rule.endpoint: rule.rule for rule in self.app.url_map.iter_rules() if rule.endpoint != "static"}
+        self.assertEqual(rules, INFERENCE_ENDPOINTS)
@@ -0,0 +1,80 @@
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from proctoring.infrastructure.rollups import ViolationRollups
+
+BASE_TIME = datetime(2025, 1, 1, 9, 0, tzinfo=timezone.utc)
+
+
+def _event(event_id: int, seconds: int, *violations: str) -> dict:
+    return {
+        "event_id": event_id,
+        "timestamp": (BASE_TIME + timedelta(seconds=seconds)).isoformat(),
+        "violations": list(violations),
+    }
+
+
+class TestViolationRollups(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rollups = ViolationRollups(bucket_seconds=60, retention_seconds=86400)
+        self.rollups.record("alice", _event(1, 5, "phone_visible", "no_face"))
+        self.rollups.record("bob", _event(2, 30, "phone_visible"))
+        self.rollups.record("alice", _event(3, 70, "no_face"))
+        self.since = BASE_TIME.timestamp()
+        self.until = self.since + 179
+
+    def test_series_by_scope(self) -> None:
+        _, everything = self.rollups.series(since=self.since, until=self.until)
+        _, phones = self.rollups.series(since=self.since, until=self.until, violation_type="phone_visible")
+        _, alice_no_face = self.rollups.series(
+            since=self.since, until=self.until, violation_type="no_face", user_key="alice"
+        )
+
+        self.assertEqual([count for _, count in everything], [2, 1, 0])
+        self.assertEqual([count for _, count in phones], [2, 0, 0])
+        self.assertEqual([count for _, count in alice_no_face], [1, 1, 0])
+        self.assertEqual(self.rollups.totals_by_type(self.since, self.until), {"no_face": 2, "phone_visible": 2})
+        self.assertEqual(self.rollups.totals_by_type(self.since, self.until, user_key="bob"), {"phone_visible": 1})
+
+    def test_coarser_step_merges_buckets(self) -> None:
+        step, points = self.rollups.series(since=self.since, until=self.until, step_seconds=90)
+
+        self.assertEqual(step, 120)
+        self.assertEqual(sum(count for _, count in points), 3)
+
+    def test_replayed_events_are_ignored(self) -> None:
+        self.assertFalse(self.rollups.record("alice", _event(2, 30, "phone_visible")))
+        self.assertEqual(self.rollups.last_event_id, 3)
+
+    def test_snapshot_round_trip_and_catch_up(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            snapshot = Path(tmp_dir) / "rollups.json"
+            self.rollups.save(snapshot)
+
+            restored = ViolationRollups(bucket_seconds=60, retention_seconds=86400)
+            self.assertTrue(restored.load(snapshot))
+            events = {
+                "alice": [_event(1, 5, "phone_visible"), _event(3, 70, "no_face"), _event(4, 130, "no_face")],
+            }
+            added = restored.catch_up(events, latest_event_id=4)
+
+        _, points = restored.series(since=self.since, until=self.until)
+        self.assertEqual(added, 1)
+        self.assertEqual([count for _, count in points], [2, 1, 1])
+
+    def test_catch_up_rescans_when_store_is_behind_snapshot(self) -> None:
+        added = self.rollups.catch_up({"carol": [_event(1, 0, "no_face")]}, latest_event_id=1)
+
+        self.assertEqual(added, 1)
+        self.assertEqual(self.rollups.totals_by_type(self.since, self.until), {"no_face": 1})
+
+    def test_prune_drops_old_buckets(self) -> None:
+        self.rollups.prune(self.since + 86400 + 60)
+
+        self.assertEqual(self.rollups.totals_by_type(self.since, self.until), {"no_face": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
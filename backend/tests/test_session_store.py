@@ -0,0 +1,276 @@
+import base64
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from proctoring.config import MODEL_WARMUP_DEFER_ENV, SESSION_STORE_BACKEND_ENV, WORKERS_PER_NODE_ENV
+from proctoring.domain import RegisteredUser
+from proctoring.infrastructure import append_violation_event
+from proctoring.infrastructure.event_stream import ViolationEventBroker
+from proctoring.infrastructure.rollups import ViolationRollups
+from proctoring.services.session_store import SqliteSessionStore, create_session_store
+from proctoring.state import (
+    VIOLATION_EVENTS_GENERATION,
+    AppState,
+    publish_violation_event,
+    refresh_shared_state,
+)
+
+
+class TestSqliteSessionStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "sessions.sqlite3"
+        self.store = SqliteSessionStore(self.path, ttl_seconds=60.0, max_sessions=100)
+        # A second instance stands in for another worker process.
+        self.other = SqliteSessionStore(self.path, ttl_seconds=60.0, max_sessions=100)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_record_round_trips_between_workers(self) -> None:
+        record = self.store.load("alice", 1.0)
+        record.phone_visible_streak = 3
+        record.frozen_streak = 2
+        record.blurry_streak = 4
+        record.last_analyzed_ts = 1.5
+        record.last_frame_clean = True
+        record.client_faces_verified = True
+        record.identity.record(0.91)
+        record.quality_thumbnail = np.arange(12, dtype=np.uint8).reshape(3, 4)
+        self.store.save("alice", record)
+
+        restored = self.other.load("alice", 2.0)
+
+        self.assertEqual(restored.phone_visible_streak, 3)
+        self.assertEqual(restored.frozen_streak, 2)
+        self.assertEqual(restored.blurry_streak, 4)
+        self.assertEqual(restored.last_analyzed_ts, 1.5)
+        self.assertTrue(restored.last_frame_clean)
+        self.assertTrue(restored.client_faces_verified)
+        self.assertAlmostEqual(restored.identity.score, 0.91)
+        self.assertEqual(restored.identity.checks, 1)
+        np.testing.assert_array_equal(restored.quality_thumbnail, record.quality_thumbnail)
+
+    def test_capture_claim_is_exclusive_within_cooldown(self) -> None:
+        self.store.load("alice", 0.0)
+
+        self.assertTrue(self.store.try_claim_capture("alice", 100.0, 3.0))
+        self.assertFalse(self.other.try_claim_capture("alice", 101.0, 3.0))
+        self.assertTrue(self.other.try_claim_capture("alice", 103.5, 3.0))
+
+        # Saving the session never rolls the claim back.
+        self.store.save("alice", self.store.load("alice", 104.0))
+        self.assertFalse(self.store.try_claim_capture("alice", 104.0, 3.0))
+
+    def test_generations_are_shared(self) -> None:
+        self.assertEqual(self.other.generation("registered_faces"), 0)
+
+        self.store.bump_generation("registered_faces")
+
+        self.assertEqual(self.other.generation("registered_faces"), 1)
+        self.assertEqual(self.other.bump_generation("registered_faces"), 2)
+
+    def test_mutex_excludes_other_workers(self) -> None:
+        order: list[str] = []
+
+        def contender() -> None:
+            with self.other.mutex("violation_events"):
+                order.append("other")
+
+        with self.store.mutex("violation_events"):
+            worker = threading.Thread(target=contender)
+            worker.start()
+            time.sleep(0.2)
+            order.append("store")
+        worker.join(timeout=5.0)
+
+        self.assertEqual(order, ["store", "other"])
+
+    def test_mutexes_with_different_names_do_not_wait_on_each_other(self) -> None:
+        acquired = threading.Event()
+
+        def contender() -> None:
+            with self.other.mutex("registered_faces"):
+                acquired.set()
+
+        with self.store.mutex("violation_events"):
+            worker = threading.Thread(target=contender)
+            worker.start()
+            self.assertTrue(acquired.wait(timeout=2.0))
+        worker.join(timeout=5.0)
+
+    def test_lease_has_one_holder_until_it_lapses(self) -> None:
+        self.assertTrue(self.store.try_lease("rollup_snapshot", "101", 100.0, 90.0))
+        self.assertFalse(self.other.try_lease("rollup_snapshot", "202", 150.0, 90.0))
+        self.assertTrue(self.store.try_lease("rollup_snapshot", "101", 180.0, 90.0))
+        self.assertFalse(self.other.try_lease("rollup_snapshot", "202", 260.0, 90.0))
+        self.assertTrue(self.other.try_lease("rollup_snapshot", "202", 280.0, 90.0))
+
+    def test_discard_and_start_reset_state(self) -> None:
+        record = self.store.load("alice", 0.0)
+        record.frozen_streak = 5
+        self.store.save("alice", record)
+
+        fresh = self.other.start("alice", 1.0)
+
+        self.assertEqual(fresh.frozen_streak, 0)
+        self.assertEqual(self.store.stats()["sessions"], 1)
+
+    def test_eviction_applies_ttl_and_cap(self) -> None:
+        store = SqliteSessionStore(self.path, ttl_seconds=60.0, max_sessions=2)
+        for idx, key in enumerate(["a", "b", "c", "d"]):
+            store.load(key, 100.0 + idx)
+        store.load("old", 0.0)
+
+        evicted = store.evict_idle(110.0)
+
+        self.assertEqual(evicted, 3)
+        self.assertEqual(store.stats()["sessions"], 2)
+
+    def test_concurrent_saves_keep_both_workers_changes(self) -> None:
+        self.store.load("alice", 0.0)
+        first = self.store.load("alice", 1.0)
+        second = self.other.load("alice", 1.0)
+
+        first.phone_visible_streak += 1
+        first.last_frame_clean = True
+        self.store.save("alice", first)
+        second.phone_visible_streak += 1
+        second.client_faces_verified = True
+        self.other.save("alice", second)
+
+        restored = self.store.load("alice", 2.0)
+        self.assertEqual(restored.phone_visible_streak, 2)
+        self.assertTrue(restored.last_frame_clean)
+        self.assertTrue(restored.client_faces_verified)
+
+    def test_load_refreshes_last_seen_only_when_stale(self) -> None:
+        self.store.load("alice", 100.0)
+        self.assertEqual(self.other.load("alice", 101.0).last_seen, 100.0)
+        stale_ts = 100.0 + self.store.touch_interval_seconds
+        self.assertEqual(self.other.load("alice", stale_ts).last_seen, stale_ts)
+
+    def test_shared_events_since_reports_a_gap(self) -> None:
+        for event_id in (1, 2, 3):
+            self.store.append_shared_event("alice", {"event_id": event_id, "violations": ["no_face"]})
+
+        self.assertEqual([event["event_id"] for _, event in self.other.shared_events_since(1)], [2, 3])
+        self.assertEqual(self.other.shared_events_since(3), [])
+        with mock.patch("proctoring.services.session_store.SHARED_EVENT_JOURNAL_SIZE", 1):
+            self.store.append_shared_event("alice", {"event_id": 4, "violations": []})
+        self.assertIsNone(self.other.shared_events_since(2))
+
+    def test_factory_rejects_unknown_backend(self) -> None:
+        with self.assertRaises(ValueError):
+            create_session_store("redis", path=self.path, ttl_seconds=1.0, max_sessions=1)
+
+
+class TestSharedEventSync(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.workers = [self._worker_state() for _ in range(2)]
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _worker_state(self) -> AppState:
+        state = AppState(
+            sessions=SqliteSessionStore(self.tmp / "sessions.sqlite3", ttl_seconds=60.0, max_sessions=10),
+            event_broker=ViolationEventBroker(backlog=10, max_streams=2),
+            rollups=ViolationRollups(bucket_seconds=60, retention_seconds=3600.0),
+        )
+        state.registered_faces["alice"] = RegisteredUser(username="alice", signatures=[])
+        state.user_summary.rebuild(state.registered_faces, state.violation_events)
+        return state
+
+    def _append(self, state: AppState, violation: str) -> None:
+        with state.sessions.mutex(VIOLATION_EVENTS_GENERATION), state.violation_events_lock:
+            event = append_violation_event(
+                events=state.violation_events,
+                file_path=self.tmp / "events.json",
+                captures_dir=self.tmp / "captures",
+                user_key="alice",
+                username="alice",
+                violations=[violation],
+                max_events_per_user=2,
+                encoded_jpeg=b"\xff\xd8\xff",
+                index=state.event_index,
+            )
+            publish_violation_event(state, "alice", event)
+
+    def test_appended_events_apply_without_reloading_the_store(self) -> None:
+        writer, reader = self.workers
+        for violation in ("no_face", "phone_visible", "low_lighting"):
+            self._append(writer, violation)
+        seen: list[int] = []
+
+        # A reload would read this missing file and come back empty.
+        refresh_shared_state(
+            reader,
+            self.tmp / "faces.json",
+            self.tmp / "missing.json",
+            max_events_per_user=2,
+            on_new_event=lambda user_key, event: seen.append(event["event_id"]),
+        )
+
+        self.assertEqual(seen, [1, 2, 3])
+        kept = [event["violations"] for event in reader.violation_events["alice"]]
+        self.assertEqual(kept, [["phone_visible"], ["low_lighting"]])
+        self.assertEqual(reader.event_index.last_event_id, 3)
+        self.assertEqual(reader.user_summary.page()[0][0]["violation_count"], 2)
+        self.assertEqual(reader.rollups.last_event_id, 3)
+
+
+class TestMemoryStoreWorkers(unittest.TestCase):
+    def test_several_workers_refuse_the_in_process_store(self) -> None:
+        from proctoring import create_app
+
+        env = {WORKERS_PER_NODE_ENV: "2", SESSION_STORE_BACKEND_ENV: "memory", MODEL_WARMUP_DEFER_ENV: "1"}
+        with mock.patch.dict(os.environ, env), self.assertRaisesRegex(RuntimeError, SESSION_STORE_BACKEND_ENV):
+            create_app("api")
+
+
+class TestCaptureWithBusyStore(unittest.TestCase):
+    def test_locked_store_skips_the_capture_but_answers_the_frame(self) -> None:
+        from proctoring import create_app
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmp = Path(tmpdir)
+            with (
+                mock.patch.dict(os.environ, {MODEL_WARMUP_DEFER_ENV: "1"}),
+                mock.patch("proctoring.app_factory.REGISTERED_FACES_FILE", tmp / "faces.json"),
+                mock.patch("proctoring.app_factory.VIOLATION_EVENTS_FILE", tmp / "events.json"),
+                mock.patch("proctoring.app_factory.VIOLATION_CAPTURES_DIR", tmp / "captures"),
+                mock.patch("proctoring.app_factory.ROLLUP_SNAPSHOT_FILE", tmp / "rollups.json"),
+            ):
+                app = create_app("all")
+            state = app.extensions["proctoring_state"]
+            state.registered_faces["alice"] = RegisteredUser(username="alice", signatures=[])
+            client = app.test_client()
+            with client.session_transaction() as flask_session:
+                flask_session["verified_user"] = "alice"
+            ok, buffer = cv2.imencode(".jpg", np.full((240, 320, 3), 5, dtype=np.uint8))
+            assert ok
+            image = "data:image/jpeg;base64," + base64.b64encode(buffer.tobytes()).decode("ascii")
+
+            busy = sqlite3.OperationalError("database is locked")
+            with mock.patch.object(state.sessions, "mutex", side_effect=busy), self.assertLogs(app.logger, "WARNING"):
+                response = client.post("/analyze_frame", json={"username": "alice", "image": image})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("low_lighting", response.get_json()["violations"])
+        self.assertEqual(state.violation_events.get("alice", []), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from proctoring.services.sessions import SessionRecord, SessionRegistry
+
+
+class TestSessionRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.evicted: list[str] = []
+        self.registry = SessionRegistry(ttl_seconds=60.0, max_sessions=3, on_evict=self.evicted.append)
+
+    def test_touch_returns_the_same_record(self) -> None:
+        record = self.registry.touch("alice", 0.0)
+        record.phone_visible_streak = 2
+
+        self.assertIs(self.registry.touch("alice", 1.0), record)
+        self.assertEqual(record.last_seen, 1.0)
+        self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_idle_sessions_expire(self) -> None:
+        self.registry.touch("alice", 0.0)
+        self.registry.touch("bob", 30.0)
+
+        self.registry.touch("carol", 61.0)
+
+        self.assertNotIn("alice", self.registry)
+        self.assertIn("bob", self.registry)
+        self.assertEqual(self.evicted, ["alice"])
+
+    def test_cap_evicts_least_recently_active(self) -> None:
+        for idx, key in enumerate(["a", "b", "c"]):
+            self.registry.touch(key, float(idx))
+        self.registry.touch("a", 3.0)
+
+        self.registry.touch("d", 4.0)
+
+        self.assertEqual(self.evicted, ["b"])
+        self.assertEqual(len(self.registry), 3)
+        self.assertEqual(self.registry.stats()["evicted"], 1)
+
+    def test_start_resets_state(self) -> None:
+        record = self.registry.touch("alice", 0.0)
+        record.frozen_streak = 4
+
+        fresh = self.registry.start("alice", 1.0)
+
+        self.assertIsNot(fresh, record)
+        self.assertEqual(fresh, SessionRecord(identity=fresh.identity, last_seen=1.0))
+        self.assertEqual(self.evicted, ["alice"])
+
+    def test_evict_idle_without_traffic(self) -> None:
+        self.registry.touch("alice", 0.0)
+
+        self.assertEqual(self.registry.evict_idle(120.0), 1)
+        self.assertIsNone(self.registry.get("alice"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from proctoring.services.stage_graph import Stage, StageGraph
+
+
+class TestStageGraph(unittest.TestCase):
+    def setUp(self) -> None:
+        self.executor = ThreadPoolExecutor(2)
+
+    def tearDown(self) -> None:
+        self.executor.shutdown()
+
+    def test_dependents_see_upstream_results(self) -> None:
+        graph = StageGraph(
+            [
+                Stage("face", lambda inputs: inputs["frame"] * 2),
+                Stage("identity", lambda inputs: inputs["face"] + 1, after=("face",)),
+            ]
+        )
+
+        self.assertEqual(graph.run({"frame": 5}, executor=self.executor), {"face": 10, "identity": 11})
+        self.assertEqual(graph.run({"frame": 5}), {"face": 10, "identity": 11})
+
+    def test_independent_stages_overlap(self) -> None:
+        # Each stage waits for the other to start, so this only finishes if they run concurrently.
+        barrier = threading.Barrier(2, timeout=5)
+        graph = StageGraph(
+            [Stage("face", lambda inputs: barrier.wait()), Stage("phone", lambda inputs: barrier.wait())]
+        )
+
+        results = graph.run({}, executor=self.executor)
+
+        self.assertEqual(sorted(results), ["face", "phone"])
+
+    def test_disabled_stage_yields_none(self) -> None:
+        graph = StageGraph(
+            [
+                Stage("phone", lambda inputs: True, enabled=False),
+                Stage("report", lambda inputs: inputs["phone"], after=("phone",)),
+            ]
+        )
+
+        self.assertEqual(graph.run({}, executor=self.executor), {"phone": None, "report": None})
+
+    def test_stage_error_is_raised_and_dependents_are_skipped(self) -> None:
+        ran: list[str] = []
+
+        def fail(inputs: dict) -> None:
+            raise ValueError("Invalid image data")
+
+        graph = StageGraph(
+            [
+                Stage("phone", lambda inputs: ran.append("phone")),
+                Stage("face", fail),
+                Stage("identity", lambda inputs: ran.append("identity"), after=("face",)),
+            ]
+        )
+
+        with self.assertRaisesRegex(ValueError, "Invalid image data"):
+            graph.run({}, executor=self.executor)
+        self.assertNotIn("identity", ran)
+
+    def test_rejects_duplicate_and_unknown_stages(self) -> None:
+        with self.assertRaises(ValueError):
+            StageGraph([Stage("face", lambda inputs: None), Stage("face", lambda inputs: None)])
+        with self.assertRaises(ValueError):
+            StageGraph([Stage("identity", lambda inputs: None, after=("face",))])
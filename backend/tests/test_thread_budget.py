@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+import cv2
+
+from proctoring.services.thread_budget import (
+    BLAS_THREAD_ENV_VARS,
+    apply_thread_budget,
+    available_cpus,
+    resolve_thread_budget,
+)
+
+
+class TestThreadBudget(unittest.TestCase):
+    def setUp(self) -> None:
+        self.opencv_threads = cv2.getNumThreads()
+
+    def tearDown(self) -> None:
+        cv2.setNumThreads(self.opencv_threads)
+
+    def test_default_budget_splits_cores_across_workers(self) -> None:
+        cores = len(available_cpus())
+        with mock.patch.dict(os.environ, {"PROCTORING_WORKERS": "2"}):
+            os.environ.pop("PROCTORING_CPU_THREADS", None)
+            self.assertEqual(resolve_thread_budget(), max(1, cores // 2))
+        with mock.patch.dict(os.environ, {"PROCTORING_WORKERS": str(cores * 4)}):
+            os.environ.pop("PROCTORING_CPU_THREADS", None)
+            self.assertEqual(resolve_thread_budget(), 1)
+
+    def test_configured_budget_is_applied_to_loaded_libraries(self) -> None:
+        with mock.patch.dict(os.environ, {"PROCTORING_CPU_THREADS": "3", "OMP_NUM_THREADS": "7"}):
+            budget = apply_thread_budget()
+
+            self.assertEqual(budget.threads, 3)
+            self.assertEqual(budget.opencv_threads, 3)
+            self.assertEqual(cv2.getNumThreads(), 3)
+            # Values the operator set explicitly are kept.
+            self.assertEqual(budget.blas_env["OMP_NUM_THREADS"], "7")
+            self.assertEqual(set(budget.blas_env), set(BLAS_THREAD_ENV_VARS))
+        if "torch" not in sys.modules:
+            self.assertIsNone(budget.torch_threads)
+
+    @unittest.skipUnless(hasattr(os, "sched_setaffinity"), "CPU affinity is not supported here")
+    def test_pinned_worker_stays_within_available_cores(self) -> None:
+        cpus = available_cpus()
+        try:
+            with mock.patch.dict(os.environ, {"PROCTORING_CPU_THREADS": "1", "PROCTORING_PIN_CPUS": "1"}):
+                budget = apply_thread_budget(cpu_slot=len(cpus) + 1)
+            self.assertEqual(budget.cpu_affinity, [cpus[1 % len(cpus)]])
+        finally:
+            os.sched_setaffinity(0, cpus)
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+from proctoring.domain import RegisteredUser
+from proctoring.infrastructure.user_summary import UserSummaryIndex
+
+
+def _user(username: str, email: str = "", first_name: str = "", last_name: str = "") -> RegisteredUser:
+    return RegisteredUser(
+        username=username,
+        signatures=[np.zeros(4, dtype=np.float32)],
+        first_name=first_name,
+        last_name=last_name,
+        email=email,
+    )
+
+
+class TestUserSummaryIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.index = UserSummaryIndex()
+        self.index.rebuild(
+            {
+                "carol": _user("Carol", "carol@example.com"),
+                "alice": _user("alice", "alice@school.edu", "Alice", "Smith"),
+            },
+            {"alice": [{"timestamp": "2025-01-01T00:00:00+00:00"}]},
+        )
+
+    def test_rows_are_sorted_and_counted(self) -> None:
+        rows, total = self.index.page()
+
+        self.assertEqual(total, 2)
+        self.assertEqual([row["key"] for row in rows], ["alice", "carol"])
+        self.assertEqual(rows[0]["violation_count"], 1)
+        self.assertEqual(rows[0]["last_violation"], "2025-01-01T00:00:00+00:00")
+
+    def test_registration_inserts_in_order_and_bumps_version(self) -> None:
+        version = self.index.version
+
+        self.index.upsert_user("bob", _user("Bob", "bob@example.com"), [])
+        self.index.upsert_user("carol", _user("Carol", "carol@new.example.com"), [])
+        rows, total = self.index.page(offset=1, limit=1)
+
+        self.assertEqual(total, 3)
+        self.assertEqual([row["key"] for row in rows], ["bob"])
+        self.assertEqual(self.index.version, version + 2)
+        self.assertTrue(self.index.etag.endswith(f"-{version + 2}"))
+        self.assertNotEqual(UserSummaryIndex().etag.rsplit("-", 1)[0], self.index.etag.rsplit("-", 1)[0])
+
+    def test_violation_update_and_search(self) -> None:
+        self.index.update_violations("carol", [{"timestamp": "a"}, {"timestamp": "b"}])
+
+        rows, total = self.index.page(search="example.com")
+        by_full_name, _ = self.index.page(search="alice smith")
+
+        self.assertEqual(total, 1)
+        self.assertEqual(rows[0]["violation_count"], 2)
+        self.assertEqual(rows[0]["last_violation"], "b")
+        self.assertEqual([row["key"] for row in by_full_name], ["alice"])
+
+    def test_page_returns_copies(self) -> None:
+        rows, _ = self.index.page()
+        rows[0]["violation_count"] = 99
+
+        self.assertEqual(self.index.page()[0][0]["violation_count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from proctoring.services.analyzer import ProctorAnalyzer
+from proctoring.services.warmup import ModelReadiness, synthetic_frame, warm_up_models
+
+
+class _FailingDetector:
+    def warm_up(self, frame) -> None:
+        raise RuntimeError("no session")
+
+
+class TestModelReadiness(unittest.TestCase):
+    def test_not_ready_until_warmed_up(self) -> None:
+        readiness = ModelReadiness(models_loaded=True)
+        self.assertFalse(readiness.ready)
+
+        self.assertTrue(readiness.begin_warmup())
+        self.assertFalse(readiness.begin_warmup())
+        readiness.finish_warmup({"analyzer": 1.0}, None)
+
+        self.assertTrue(readiness.ready)
+        self.assertEqual(readiness.to_dict()["warmup_ms"], {"analyzer": 1.0})
+
+    def test_graphs_are_built_lazily(self) -> None:
+        analyzer = ProctorAnalyzer()
+        self.assertIsNone(analyzer._face_detection)
+
+        readiness = ModelReadiness(models_loaded=True)
+        warm_up_models(analyzer, _FailingDetector(), readiness)
+
+        self.assertIsNotNone(analyzer._face_detection)
+        self.assertFalse(readiness.ready)
+        self.assertIn("no session", readiness.error)
+        self.assertIn("analyzer", readiness.warmup_ms)
+
+    def test_synthetic_frame_is_deterministic(self) -> None:
+        self.assertTrue((synthetic_frame() == synthetic_frame()).all())
+        self.assertEqual(synthetic_frame(320, 240).shape, (240, 320, 3))
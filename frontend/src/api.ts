@@ -8,6 +8,21 @@ export type SetupConfigResponse = {
   ok: boolean;
   mobile_detected: boolean;
   min_download_mbps: number;
+  min_upload_mbps: number;
+};
+
+export type CaptureProfile = {
+  name: string;
+  max_width: number;
+  jpeg_quality: number;
+  interval_ms: number;
+  frame_kb: number;
+};
+
+export type NetworkCheckResponse = {
+  ok: boolean;
+  passed: boolean;
+  profile: CaptureProfile;
 };
 
 export type AdminUserSummary = {
@@ -22,9 +37,18 @@ export type AdminUserSummary = {
 };
 
 export type AdminUserEvent = {
+  event_id: number;
+  user_key: string;
+  username: string;
   timestamp: string;
   violations: string[];
   image_url: string;
+  thumbnail_url: string;
+  clip_url: string | null;
+};
+
+export type AdminLiveViolation = AdminUserEvent & {
+  violation_count: number;
 };
 
 type JsonRecord = Record<string, unknown>;
@@ -57,6 +81,36 @@ export function postJson<T>(url: string, body: JsonRecord): Promise<T> {
   return apiJson<T>(url, { method: "POST", body: JSON.stringify(body) });
 }
 
+export function postNetworkCheck(
+  username: string,
+  measurement: { download_mbps: number; upload_mbps: number; rtt_ms: number; jitter_ms: number }
+): Promise<NetworkCheckResponse> {
+  return postJson<NetworkCheckResponse>("/api/network_check", { username, ...measurement });
+}
+
+export type FramePrefilter = {
+  enabled: boolean;
+  min_change: number;
+  max_interval_ms: number;
+  thumbnail_width: number;
+};
+
+export type FaceCropSettings = {
+  enabled: boolean;
+  max_dim: number;
+  full_frame_interval_ms: number;
+};
+
+export function fetchNetworkProfile(username: string): Promise<{
+  ok: boolean;
+  recorded: boolean;
+  profile: CaptureProfile;
+  prefilter: FramePrefilter;
+  face_crops: FaceCropSettings;
+}> {
+  return apiJson(`/api/network_profile?username=${encodeURIComponent(username)}`, { method: "GET" });
+}
+
 export function adminLogin(password: string): Promise<{ ok: boolean }> {
   return postJson<{ ok: boolean }>("/api/admin/login", { password });
 }
@@ -69,17 +123,61 @@ export function fetchAdminSession(): Promise<{ ok: boolean; authenticated: boole
   return apiJson<{ ok: boolean; authenticated: boolean }>("/api/admin/session", { method: "GET" });
 }
 
-export function fetchAdminUsers(): Promise<{ ok: boolean; users: AdminUserSummary[] }> {
-  return apiJson<{ ok: boolean; users: AdminUserSummary[] }>("/api/admin/users", { method: "GET" });
+export type AdminUsersPage = {
+  ok: boolean;
+  users: AdminUserSummary[];
+  total: number;
+  offset: number;
+  limit: number;
+  version: number;
+};
+
+export function fetchAdminUsers(search = "", offset = 0, limit = 50): Promise<AdminUsersPage> {
+  const query = new URLSearchParams({ q: search, offset: String(offset), limit: String(limit) });
+  // The browser revalidates with If-None-Match, so unchanged polls come back as 304.
+  return apiJson(`/api/admin/users?${query.toString()}`, { method: "GET", cache: "no-cache" });
 }
 
 export function fetchAdminUser(
-  userKey: string
+  userKey: string,
+  cursor?: string | null
 ): Promise<{
   ok: boolean;
   user_key: string;
   user: { username: string; first_name: string; last_name: string; email: string; samples: number };
   events: AdminUserEvent[];
+  next_cursor: string | null;
 }> {
-  return apiJson(`/api/admin/user/${encodeURIComponent(userKey)}`, { method: "GET" });
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+  return apiJson(`/api/admin/user/${encodeURIComponent(userKey)}${query}`, { method: "GET" });
+}
+
+export type AdminAnalytics = {
+  ok: boolean;
+  bucket_seconds: number;
+  series: { start: string; count: number }[];
+  totals: Record<string, number>;
+  last_event_id: number;
+};
+
+export function fetchAdminAnalytics(params: { type?: string; user?: string; bucket?: number } = {}): Promise<AdminAnalytics> {
+  const query = new URLSearchParams();
+  if (params.type) query.set("type", params.type);
+  if (params.user) query.set("user", params.user);
+  if (params.bucket) query.set("bucket", String(params.bucket));
+  return apiJson(`/api/admin/analytics?${query.toString()}`, { method: "GET" });
+}
+
+export function adminEvidenceExportUrl(userKeys?: string[]): string {
+  if (userKeys && userKeys.length === 1) {
+    return `/api/admin/export/user/${encodeURIComponent(userKeys[0])}`;
+  }
+  const query = userKeys && userKeys.length > 0 ? `?users=${encodeURIComponent(userKeys.join(","))}` : "";
+  return `/api/admin/export${query}`;
+}
+
+export function openAdminEventStream(userKey?: string): EventSource {
+  const query = userKey ? `?user=${encodeURIComponent(userKey)}` : "";
+  // EventSource reconnects on its own and resumes with the Last-Event-ID header.
+  return new EventSource(`/api/admin/events/stream${query}`, { withCredentials: true });
 }
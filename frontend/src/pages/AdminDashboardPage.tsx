@@ -1,25 +1,39 @@
 import { useEffect, useState } from "react";
 import { Link, useNavigate } from "react-router-dom";
 import {
+  adminEvidenceExportUrl,
   adminLogout,
+  fetchAdminAnalytics,
   fetchAdminUsers,
+  openAdminEventStream,
+  type AdminLiveViolation,
   type AdminUserSummary,
 } from "../api";
 import { NavBar } from "../components/common/NavBar";
 import { StatusText } from "../components/common/StatusText";
 
+const PAGE_SIZE = 50;
+const STREAM_FALLBACK_POLL_MS = 30000;
+
 export function AdminDashboardPage() {
   const navigate = useNavigate();
   const [users, setUsers] = useState<AdminUserSummary[]>([]);
+  const [total, setTotal] = useState(0);
+  const [offset, setOffset] = useState(0);
+  const [search, setSearch] = useState("");
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState("");
+  const [recentTotals, setRecentTotals] = useState<Record<string, number>>({});
 
-  async function loadUsers() {
+  async function loadUsers(showLoading: boolean) {
     try {
-      setLoading(true);
+      if (showLoading) {
+        setLoading(true);
+      }
       setError("");
-      const data = await fetchAdminUsers();
+      const data = await fetchAdminUsers(search, offset, PAGE_SIZE);
       setUsers(data.users || []);
+      setTotal(data.total ?? 0);
     } catch (loadError) {
       const message =
         loadError instanceof Error ? loadError.message : "Failed to load users";
@@ -34,9 +48,53 @@ export function AdminDashboardPage() {
   }
 
   useEffect(() => {
-    void loadUsers();
+    void loadUsers(true);
+  }, [search, offset]);
+
+  useEffect(() => {
+    fetchAdminAnalytics()
+      .then((data) => setRecentTotals(data.totals || {}))
+      .catch(() => {
+        // Analytics are informational; the table still works without them.
+      });
   }, []);
 
+  useEffect(() => {
+    const stream = openAdminEventStream();
+    stream.addEventListener("violation", (message) => {
+      const event = JSON.parse((message as MessageEvent<string>).data) as AdminLiveViolation;
+      setRecentTotals((current) => {
+        const next = { ...current };
+        for (const violation of new Set(event.violations)) {
+          next[violation] = (next[violation] || 0) + 1;
+        }
+        return next;
+      });
+      setUsers((current) =>
+        current.map((user) =>
+          user.key === event.user_key
+            ? { ...user, violation_count: event.violation_count, last_violation: event.timestamp }
+            : user
+        )
+      );
+    });
+    // New registrations can land on any page, and a reset means events were missed.
+    const reload = () => void loadUsers(false);
+    stream.addEventListener("user", reload);
+    stream.addEventListener("reset", reload);
+    // A server at its stream limit answers 503 and the browser gives up; poll instead.
+    let poll: number | undefined;
+    stream.addEventListener("error", () => {
+      if (stream.readyState === EventSource.CLOSED && poll === undefined) {
+        poll = window.setInterval(reload, STREAM_FALLBACK_POLL_MS);
+      }
+    });
+    return () => {
+      stream.close();
+      window.clearInterval(poll);
+    };
+  }, [search, offset]);
+
   async function onLogout() {
     await adminLogout().catch(() => {
       // no-op
@@ -51,6 +109,9 @@ export function AdminDashboardPage() {
           <Link className="nav-link" to="/">
             Setup
           </Link>
+          <a className="nav-link" href={adminEvidenceExportUrl()}>
+            Export all evidence
+          </a>
           <button className="nav-link" type="button" onClick={onLogout}>
             Logout
           </button>
@@ -64,6 +125,24 @@ export function AdminDashboardPage() {
           </p>
           {loading ? <p className="subtitle">Loading users...</p> : null}
           {error ? <StatusText text={error} isError={true} /> : null}
+          {Object.keys(recentTotals).length > 0 ? (
+            <p className="subtitle">
+              Last hour:{" "}
+              {Object.entries(recentTotals)
+                .map(([violation, count]) => `${violation} ${count}`)
+                .join(", ")}
+            </p>
+          ) : null}
+
+          <input
+            type="search"
+            placeholder="Search by name or email"
+            value={search}
+            onChange={(event) => {
+              setSearch(event.target.value);
+              setOffset(0);
+            }}
+          />
 
           <div className="admin-table-wrap">
             <table className="admin-table">
@@ -104,6 +183,27 @@ export function AdminDashboardPage() {
               </tbody>
             </table>
           </div>
+          {total > PAGE_SIZE ? (
+            <div className="nav-actions">
+              <button
+                type="button"
+                disabled={offset === 0}
+                onClick={() => setOffset(Math.max(0, offset - PAGE_SIZE))}
+              >
+                Previous
+              </button>
+              <span>
+                {offset + 1}-{Math.min(offset + PAGE_SIZE, total)} of {total}
+              </span>
+              <button
+                type="button"
+                disabled={offset + PAGE_SIZE >= total}
+                onClick={() => setOffset(offset + PAGE_SIZE)}
+              >
+                Next
+              </button>
+            </div>
+          ) : null}
         </section>
       </main>
     </>
@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 import { Link, useNavigate, useParams } from "react-router-dom";
-import { adminLogout, fetchAdminUser, type AdminUserEvent } from "../api";
+import { adminEvidenceExportUrl, adminLogout, fetchAdminUser, type AdminUserEvent } from "../api";
 import { NavBar } from "../components/common/NavBar";
 import { StatusText } from "../components/common/StatusText";
 
@@ -18,6 +18,8 @@ export function AdminUserDetailPage() {
     samples: number;
   } | null>(null);
   const [events, setEvents] = useState<AdminUserEvent[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     async function run() {
@@ -27,6 +29,7 @@ export function AdminUserDetailPage() {
         const data = await fetchAdminUser(userKey);
         setUser(data.user);
         setEvents(data.events || []);
+        setNextCursor(data.next_cursor ?? null);
       } catch (loadError) {
         const message =
           loadError instanceof Error
@@ -48,6 +51,22 @@ export function AdminUserDetailPage() {
     void run();
   }, [userKey]);
 
+  async function onLoadMore() {
+    if (!nextCursor) {
+      return;
+    }
+    try {
+      setLoadingMore(true);
+      const data = await fetchAdminUser(userKey, nextCursor);
+      setEvents((current) => [...current, ...(data.events || [])]);
+      setNextCursor(data.next_cursor ?? null);
+    } catch (loadError) {
+      setError(loadError instanceof Error ? loadError.message : "Failed to load more captures");
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   async function onLogout() {
     await adminLogout().catch(() => {
       // no-op
@@ -95,6 +114,9 @@ export function AdminUserDetailPage() {
                 <span>Stored Face Samples</span>
                 <strong>{user.samples}</strong>
               </div>
+              <a className="btn" href={adminEvidenceExportUrl([userKey])}>
+                Download evidence (ZIP)
+              </a>
             </>
           ) : null}
         </section>
@@ -104,12 +126,14 @@ export function AdminUserDetailPage() {
           {!loading && events.length > 0 ? (
             <div className="evidence-grid">
               {events.map((event, index) => (
-                <article className="evidence-item" key={`${event.timestamp}-${index}`}>
-                  <img
-                    src={event.image_url}
-                    alt="Violation capture"
-                    loading="lazy"
-                  />
+                <article className="evidence-item" key={event.event_id ?? `${event.timestamp}-${index}`}>
+                  <a href={event.image_url} target="_blank" rel="noreferrer">
+                    <img
+                      src={event.thumbnail_url}
+                      alt="Violation capture"
+                      loading="lazy"
+                    />
+                  </a>
                   <div className="evidence-meta">
                     <div>
                       <strong>Time:</strong> {event.timestamp}
@@ -117,11 +141,23 @@ export function AdminUserDetailPage() {
                     <div>
                       <strong>Violations:</strong> {event.violations.join(", ")}
                     </div>
+                    {event.clip_url ? (
+                      <div>
+                        <a href={event.clip_url} target="_blank" rel="noreferrer">
+                          Surrounding frames
+                        </a>
+                      </div>
+                    ) : null}
                   </div>
                 </article>
               ))}
             </div>
           ) : null}
+          {!loading && nextCursor ? (
+            <button type="button" onClick={onLoadMore} disabled={loadingMore}>
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          ) : null}
           {!loading && events.length === 0 ? (
             <p className="subtitle">
               No captured violations for this user yet.
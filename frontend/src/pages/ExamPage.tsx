@@ -2,7 +2,23 @@ import { useEffect, useMemo, useRef, useState } from "react";
 import { useNavigate, useSearchParams } from "react-router-dom";
 import { toast } from "react-toastify";
 import { formatTime } from "../utils/helpers";
-import { requestCamera, stopMediaStream } from "../services/mediaService";
+import {
+  type BrowserFaceDetector,
+  type DetectedFace,
+  captureGrayThumbnail,
+  createBrowserFaceDetector,
+  cropFaceDataUrl,
+  meanAbsoluteDifference,
+  meanGray,
+  requestCamera,
+  stopMediaStream,
+} from "../services/mediaService";
+import {
+  fetchNetworkProfile,
+  type CaptureProfile,
+  type FaceCropSettings,
+  type FramePrefilter,
+} from "../api";
 import { NavBar } from "../components/common/NavBar";
 
 type ViolationCounters = Record<string, number>;
@@ -13,6 +29,9 @@ const BASE_VIOLATIONS: ViolationCounters = {
   identity_mismatch: 0,
   low_lighting: 0,
   phone_visible: 0,
+  camera_frozen: 0,
+  camera_blurry: 0,
+  camera_overexposed: 0,
   tab_hidden: 0,
   window_blur: 0,
   fullscreen_exit: 0,
@@ -80,6 +99,31 @@ export function ExamPage() {
   const timerRef = useRef<number | null>(null);
   const monitorRef = useRef<number | null>(null);
   const recentViolationAtRef = useRef<Record<string, number>>({});
+  const analyzeRetryAtRef = useRef(0);
+  const analyzeInFlightRef = useRef(false);
+  const captureProfileRef = useRef<CaptureProfile>({
+    name: "high",
+    max_width: 640,
+    jpeg_quality: 0.75,
+    interval_ms: 1000,
+    frame_kb: 80,
+  });
+  const prefilterRef = useRef<FramePrefilter>({
+    enabled: false,
+    min_change: 0,
+    max_interval_ms: 0,
+    thumbnail_width: 160,
+  });
+  const thumbnailCanvasRef = useRef<HTMLCanvasElement | null>(null);
+  const lastUploadRef = useRef<{ thumbnail: Uint8ClampedArray; at: number } | null>(null);
+  const forceFrameRef = useRef(false);
+  const faceCropsRef = useRef<FaceCropSettings>({
+    enabled: false,
+    max_dim: 192,
+    full_frame_interval_ms: 5000,
+  });
+  const faceDetectorRef = useRef<BrowserFaceDetector | null>(null);
+  const lastFullFrameAtRef = useRef(0);
   const [examEnded, setExamEnded] = useState(false);
   const [remainingSeconds, setRemainingSeconds] = useState(5 * 60);
   const [currentQuestionIndex, setCurrentQuestionIndex] = useState(0);
@@ -172,11 +216,37 @@ export function ExamPage() {
     );
   }
 
+  type AnalyzeResponse = {
+    skipped?: boolean;
+    violations?: string[];
+    overloaded?: boolean;
+    retry_after_ms?: number;
+    frame_required?: boolean;
+    reason?: string | null;
+    phone_visible_streak?: number;
+    identity_mismatch_streak?: number;
+  };
+
+  async function postAnalyze(body: Record<string, unknown>): Promise<AnalyzeResponse> {
+    const response = await fetch("/analyze_frame", {
+      method: "POST",
+      credentials: "include",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ ...body, username: examUsername }),
+    });
+    if (!response.ok) {
+      throw new Error("Frame analysis failed");
+    }
+    return (await response.json()) as AnalyzeResponse;
+  }
+
   async function analyzeFrame() {
     if (
       examEnded ||
       !webcamRef.current ||
-      !canvasRef.current
+      !canvasRef.current ||
+      Date.now() < analyzeRetryAtRef.current ||
+      analyzeInFlightRef.current
     )
       return;
     const webcam = webcamRef.current;
@@ -184,23 +254,115 @@ export function ExamPage() {
     if (!webcam.videoWidth || !webcam.videoHeight) return;
     const ctx = canvas.getContext("2d");
     if (!ctx) return;
-    canvas.width = webcam.videoWidth;
-    canvas.height = webcam.videoHeight;
+    // A slow link skips ticks while a frame is still uploading instead of queueing more.
+    analyzeInFlightRef.current = true;
+    try {
+      await analyzeCurrentFrame(webcam, canvas, ctx);
+    } finally {
+      analyzeInFlightRef.current = false;
+    }
+  }
+
+  async function analyzeCurrentFrame(
+    webcam: HTMLVideoElement,
+    canvas: HTMLCanvasElement,
+    ctx: CanvasRenderingContext2D
+  ) {
+    const prefilter = prefilterRef.current;
+    const faceCrops = faceCropsRef.current;
+    const detector = faceCrops.enabled ? faceDetectorRef.current : null;
+    const capturedAt = Date.now();
+    let thumbnail: Uint8ClampedArray | null = null;
+    if (prefilter.enabled || detector) {
+      if (!thumbnailCanvasRef.current) {
+        thumbnailCanvasRef.current = document.createElement("canvas");
+      }
+      thumbnail = captureGrayThumbnail(webcam, thumbnailCanvasRef.current, prefilter.thumbnail_width);
+    }
+    const previous = lastUploadRef.current;
+    const change =
+      thumbnail && previous && previous.thumbnail.length === thumbnail.length
+        ? meanAbsoluteDifference(thumbnail, previous.thumbnail)
+        : null;
+    const brightness = thumbnail ? meanGray(thumbnail) : null;
+    let frameRequired = forceFrameRef.current;
+    if (
+      prefilter.enabled &&
+      previous &&
+      change !== null &&
+      !frameRequired &&
+      capturedAt - previous.at < prefilter.max_interval_ms &&
+      change < prefilter.min_change
+    ) {
+      // Unchanged scene: a heartbeat keeps the session alive, unless the server wants a real frame.
+      const heartbeat = await postAnalyze({ heartbeat: true, change, brightness });
+      if (!heartbeat.frame_required) return;
+      // A fresh analysis is due; a face crop still does for that, every other reason needs the whole frame.
+      frameRequired = heartbeat.reason !== "interval";
+    }
+
+    let faces: DetectedFace[] | null = null;
+    if (detector) {
+      try {
+        faces = await detector.detect(webcam);
+      } catch {
+        // Detection turned out to be unsupported here; send full frames from now on.
+        faceDetectorRef.current = null;
+      }
+    }
+    if (
+      faces &&
+      faces.length === 1 &&
+      change !== null &&
+      !frameRequired &&
+      capturedAt - lastFullFrameAtRef.current < faceCrops.full_frame_interval_ms
+    ) {
+      const faceCrop = cropFaceDataUrl(webcam, canvas, faces[0].boundingBox, faceCrops.max_dim);
+      if (faceCrop) {
+        const data = await postAnalyze({ face_crop: faceCrop, face_count: 1, change, brightness });
+        if (!data.frame_required) {
+          handleAnalyzeResponse(data, thumbnail, capturedAt);
+          return;
+        }
+      }
+    }
+
+    const profile = captureProfileRef.current;
+    const scale = Math.min(1, profile.max_width / webcam.videoWidth);
+    canvas.width = Math.round(webcam.videoWidth * scale);
+    canvas.height = Math.round(webcam.videoHeight * scale);
     ctx.drawImage(webcam, 0, 0, canvas.width, canvas.height);
-    const image = canvas.toDataURL("image/jpeg", 0.75);
-    const response = await fetch("/analyze_frame", {
-      method: "POST",
-      credentials: "include",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ image, username: examUsername }),
-    });
-    if (!response.ok) {
-      throw new Error("Frame analysis failed");
+    const image = canvas.toDataURL("image/jpeg", profile.jpeg_quality);
+    // With a face count attached, the server checks the browser's detector against its own.
+    const data = await postAnalyze(
+      faces ? { image, client_face_count: faces.length } : { image }
+    );
+    if (handleAnalyzeResponse(data, thumbnail, capturedAt)) {
+      lastFullFrameAtRef.current = capturedAt;
+    }
+  }
+
+  function handleAnalyzeResponse(
+    data: AnalyzeResponse,
+    thumbnail: Uint8ClampedArray | null,
+    capturedAt: number
+  ): boolean {
+    if (data.overloaded && typeof data.retry_after_ms === "number") {
+      // The server shed this frame; hold off instead of adding to the queue.
+      analyzeRetryAtRef.current = Date.now() + data.retry_after_ms;
+      forceFrameRef.current = true;
+      return false;
     }
-    const data = (await response.json()) as { violations?: string[] };
     const responseViolations = Array.isArray(data.violations)
       ? data.violations
       : [];
+    lastUploadRef.current = thumbnail ? { thumbnail, at: capturedAt } : null;
+    // Anything short of a clean verdict is followed up with real frames, as the server would ask.
+    forceFrameRef.current =
+      Boolean(data.skipped) ||
+      responseViolations.length > 0 ||
+      Number(data.phone_visible_streak || 0) > 0 ||
+      Number(data.identity_mismatch_streak || 0) > 0;
     if (responseViolations.length > 0) {
       const now = new Date().toLocaleTimeString();
       setViolations((prev) => {
@@ -212,6 +374,7 @@ export function ExamPage() {
       });
       responseViolations.forEach((item) => addReportEntry(`[${now}] ${item}`));
     }
+    return true;
   }
 
   useEffect(() => {
@@ -281,6 +444,18 @@ export function ExamPage() {
       const fullscreenReady = await enforceFullscreenBeforeExam();
       if (!fullscreenReady) return;
 
+      try {
+        const capture = await fetchNetworkProfile(examUsername);
+        captureProfileRef.current = capture.profile;
+        if (capture.prefilter) prefilterRef.current = capture.prefilter;
+        if (capture.face_crops) {
+          faceCropsRef.current = capture.face_crops;
+          if (capture.face_crops.enabled) faceDetectorRef.current = createBrowserFaceDetector();
+        }
+      } catch {
+        // Keep the default profile.
+      }
+
       const stream = await requestCamera();
       streamRef.current = stream;
       if (webcamRef.current) {
@@ -312,7 +487,7 @@ export function ExamPage() {
           raiseClientViolation("monitor_error", message, 2000);
           toast.error(`Monitor error: ${message}`);
         });
-      }, 1000);
+      }, captureProfileRef.current.interval_ms);
     }
 
     history.pushState(null, "", window.location.href);
@@ -10,13 +10,14 @@ import {
   isValidName,
   type CandidateProfile,
 } from "../utils/helpers";
-import { fetchSetupConfig, fetchDeviceCheck } from "../api";
+import { fetchSetupConfig, fetchDeviceCheck, postNetworkCheck } from "../api";
 import {
   requestCamera,
   requestMicrophone,
   stopMediaStream,
   estimateLightingScore,
-  measureInternetSpeedMbps,
+  measureNetwork,
+  type NetworkMeasurement,
   testMicrophone,
 } from "../services/mediaService";
 import { CandidateForm } from "../components/Setup/CandidateForm";
@@ -47,6 +48,8 @@ export function SetupPage() {
   const [micPermissionGranted, setMicPermissionGranted] = useState(false);
   const [mobileBlocked, setMobileBlocked] = useState(false);
   const [minDownloadMbps, setMinDownloadMbps] = useState(2.0);
+  const [minUploadMbps, setMinUploadMbps] = useState(0.25);
+  const networkRef = useRef<NetworkMeasurement | null>(null);
   const [checks, setChecks] = useState<SetupChecks>({
     device: true,
     internet: null,
@@ -72,6 +75,7 @@ export function SetupPage() {
     fetchSetupConfig()
       .then((data) => {
         setMinDownloadMbps(Number(data.min_download_mbps || 2.0));
+        setMinUploadMbps(Number(data.min_upload_mbps || 0.25));
         if (data.mobile_detected) {
           setMobileBlocked(true);
           setChecks((prev) => ({ ...prev, device: false }));
@@ -218,17 +222,24 @@ export function SetupPage() {
     try {
       setBusyChecks(true);
       setStatus("Running internet, microphone, and lighting checks...");
-      const speed = await measureInternetSpeedMbps();
-      const internetOk = speed >= minDownloadMbps;
+      const network = await measureNetwork();
+      networkRef.current = network;
+      const downloadOk = network.download_mbps >= minDownloadMbps;
+      const uploadOk = network.upload_mbps >= minUploadMbps;
+      const internetOk = downloadOk && uploadOk;
       
       const micStream = await requestMicrophone();
       const micOk = await testMicrophone(micStream);
       
       const lightOk = estimateLightingScore(webcamRef.current!, canvasRef.current!) >= 60;
       
-      if (!internetOk)
+      if (!downloadOk)
         toast.warning(
-          `Internet speed too low (${speed.toFixed(2)} Mbps). Minimum required is ${minDownloadMbps} Mbps.`
+          `Download speed too low (${network.download_mbps.toFixed(2)} Mbps). Minimum required is ${minDownloadMbps} Mbps.`
+        );
+      if (!uploadOk)
+        toast.warning(
+          `Upload speed too low (${network.upload_mbps.toFixed(2)} Mbps). Minimum required is ${minUploadMbps} Mbps.`
         );
       if (!micOk)
         toast.warning(
@@ -264,7 +275,7 @@ export function SetupPage() {
     }
   }
 
-  function goToFaceRegistration() {
+  async function goToFaceRegistration() {
     if (!allChecksPass) {
       setStatus("Run and pass all pre-checks before continuing.", true);
       return;
@@ -280,6 +291,14 @@ export function SetupPage() {
     const username = `${firstName.trim().replace(/\s+/g, " ")} ${lastName
       .trim()
       .replace(/\s+/g, " ")}`.trim();
+    if (networkRef.current) {
+      try {
+        // Recorded per candidate; the exam page sizes its frames from the returned profile.
+        await postNetworkCheck(username, networkRef.current);
+      } catch {
+        // The exam page falls back to the default capture profile.
+      }
+    }
     navigate(`/face_register?username=${encodeURIComponent(username)}`);
   }
 
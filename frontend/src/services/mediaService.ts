@@ -38,26 +38,174 @@ export function estimateLightingScore(
   return sum / (canvas.width * canvas.height);
 }
 
-export async function measureInternetSpeedMbps(): Promise<number> {
-  const connection = (
-    navigator as Navigator & { connection?: { downlink?: number } }
-  ).connection;
-  if (
-    connection &&
-    typeof connection.downlink === "number" &&
-    connection.downlink > 0
-  ) {
-    return Number(connection.downlink);
+export function captureGrayThumbnail(
+  webcam: HTMLVideoElement,
+  canvas: HTMLCanvasElement,
+  width: number
+): Uint8ClampedArray | null {
+  if (!webcam.videoWidth || !webcam.videoHeight) return null;
+  const ctx = canvas.getContext("2d", { willReadFrequently: true });
+  if (!ctx) return null;
+  // Same size and luma weights as the server's quality thumbnail, so changes compare on one scale.
+  canvas.width = Math.min(width, webcam.videoWidth);
+  canvas.height = Math.max(
+    1,
+    Math.round((webcam.videoHeight * canvas.width) / webcam.videoWidth)
+  );
+  ctx.drawImage(webcam, 0, 0, canvas.width, canvas.height);
+  const imageData = ctx.getImageData(0, 0, canvas.width, canvas.height).data;
+  const gray = new Uint8ClampedArray(canvas.width * canvas.height);
+  for (let i = 0, p = 0; i < imageData.length; i += 4, p += 1) {
+    gray[p] =
+      0.299 * imageData[i] + 0.587 * imageData[i + 1] + 0.114 * imageData[i + 2];
+  }
+  return gray;
+}
+
+export function meanGray(gray: Uint8ClampedArray): number {
+  let sum = 0;
+  for (let i = 0; i < gray.length; i += 1) sum += gray[i];
+  return sum / Math.max(gray.length, 1);
+}
+
+export function meanAbsoluteDifference(
+  a: Uint8ClampedArray,
+  b: Uint8ClampedArray
+): number {
+  let sum = 0;
+  for (let i = 0; i < a.length; i += 1) sum += Math.abs(a[i] - b[i]);
+  return sum / Math.max(a.length, 1);
+}
+
+export type DetectedFace = { boundingBox: DOMRectReadOnly };
+
+export type BrowserFaceDetector = {
+  detect(image: HTMLVideoElement): Promise<DetectedFace[]>;
+};
+
+export function createBrowserFaceDetector(): BrowserFaceDetector | null {
+  // Shape Detection API; absent in most browsers, where the exam page sends full frames only.
+  const Detector = (
+    window as Window & {
+      FaceDetector?: new (options?: {
+        fastMode?: boolean;
+        maxDetectedFaces?: number;
+      }) => BrowserFaceDetector;
+    }
+  ).FaceDetector;
+  if (!Detector) return null;
+  try {
+    // Two faces are enough to tell "more than one".
+    return new Detector({ fastMode: true, maxDetectedFaces: 2 });
+  } catch {
+    return null;
+  }
+}
+
+export function cropFaceDataUrl(
+  webcam: HTMLVideoElement,
+  canvas: HTMLCanvasElement,
+  box: DOMRectReadOnly,
+  maxDim: number
+): string | null {
+  const ctx = canvas.getContext("2d");
+  if (!ctx) return null;
+  // Padded like the server's own face crops, so identity signatures compare alike.
+  const padX = box.width * 0.2;
+  const padY = box.height * 0.2;
+  const x1 = Math.max(0, Math.floor(box.x - padX));
+  const y1 = Math.max(0, Math.floor(box.y - padY));
+  const x2 = Math.min(webcam.videoWidth, Math.ceil(box.x + box.width + padX));
+  const y2 = Math.min(webcam.videoHeight, Math.ceil(box.y + box.height + padY));
+  if (x2 <= x1 || y2 <= y1) return null;
+  const scale = Math.min(1, maxDim / Math.max(x2 - x1, y2 - y1));
+  canvas.width = Math.max(1, Math.floor((x2 - x1) * scale));
+  canvas.height = Math.max(1, Math.floor((y2 - y1) * scale));
+  ctx.drawImage(webcam, x1, y1, x2 - x1, y2 - y1, 0, 0, canvas.width, canvas.height);
+  return canvas.toDataURL("image/jpeg", 0.85);
+}
+
+export type NetworkMeasurement = {
+  download_mbps: number;
+  upload_mbps: number;
+  rtt_ms: number;
+  jitter_ms: number;
+};
+
+// Probes grow until one transfer takes long enough that request overhead no longer dominates.
+const PROBE_SIZES_KB = [256, 1024, 4096];
+const PROBE_MIN_DURATION_MS = 400;
+const PING_SAMPLES = 6;
+
+function randomPayload(sizeKb: number): Uint8Array {
+  const bytes = new Uint8Array(sizeKb * 1024);
+  // getRandomValues fills at most 64 KB per call.
+  for (let offset = 0; offset < bytes.length; offset += 65536) {
+    crypto.getRandomValues(bytes.subarray(offset, offset + 65536));
+  }
+  return bytes;
+}
+
+async function measureDownloadMbps(): Promise<number> {
+  let mbps = 0;
+  for (const sizeKb of PROBE_SIZES_KB) {
+    const started = performance.now();
+    const response = await fetch(`/speed_probe?size=${sizeKb}&ts=${Date.now()}`, {
+      cache: "no-store",
+    });
+    if (!response.ok) throw new Error("Download probe failed");
+    const body = await response.arrayBuffer();
+    const elapsedMs = Math.max(performance.now() - started, 1);
+    mbps = (body.byteLength * 8) / (elapsedMs * 1000);
+    if (elapsedMs >= PROBE_MIN_DURATION_MS) break;
   }
-  const started = performance.now();
-  const response = await fetch(`/speed_probe?ts=${Date.now()}`, {
-    cache: "no-store",
-  });
-  const blob = await response.blob();
-  const ended = performance.now();
-  const durationSeconds = Math.max((ended - started) / 1000, 0.001);
-  const megabits = (blob.size * 8) / 1_000_000;
-  return megabits / durationSeconds;
+  return mbps;
+}
+
+async function measureUploadMbps(): Promise<number> {
+  let mbps = 0;
+  for (const sizeKb of PROBE_SIZES_KB) {
+    const payload = randomPayload(sizeKb);
+    const started = performance.now();
+    const response = await fetch(`/speed_probe/upload?ts=${Date.now()}`, {
+      method: "POST",
+      cache: "no-store",
+      headers: { "Content-Type": "application/octet-stream" },
+      body: payload,
+    });
+    if (!response.ok) throw new Error("Upload probe failed");
+    const data = (await response.json()) as { bytes?: number };
+    const elapsedMs = Math.max(performance.now() - started, 1);
+    mbps = (Number(data.bytes || 0) * 8) / (elapsedMs * 1000);
+    if (elapsedMs >= PROBE_MIN_DURATION_MS) break;
+  }
+  return mbps;
+}
+
+async function measureRoundTrip(): Promise<{ rtt_ms: number; jitter_ms: number }> {
+  const samples: number[] = [];
+  // The first ping opens the connection and is not counted.
+  for (let i = 0; i <= PING_SAMPLES; i += 1) {
+    const started = performance.now();
+    await fetch(`/speed_probe/ping?ts=${Date.now()}`, { cache: "no-store" });
+    if (i > 0) samples.push(performance.now() - started);
+  }
+  const sorted = [...samples].sort((a, b) => a - b);
+  let jitter = 0;
+  for (let i = 1; i < samples.length; i += 1) {
+    jitter += Math.abs(samples[i] - samples[i - 1]);
+  }
+  return {
+    rtt_ms: sorted[Math.floor(sorted.length / 2)],
+    jitter_ms: jitter / Math.max(samples.length - 1, 1),
+  };
+}
+
+export async function measureNetwork(): Promise<NetworkMeasurement> {
+  const { rtt_ms, jitter_ms } = await measureRoundTrip();
+  const download_mbps = await measureDownloadMbps();
+  const upload_mbps = await measureUploadMbps();
+  return { download_mbps, upload_mbps, rtt_ms, jitter_ms };
 }
 
 export async function testMicrophone(